@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+End-to-end API benchmark suite
+
+Drives the hot endpoints through the Flask app (in-process test clients, one
+worker's worth of threads) against a seeded database and reports throughput
+and latency percentiles per scenario. Results can be saved as a JSON baseline;
+a later run compared against it fails when a scenario's p95 regresses beyond
+the tolerance.
+
+By default a scratch SQLite database is migrated, seeded with the demo
+accounts and filled by generate_data.py. Pass --database-url to use an
+existing database that has been seeded with `flask seed-demo` and
+generate_data.py.
+
+Baselines are machine specific: record one on the machine that compares
+against it, with the same --requests/--concurrency and dataset flags.
+
+Usage:
+    python benchmarks/bench_api.py --requests 100 --save-baseline benchmarks/baselines/api_sqlite.json
+    python benchmarks/bench_api.py --requests 100 --baseline benchmarks/baselines/api_sqlite.json
+    python benchmarks/bench_api.py --scenario bookings_list_manager --requests 500
+    python benchmarks/bench_api.py --requests 100 --archive-days 90 --output /tmp/archived.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from sqlalchemy.engine import make_url
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import EMAIL_DOMAIN, SLUG_PREFIX, generate_dataset
+
+PASSWORD = 'password123'
+ACCOUNTS = {
+    'admin': 'admin@demo.com',
+    # Rank 0 is the busiest store and client in the generated dataset
+    'manager': f'manager0@{EMAIL_DOMAIN}',
+    'client': f'client0@{EMAIL_DOMAIN}'
+}
+
+
+class BookingSlots:
+    """Hands out distinct future slots so POST /bookings never conflicts"""
+
+    FIRST_DAY_OFFSET = 120  # beyond the generated advance booking window
+
+    def __init__(self):
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def next_payload(self, service_id):
+        with self._lock:
+            slot = self._next
+            self._next += 1
+        day = date.today() + timedelta(days=self.FIRST_DAY_OFFSET + slot // 40)
+        minutes = 8 * 60 + 15 * (slot % 40)
+        return {
+            'service_id': service_id,
+            'booking_date': day.isoformat(),
+            'start_time': f'{minutes // 60:02d}:{minutes % 60:02d}',
+            'end_time': f'{minutes // 60 + 1:02d}:{minutes % 60:02d}'
+        }
+
+
+def build_scenarios(context):
+    """Scenario name -> (method, path, role, json body factory or None, request share)"""
+    today = date.today()
+    month_start = today.replace(day=1).isoformat()
+    month_end = (today.replace(day=1) + timedelta(days=32)).replace(day=1).isoformat()
+    slots = BookingSlots()
+
+    return {
+        # Logins are dominated by password hashing, so they get a smaller share
+        'login': ('POST', '/api/auth/login', None,
+                  lambda: {'email': ACCOUNTS['client'], 'password': PASSWORD}, 0.1),
+        'store_by_slug': ('GET', f"/api/stores/{context['store_slug']}", None, None, 1.0),
+        'booking_create': ('POST', '/api/bookings', 'client',
+                           lambda: slots.next_payload(context['service_id']), 1.0),
+        'bookings_list_client': ('GET', '/api/bookings', 'client', None, 1.0),
+        'bookings_list_manager': ('GET', '/api/bookings', 'manager', None, 1.0),
+        'dashboard_stats_admin': ('GET', '/api/dashboard/stats', 'admin', None, 1.0),
+        'dashboard_stats_manager': ('GET', '/api/dashboard/stats', 'manager', None, 1.0),
+        'dashboard_stats_client': ('GET', '/api/dashboard/stats', 'client', None, 1.0),
+        'bookings_calendar_manager': (
+            'GET', f'/api/bookings/calendar?start_date={month_start}&end_date={month_end}',
+            'manager', None, 1.0
+        )
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(app, method, path, headers, body_factory, requests, concurrency, warmup):
+    """Run one scenario, returning its stats (latencies in ms)"""
+
+    def call(_):
+        with app.test_client() as client:
+            started = time.perf_counter()
+            response = client.open(path, method=method, headers=headers,
+                                   json=body_factory() if body_factory else None)
+            return response.status_code, (time.perf_counter() - started) * 1000
+
+    for i in range(warmup):
+        call(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(duration for _, duration in results)
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        'requests': requests,
+        'errors': sum(count for status, count in statuses.items() if int(status) >= 400),
+        'statuses': statuses,
+        'throughput_rps': round(requests / elapsed, 1),
+        'mean_ms': round(statistics.mean(latencies), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2)
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Return a list of regression messages against a baseline"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        limit = max(previous['p95_ms'] * (1 + tolerance), previous['p95_ms'] + min_delta_ms)
+        if current['p95_ms'] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']:.2f} ms > {limit:.2f} ms "
+                f"(baseline {previous['p95_ms']:.2f} ms, tolerance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def prepare_database(app, db, args):
+    """Migrate and seed a scratch database"""
+    from flask_migrate import upgrade
+    from init_demo_data import init_demo_data
+
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        init_demo_data(db)
+        generate_dataset(db, args.stores, args.clients, args.bookings, seed=args.seed)
+        if args.archive_days is not None:
+            from src.utils.archival import archive_cutoff, archive_history
+            moved = archive_history(archive_cutoff(args.archive_days))
+            print(f"Archived {moved['bookings']} bookings and {moved['notifications']} notifications")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end API benchmark suite')
+    parser.add_argument('--database-url', default=None,
+                        help='Existing seeded database (default: a scratch SQLite file)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Concurrent threads (gunicorn --threads per worker is the target)')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+    parser.add_argument('--scenario', action='append', help='Only run the named scenario(s)')
+    parser.add_argument('--stores', type=int, default=50, help='Generated stores (scratch database)')
+    parser.add_argument('--clients', type=int, default=5000, help='Generated clients (scratch database)')
+    parser.add_argument('--bookings', type=int, default=50000, help='Generated bookings (scratch database)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--archive-days', type=int, default=None,
+                        help='Run `flask archive-history --days N` on the scratch database before measuring')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--save-baseline', help='Write results as the new baseline JSON')
+    parser.add_argument('--baseline', help='Compare against this baseline JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative p95 regression (0.2 = 20%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                        help='Ignore p95 regressions smaller than this many ms (noise floor)')
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        database_url = f'sqlite:///{db_file.name}'
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from src.main import create_app
+    from src.models import db, Store, Service
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+    if db_file:
+        prepare_database(app, db, args)
+
+    with app.app_context():
+        store = Store.query.filter_by(slug=f'{SLUG_PREFIX}0').first()
+        if store is None:
+            print("No generated data found; seed the database with generate_data.py first")
+            sys.exit(1)
+        context = {
+            'store_slug': store.slug,
+            'service_id': Service.query.filter_by(store_id=store.id).first().id
+        }
+        db.session.remove()
+
+    headers = {}
+    with app.test_client() as client:
+        for role, email in ACCOUNTS.items():
+            response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+            if response.status_code != 200:
+                print(f"Login failed for {email}: {response.status_code} {response.get_json()}")
+                sys.exit(1)
+            headers[role] = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    scenarios = build_scenarios(context)
+    selected = args.scenario or list(scenarios)
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'database': make_url(database_url).get_backend_name(),
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'dataset': {'stores': args.stores, 'clients': args.clients, 'bookings': args.bookings,
+                        'seed': args.seed} if db_file else 'external'
+        },
+        'scenarios': {}
+    }
+    if db_file and args.archive_days is not None:
+        results['meta']['dataset']['archive_days'] = args.archive_days
+
+    print(f"{'scenario':<28}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}")
+    for name in selected:
+        method, path, role, body_factory, share = scenarios[name]
+        stats = run_scenario(app, method, path, headers.get(role, {}), body_factory,
+                             max(10, int(args.requests * share)), args.concurrency, args.warmup)
+        results['scenarios'][name] = stats
+        print(f"{name:<28}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>8.1f}ms"
+              f"{stats['p95_ms']:>8.1f}ms{stats['p99_ms']:>8.1f}ms{stats['errors']:>8}")
+
+    if db_file:
+        os.unlink(db_file.name)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write('\n')
+            print(f"Results written to {path}")
+
+    failed = False
+    errored = [name for name, stats in results['scenarios'].items() if stats['errors']]
+    if errored:
+        print(f"FAIL: error responses in {', '.join(errored)}")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ('database', 'dataset', 'requests', 'concurrency'):
+            if baseline.get('meta', {}).get(key) != results['meta'][key]:
+                print(f"Warning: baseline was recorded with a different {key}")
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            failed = True
+        else:
+            print(f"No p95 regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
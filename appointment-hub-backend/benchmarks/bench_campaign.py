@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SMS campaign fan-out benchmark
+
+Generates one store with many clients into a scratch SQLite database (or uses
+--database-url), then runs a campaign through src/utils/campaigns.py with a
+stub provider and reports recipients per second, SQL statements and provider
+calls. Statement and call counts should grow with the number of batches, not
+the number of recipients.
+
+Usage:
+    python benchmarks/bench_campaign.py --clients 60000 --bookings 150000
+    python benchmarks/bench_campaign.py --batch-size 500 --provider-latency-ms 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import SLUG_PREFIX, generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk SMS campaign fan-out')
+    parser.add_argument('--database-url', default=None,
+                        help='Existing database with generated data (default: a scratch SQLite file)')
+    parser.add_argument('--clients', type=int, default=60000, help='Generated clients (scratch database)')
+    parser.add_argument('--bookings', type=int, default=150000, help='Generated bookings (scratch database)')
+    parser.add_argument('--booked-within-days', type=int, default=None,
+                        help='Audience window (default: every client of the store)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Recipients per provider call')
+    parser.add_argument('--provider-latency-ms', type=float, default=0, help='Simulated bulk API latency')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        database_url = f'sqlite:///{db_file.name}'
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_migrate import upgrade
+    from sqlalchemy import event
+    from src.main import create_app
+    from src.models import db, Campaign, NotificationType, Store
+    from src.utils.campaigns import count_recipients, run_campaign
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+    try:
+        with app.app_context():
+            if db_file:
+                upgrade(directory=MIGRATIONS_DIR)
+                generate_dataset(db, 1, args.clients, args.bookings, seed=args.seed, notifications_per_booking=0)
+
+            store = Store.query.filter_by(slug=f'{SLUG_PREFIX}0').first()
+            if store is None:
+                print("No generated data found; seed the database with generate_data.py first")
+                sys.exit(1)
+
+            audience = {'booked_within_days': args.booked_within_days}
+            campaign = Campaign(store_id=store.id, type=NotificationType.SMS, message='Benchmark campaign',
+                                audience=audience, batch_size=args.batch_size,
+                                total_recipients=count_recipients(store.id, audience))
+            db.session.add(campaign)
+            db.session.commit()
+            campaign_id = campaign.id
+
+            provider_calls = []
+
+            def send(phone_numbers, message):
+                provider_calls.append(len(phone_numbers))
+                if args.provider_latency_ms:
+                    time.sleep(args.provider_latency_ms / 1000)
+                return {'success': True, 'batch_id': f'bench_{len(provider_calls)}'}
+
+            statements = []
+            listener = lambda *a, **k: statements.append(1)
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            started = time.perf_counter()
+            campaign = run_campaign(campaign_id, sender=send)
+            elapsed = time.perf_counter() - started
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+            recipients = campaign.sent_count + campaign.failed_count
+            print(f"Campaign {campaign.status.value}: {recipients} recipients "
+                  f"(expected {campaign.total_recipients}) in {elapsed:.2f} s, {recipients / elapsed:,.0f} recipients/s")
+            print(f"Provider calls: {len(provider_calls)} (largest {max(provider_calls, default=0)})")
+            print(f"SQL statements: {len(statements)} ({len(statements) / max(len(provider_calls), 1):.1f} per batch)")
+    finally:
+        if db_file:
+            os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Bulk client import benchmark
+
+Onboards the same number of generated clients into a scratch database twice:
+once the old way, one `POST /api/users` per client (email lookup, password
+hash, commit each), and once through `POST /api/users/import` as a single
+CSV or NDJSON upload. Reports rows per second for both and the speed-up.
+
+The per-request path is slow enough that it only runs --single-rows clients
+and is extrapolated; the import runs all --rows.
+
+Usage:
+    python benchmarks/bench_client_import.py --rows 20000
+    python benchmarks/bench_client_import.py --rows 20000 --format ndjson --chunk-size 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+ADMIN = {'email': 'admin@demo.com', 'password': 'password123'}
+
+
+def client_rows(prefix, count):
+    for i in range(count):
+        yield {
+            'first_name': f'Client{i}',
+            'last_name': prefix.capitalize(),
+            'email': f'{prefix}{i}@import.example',
+            'phone_number': f'+1555{i:07d}',
+            'age': 20 + i % 50,
+        }
+
+
+def csv_body(rows):
+    fields = ['first_name', 'last_name', 'email', 'phone_number', 'age']
+    lines = [','.join(fields)]
+    lines += [','.join(str(row[field]) for field in fields) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def ndjson_body(rows):
+    return ''.join(json.dumps(row) + '\n' for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare one-by-one user creation with the bulk client import')
+    parser.add_argument('--rows', type=int, default=20000, help='Clients in the bulk upload')
+    parser.add_argument('--single-rows', type=int, default=200, help='Clients created one request at a time')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=None, help='CLIENT_IMPORT_CHUNK_SIZE override')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_migrate import upgrade
+    from init_demo_data import init_demo_data
+    from src.main import create_app
+    from src.models import db
+
+    overrides = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file.name}', 'CLIENT_IMPORT_MAX_ROWS': args.rows}
+    if args.chunk_size:
+        overrides['CLIENT_IMPORT_CHUNK_SIZE'] = args.chunk_size
+    app = create_app(overrides)
+
+    try:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            init_demo_data(db)
+            db.session.remove()
+
+        with app.test_client() as client:
+            token = client.post('/api/auth/login', json=ADMIN).get_json()['access_token']
+            headers = {'Authorization': f'Bearer {token}'}
+
+            started = time.perf_counter()
+            for row in client_rows('single', args.single_rows):
+                response = client.post('/api/users', headers=headers,
+                                       json=dict(row, password='password123', role='client'))
+                if response.status_code != 201:
+                    print(f"POST /api/users failed: {response.status_code} {response.get_json()}")
+                    sys.exit(1)
+            single_rate = args.single_rows / (time.perf_counter() - started)
+
+            rows = list(client_rows('bulk', args.rows))
+            if args.format == 'csv':
+                body, content_type = csv_body(rows), 'text/csv'
+            else:
+                body, content_type = ndjson_body(rows), 'application/x-ndjson'
+
+            started = time.perf_counter()
+            response = client.post('/api/users/import', data=body,
+                                   headers=dict(headers, **{'Content-Type': content_type}))
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                print(f"POST /api/users/import failed: {response.status_code} {response.get_json()}")
+                sys.exit(1)
+            summary = response.get_json()['summary']
+            bulk_rate = summary['created'] / elapsed
+    finally:
+        os.unlink(db_file.name)
+
+    print(f"POST /api/users:        {args.single_rows} clients, {single_rate:8.1f} rows/s "
+          f"(~{args.rows / single_rate:.0f} s for {args.rows})")
+    print(f"POST /api/users/import: {summary['created']} created, {summary['failed']} failed "
+          f"in {elapsed:.2f} s, {bulk_rate:8.1f} rows/s ({args.format})")
+    print(f"Speed-up: {bulk_rate / single_rate:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Idempotency-Key retry storm check
+
+Generates stores and clients into a scratch SQLite database, then has every
+client create a booking while its app retries aggressively: each POST
+/api/bookings is sent --duplicates times at once with the same
+Idempotency-Key, from concurrent threads. Checks that each key created exactly
+one booking, that every duplicate got the first response back (marked
+Idempotent-Replayed) and that reusing a key with another body is refused.
+Reports how often the view actually ran (new) and how many duplicates were
+answered from the stored response (replayed).
+
+Usage:
+    python benchmarks/bench_idempotency.py --keys 200 --duplicates 5
+    python benchmarks/bench_idempotency.py --keys 1000 --duplicates 10 --threads 32
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import EMAIL_DOMAIN, generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check Idempotency-Key handling under duplicate retries')
+    parser.add_argument('--keys', type=int, default=200, help='Distinct bookings attempted')
+    parser.add_argument('--duplicates', type=int, default=5, help='Copies of each request sent at once')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_jwt_extended import create_access_token
+    from flask_migrate import upgrade
+    from prometheus_client import REGISTRY
+    from src.main import create_app
+    from src.models import db, Booking, Service, User
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file.name}'})
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f' - {detail}' if detail else ''}")
+
+    try:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            generate_dataset(db, 5, args.keys, 0, seed=args.seed)
+            clients = User.query.filter(User.email.like(f'%@{EMAIL_DOMAIN}')).limit(args.keys).all()
+            services = Service.query.all()
+            start = date.today() + timedelta(days=30)
+            attempts = []
+            for i, client in enumerate(clients):
+                body = {'service_id': services[i % len(services)].id,
+                        'booking_date': (start + timedelta(days=i // 40)).isoformat(),
+                        'start_time': f'{9 + (i % 40) // 4:02d}:{15 * (i % 4):02d}',
+                        'end_time': f'{10 + (i % 40) // 4:02d}:{15 * (i % 4):02d}'}
+                token = create_access_token(identity=client.id)
+                attempts.append((token, str(uuid.uuid4()), body))
+            bookings_before = Booking.query.count()
+            db.session.remove()
+
+        def outcomes():
+            return {outcome: REGISTRY.get_sample_value('idempotent_requests_total', {'outcome': outcome}) or 0
+                    for outcome in ('new', 'replayed', 'in_progress', 'mismatch')}
+
+        def send(attempt):
+            token, key, body = attempt
+            response = app.test_client().post('/api/bookings', json=body, headers={
+                'Authorization': f'Bearer {token}', 'Idempotency-Key': key})
+            return key, response.status_code, response.get_json(), response.headers.get('Idempotent-Replayed')
+
+        requests = [attempt for attempt in attempts for _ in range(args.duplicates)]
+        before = outcomes()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            responses = list(pool.map(send, requests))
+        elapsed = time.perf_counter() - started
+        runs = {outcome: int(count - before[outcome]) for outcome, count in outcomes().items()}
+        print(f"{len(requests)} requests for {len(attempts)} keys in {elapsed:.2f} s "
+              f"({len(requests) / elapsed:,.0f}/s): {runs}")
+
+        by_key = {}
+        for key, status, body, replayed in responses:
+            by_key.setdefault(key, []).append((status, body, replayed))
+        statuses = Counter(status for _, status, _, _ in responses)
+        with app.app_context():
+            created = Booking.query.count() - bookings_before
+
+        check('one booking per key', created == len(attempts), f'{created} created, statuses {dict(statuses)}')
+        check('view ran once per key', runs['new'] == len(attempts), f"{runs['new']} runs")
+        same = all(all(r[:2] == replies[0][:2] for r in replies) for replies in by_key.values())
+        check('duplicates got the first response', same)
+        replayed = sum(1 for _, _, _, flag in responses if flag == 'true')
+        check('duplicates marked as replayed', replayed == len(requests) - len(attempts), f'{replayed} replayed')
+
+        token, key, body = attempts[0]
+        reused = app.test_client().post('/api/bookings', json=dict(body, start_time='23:00'), headers={
+            'Authorization': f'Bearer {token}', 'Idempotency-Key': key})
+        check('key reused with another body is refused', reused.status_code == 422)
+    finally:
+        os.unlink(db_file.name)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
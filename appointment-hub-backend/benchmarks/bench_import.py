@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Application import-time benchmark
+
+Imports src.main in fresh interpreters, the way the gunicorn master does on
+cold start and rolling restarts (and every worker does without preload_app),
+and reports wall-clock import time and peak resident memory. With --top it
+also prints the slowest modules from `python -X importtime`.
+
+Usage:
+    python benchmarks/bench_import.py --runs 10
+    python benchmarks/bench_import.py --runs 5 --top 15
+"""
+
+import argparse
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_APP = 'import src.main'
+
+
+def run_import(env, importtime=False):
+    """Import the app once in a new interpreter, returning (seconds, stderr)"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', IMPORT_APP]
+
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(result.returncode)
+    return elapsed, result.stderr
+
+
+def slowest_modules(importtime_output, top):
+    """Parse `-X importtime` output into the modules with the largest cumulative time"""
+    modules = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # import time:  <self us> | <cumulative us> | <module>
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark application import time')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreter imports')
+    parser.add_argument('--top', type=int, default=0, help='Show the N slowest modules')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    db_file = None
+    if not env.get('DATABASE_URL'):
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        env['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+    env['FLASK_ENV'] = 'production'
+
+    timings = [run_import(env)[0] for _ in range(args.runs)]
+
+    print(f"Runs:    {args.runs}")
+    print(f"Mean:    {statistics.mean(timings) * 1000:.1f} ms")
+    print(f"Median:  {statistics.median(timings) * 1000:.1f} ms")
+    print(f"Min:     {min(timings) * 1000:.1f} ms")
+    print(f"Max:     {max(timings) * 1000:.1f} ms")
+    print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024:.1f} MB")
+
+    if args.top:
+        _, output = run_import(env, importtime=True)
+        print("\nSlowest modules (cumulative):")
+        for cumulative_us, self_us, name in slowest_modules(output, args.top):
+            print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}")
+
+    if db_file:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
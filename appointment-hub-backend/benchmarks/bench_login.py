@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+
+Runs POST /api/auth/login against a throwaway SQLite database seeded with the
+demo accounts and reports logins/sec for a single worker process.
+
+Usage:
+    python benchmarks/bench_login.py --requests 200 --concurrency 4
+    PASSWORD_HASH_METHOD=pbkdf2:sha256:600000 python benchmarks/bench_login.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /api/auth/login throughput')
+    parser.add_argument('--requests', type=int, default=100, help='Total number of logins')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent client threads')
+    parser.add_argument('--email', default='client@demo.com')
+    parser.add_argument('--password', default='password123')
+    args = parser.parse_args()
+
+    # Point the app at a scratch database before it is imported
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_migrate import upgrade
+    from init_demo_data import init_demo_data
+    from src.main import app, db
+
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        init_demo_data(db)
+
+    payload = {'email': args.email, 'password': args.password}
+    statuses = {}
+
+    def login(_):
+        with app.test_client() as client:
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json=payload)
+            return response.status_code, time.perf_counter() - started
+
+    # Warm up once so the rehash-on-login (if any) is not measured
+    login(None)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(login, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(duration for _, duration in results)
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"Hash method:   {app.config['PASSWORD_HASH_METHOD']}")
+    print(f"Requests:      {args.requests} (concurrency {args.concurrency})")
+    print(f"Status codes:  {statuses}")
+    print(f"Logins/sec:    {statuses.get(200, 0) / elapsed:.1f} per worker")
+    print(f"p50 latency:   {latencies[len(latencies) // 2] * 1000:.1f} ms")
+    print(f"p95 latency:   {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+
+    os.unlink(db_file.name)
+
+if __name__ == '__main__':
+    main()
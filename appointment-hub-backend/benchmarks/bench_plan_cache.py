@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Subscription plan cache check
+
+Generates stores into a scratch SQLite database with a few subscription plans,
+warms the plan cache as a gunicorn worker does, then serves --requests plan
+listings and plan limit lookups. Counts the SQL statements that read
+subscription_plans (there should be none) and checks that an admin creating,
+updating and deleting a plan is visible on the very next request, and that a
+second cache (another worker without Redis) picks the change up after its TTL.
+
+Usage:
+    python benchmarks/bench_plan_cache.py --requests 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the subscription plan cache')
+    parser.add_argument('--stores', type=int, default=20)
+    parser.add_argument('--plans', type=int, default=6)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_jwt_extended import create_access_token
+    from flask_migrate import upgrade
+    from sqlalchemy import event
+    from src.main import create_app
+    from src.models import db, Store, SubscriptionInterval, SubscriptionPlan, User, UserRole
+    from src.utils.plan_cache import PlanCache, plan_cache
+    from src.utils.plan_limits import plan_limit
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file.name}'})
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f' - {detail}' if detail else ''}")
+
+    try:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            generate_dataset(db, args.stores, 10, 0, seed=args.seed, notifications_per_booking=0)
+            plans = [SubscriptionPlan(name=f'Plan {i}', price_amount=10 * (i + 1), interval=SubscriptionInterval.MONTH,
+                                      features={'max_bookings': 100 * (i + 1)}, is_active=i % 3 != 2)
+                     for i in range(args.plans)]
+            db.session.add_all(plans)
+            db.session.flush()
+            stores = Store.query.all()
+            for i, store in enumerate(stores):
+                store.current_subscription_plan_id = plans[i % len(plans)].id
+            admin = User(first_name='Bench', last_name='Admin', email='admin@bench.local',
+                         password_hash='-', role=UserRole.ADMIN)
+            db.session.add(admin)
+            db.session.commit()
+            store_ids = [store.id for store in stores]
+            active = SubscriptionPlan.query.filter_by(is_active=True).count()
+            admin_token = create_access_token(identity=admin.id)
+            plan_cache.warm()
+
+            statements = Counter()
+
+            def listener(conn, cursor, statement, *a):
+                statements['plans' if 'subscription_plans' in statement else 'other'] += 1
+            event.listen(db.engine, 'before_cursor_execute', listener)
+
+        client = app.test_client()
+        admin_headers = {'Authorization': f'Bearer {admin_token}'}
+
+        started = time.perf_counter()
+        listings = [client.get('/api/subscription-plans') for _ in range(args.requests)]
+        with app.app_context():
+            limits = [plan_limit(store_ids[i % len(store_ids)], 'bookings') for i in range(args.requests)]
+        elapsed = time.perf_counter() - started
+        print(f"{args.requests} plan listings and {args.requests} plan limit lookups in {elapsed:.2f} s, "
+              f"{statements['plans']} statements on subscription_plans, {statements['other']} others")
+        check('listings never query subscription_plans', statements['plans'] == 0)
+        check('listings show the active plans', all(len(r.get_json()) == active for r in listings),
+              f'{active} active')
+        check('plan limits come from the cache', all(limits[i] == 100 * (i % len(store_ids) % args.plans + 1)
+                                                     for i in range(args.requests)))
+
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        other_worker = PlanCache(ttl_seconds=0.2)
+        with app.app_context():
+            other_worker.warm()
+
+        created = client.post('/api/subscription-plans', headers=admin_headers, json={
+            'name': 'New', 'price_amount': 5, 'interval': 'month', 'features': {'max_bookings': 7}})
+        new_id = created.get_json()['plan']['id']
+        listed = [plan['id'] for plan in client.get('/api/subscription-plans').get_json()]
+        check('created plan listed on the next request', created.status_code == 201 and new_id in listed)
+
+        client.put(f'/api/subscription-plans/{plans[0].id}', headers=admin_headers,
+                   json={'features': {'max_bookings': 3}})
+        with app.app_context():
+            limit = plan_limit(store_ids[0], 'bookings')
+        check('updated plan limit applies on the next request', limit == 3, f'limit {limit}')
+
+        client.delete(f'/api/subscription-plans/{new_id}', headers=admin_headers)
+        gone = client.get(f'/api/subscription-plans/{new_id}')
+        check('deleted plan gone on the next request', gone.status_code == 404)
+
+        time.sleep(0.3)
+        with app.app_context():
+            refreshed = other_worker.get(plans[0].id)
+        check('another worker refreshes after its TTL without Redis',
+              refreshed is not None and refreshed.get_feature_limit('max_bookings') == 3)
+    finally:
+        os.unlink(db_file.name)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
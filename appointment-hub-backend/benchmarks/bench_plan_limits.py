@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Plan limit enforcement check
+
+Generates a store with a long booking history into a scratch SQLite database,
+puts it on a plan allowing --limit bookings a month, then sends more
+concurrent POST /api/bookings than that from many clients. Checks that exactly
+the allowed number succeed, that the usage counter matches, and that
+`reconcile_usage` repairs a counter that drifted. Reports the SQL the limit
+check adds per booking next to what counting the store's bookings would cost.
+
+Usage:
+    python benchmarks/bench_plan_limits.py --bookings 100000 --limit 50 --attempts 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import EMAIL_DOMAIN, SLUG_PREFIX, generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check subscription plan limits under concurrent bookings')
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--bookings', type=int, default=100000, help='Generated booking history of the store')
+    parser.add_argument('--limit', type=int, default=50, help="Plan's max_bookings per month")
+    parser.add_argument('--attempts', type=int, default=200, help='Concurrent booking requests')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_jwt_extended import create_access_token
+    from flask_migrate import upgrade
+    from sqlalchemy import event, func, select, update
+    from src.main import create_app
+    from src.models import db, Booking, Service, Store, StoreUsage, SubscriptionInterval, SubscriptionPlan, User
+    from src.utils.plan_limits import reconcile_usage, usage_period
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file.name}'})
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f' - {detail}' if detail else ''}")
+
+    try:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            generate_dataset(db, 1, args.clients, args.bookings, seed=args.seed, notifications_per_booking=0)
+            store = Store.query.filter_by(slug=f'{SLUG_PREFIX}0').first()
+            plan = SubscriptionPlan(name='Limited', price_amount=9, interval=SubscriptionInterval.MONTH,
+                                    features={'max_bookings': args.limit})
+            db.session.add(plan)
+            db.session.flush()
+            store.current_subscription_plan_id = plan.id
+            db.session.commit()
+            store_id = store.id
+
+            services = Service.query.filter_by(store_id=store_id).all()
+            clients = User.query.filter(User.email.like(f'client%@{EMAIL_DOMAIN}')).limit(args.attempts).all()
+            start = date.today() + timedelta(days=90)
+            attempts = []
+            for i in range(args.attempts):
+                body = {'service_id': services[i % len(services)].id,
+                        'booking_date': (start + timedelta(days=i // 40)).isoformat(),
+                        'start_time': f'{9 + (i % 40) // 4:02d}:{15 * (i % 4):02d}',
+                        'end_time': f'{10 + (i % 40) // 4:02d}:{15 * (i % 4):02d}'}
+                attempts.append((create_access_token(identity=clients[i % len(clients)].id), body))
+
+            month_start = date.today().replace(day=1)
+            started = time.perf_counter()
+            history = db.session.execute(select(func.count()).select_from(Booking).where(
+                Booking.store_id == store_id, Booking.created_at >= month_start)).scalar()
+            count_ms = (time.perf_counter() - started) * 1000
+            bookings_before = Booking.query.filter_by(store_id=store_id).count()
+            db.session.remove()
+
+            statements = Counter()
+
+            def listener(conn, cursor, statement, *a):
+                if 'store_usage' in statement or 'subscription_plans' in statement:
+                    statements['limit check'] += 1
+            event.listen(db.engine, 'before_cursor_execute', listener)
+
+        def send(attempt):
+            token, body = attempt
+            return app.test_client().post('/api/bookings', json=body,
+                                          headers={'Authorization': f'Bearer {token}'}).status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            statuses = Counter(pool.map(send, attempts))
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', listener)
+            print(f"{args.attempts} booking requests in {elapsed:.2f} s: {dict(statuses)}; "
+                  f"{statements['limit check'] / args.attempts:.2f} limit-check statements per request, "
+                  f"vs {count_ms:.1f} ms to COUNT the store's {history} bookings this month")
+
+            created = Booking.query.filter_by(store_id=store_id).count() - bookings_before
+            usage = db.session.get(StoreUsage, (store_id, 'bookings', usage_period('bookings')))
+            check('exactly the plan limit was booked', created == args.limit and statuses[201] == args.limit,
+                  f'{created} created')
+            check('the rest were refused with 403', statuses[403] == args.attempts - args.limit)
+            check('usage counter matches', usage is not None and usage.count == args.limit,
+                  f'counter {usage.count if usage else None}')
+
+            # Drift the counter, as a booking inserted outside the API would
+            db.session.execute(update(StoreUsage.__table__).where(
+                StoreUsage.store_id == store_id, StoreUsage.metric == 'bookings').values(count=0))
+            db.session.commit()
+            started = time.perf_counter()
+            corrected = reconcile_usage()
+            reconcile_ms = (time.perf_counter() - started) * 1000
+            actual = db.session.execute(select(func.count()).select_from(Booking).where(
+                Booking.store_id == store_id, Booking.created_at >= month_start)).scalar()
+            db.session.expire_all()
+            usage = db.session.get(StoreUsage, (store_id, 'bookings', usage_period('bookings')))
+            check('reconcile repairs a drifted counter', corrected['bookings'] == 1 and usage.count == actual,
+                  f'{corrected} in {reconcile_ms:.0f} ms, counter {usage.count}, actual {actual}')
+    finally:
+        os.unlink(db_file.name)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Provider fault-injection check
+
+Starts a local stub HTTP server that can answer normally, slowly, with 500s,
+429s or 400s, points the EasySMS, Calendly and Stripe integrations at it and
+checks src/utils/provider_guard.py: timeouts bound a hung provider, the
+circuit opens after repeated failures and then fails fast without touching
+the network, a probe closes it again once the provider recovers, 4xx
+responses don't count, and the token bucket caps the call rate. Every
+scenario prints PASS/FAIL; the exit status is non-zero if any check fails.
+
+Usage:
+    python benchmarks/bench_provider_faults.py
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_provider_faults.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests
+import stripe
+from src.utils.calendly_integration import CalendlyIntegration
+from src.utils.easysms_integration import EasySMSIntegration
+from src.utils.provider_guard import ProviderGuard, ProviderHTTP
+from src.utils.stripe_integration import GuardedStripeClient, StripeIntegration
+
+HANG_SECONDS = 2.0
+TIMEOUT_SECONDS = 0.3
+FAILURES = 5
+RESET_SECONDS = 1.0
+
+
+class StubState:
+    mode = 'ok'  # ok | hang | error | throttle | bad_request
+    hits = 0
+    lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every path according to StubState.mode"""
+
+    def _respond(self):
+        with StubState.lock:
+            StubState.hits += 1
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        mode = StubState.mode
+        if mode == 'hang':
+            time.sleep(HANG_SECONDS)
+        status = {'error': 500, 'throttle': 429, 'bad_request': 400}.get(mode, 200)
+        payload = {'message_id': 'stub', 'id': 'pi_stub', 'object': 'payment_intent',
+                   'client_secret': 'pi_stub_secret', 'collection': []}
+        if status != 200:
+            payload = {'error': {'message': mode}}
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client timed out first
+
+    do_GET = do_POST = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def set_mode(mode):
+    StubState.mode = mode
+    StubState.hits = 0
+
+
+results = []
+
+def check(name, ok, detail=''):
+    results.append(ok)
+    print(f"{'PASS' if ok else 'FAIL'}  {name}{f' - {detail}' if detail else ''}")
+
+
+def timed(f):
+    started = time.perf_counter()
+    value = f()
+    return value, time.perf_counter() - started
+
+
+def new_guard(**kwargs):
+    options = dict(limits={}, failure_threshold=FAILURES, reset_seconds=RESET_SECONDS,
+                   max_wait=0.0, timeout=TIMEOUT_SECONDS)
+    options.update(kwargs)
+    return ProviderGuard(**options)
+
+
+def easysms(base_url, guard):
+    integration = EasySMSIntegration('stub-key')
+    integration.base_url = base_url
+    integration.http = ProviderHTTP('easysms', guard)
+    return integration
+
+
+def scenario_hung_provider(base_url):
+    set_mode('hang')
+    # What the integrations did before: no timeout, one hung call per request
+    _, unguarded = timed(lambda: requests.post(f'{base_url}/api/sms/send', json={}))
+
+    sms = easysms(base_url, new_guard())
+    durations = [timed(lambda: sms.send_sms('+306900000000', 'hi'))[1] for _ in range(FAILURES + 20)]
+    opening, fast = durations[:FAILURES], durations[FAILURES:]
+    print(f"      unguarded call {unguarded:.2f} s; guarded: first {FAILURES} calls "
+          f"max {max(opening):.2f} s, then max {max(fast) * 1000:.2f} ms over {len(fast)} calls")
+    check('hung provider: calls bounded by the timeout', max(opening) < TIMEOUT_SECONDS + 0.5)
+    check('hung provider: circuit opens and fails fast', max(fast) < 0.01,
+          f'{sms.http.guard.breaker("easysms").state}')
+
+
+def scenario_errors_and_recovery(base_url):
+    guard = new_guard()
+    sms = easysms(base_url, guard)
+
+    set_mode('error')
+    for _ in range(FAILURES):
+        sms.send_sms('+306900000000', 'hi')
+    hits_before = StubState.hits
+    result = sms.send_sms('+306900000000', 'hi')
+    check('5xx: circuit opens after the threshold', StubState.hits == hits_before and not result['success'],
+          result.get('error'))
+
+    set_mode('ok')
+    time.sleep(RESET_SECONDS + 0.05)
+    result = sms.send_sms('+306900000000', 'hi')
+    check('recovery: half-open probe closes the circuit',
+          result['success'] and guard.breaker('easysms').state == 'closed')
+
+    set_mode('throttle')
+    for _ in range(FAILURES):
+        sms.send_sms('+306900000000', 'hi')
+    check('429: counts as a provider failure', guard.breaker('easysms').state == 'open')
+
+    time.sleep(RESET_SECONDS + 0.05)
+    set_mode('error')
+    sms.send_sms('+306900000000', 'hi')
+    check('half-open probe failure re-opens immediately', guard.breaker('easysms').state == 'open')
+
+
+def scenario_client_errors(base_url):
+    guard = new_guard()
+    calendly = CalendlyIntegration('stub-key')
+    calendly.base_url = base_url
+    calendly.http = ProviderHTTP('calendly', guard)
+
+    set_mode('bad_request')
+    for _ in range(FAILURES * 2):
+        calendly.get_event_types('https://api.calendly.com/users/stub')
+    check('4xx: does not open the circuit', guard.breaker('calendly').state == 'closed',
+          f'{StubState.hits} requests reached the stub')
+
+
+def scenario_rate_limit(base_url):
+    rate, burst, calls = 50.0, 10.0, 60
+    guard = new_guard(limits={'easysms': (rate, burst)}, max_wait=5.0)
+    sms = easysms(base_url, guard)
+    set_mode('ok')
+
+    _, elapsed = timed(lambda: [sms.send_sms('+306900000000', 'hi') for _ in range(calls)])
+    expected = (calls - burst) / rate
+    check('token bucket: waits for tokens', elapsed >= expected * 0.9,
+          f'{calls} calls in {elapsed:.2f} s (>= {expected:.2f} s at {rate:.0f}/s after a burst of {burst:.0f})')
+
+    guard = new_guard(limits={'easysms': (rate, burst)}, max_wait=0.0)
+    sms = easysms(base_url, guard)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(lambda _: sms.send_sms('+306900000000', 'hi'), range(calls)))
+    refused = sum(1 for outcome in outcomes if 'rate limited' in str(outcome.get('error')))
+    check('token bucket: refuses beyond the burst without waiting', refused >= calls - burst - 5,
+          f'{refused} of {calls} concurrent calls refused')
+    check('rate limiting does not open the circuit', guard.breaker('easysms').state == 'closed')
+
+
+def scenario_stripe(base_url):
+    guard = new_guard()
+    original = (stripe.api_base, stripe.default_http_client, stripe.max_network_retries)
+    stripe.api_base = base_url
+    stripe.max_network_retries = 0
+    try:
+        integration = StripeIntegration('sk_test_stub')
+        stripe.default_http_client = GuardedStripeClient(guard=guard)
+
+        set_mode('ok')
+        result = integration.create_payment_intent(1000)
+        check('stripe: calls go through the guarded client', result['success'] and StubState.hits == 1)
+
+        set_mode('error')
+        for _ in range(FAILURES):
+            integration.create_payment_intent(1000)
+        hits_before = StubState.hits
+        result, elapsed = timed(lambda: integration.create_payment_intent(1000))
+        check('stripe: open circuit fails fast without a request',
+              not result['success'] and StubState.hits == hits_before and elapsed < 0.01,
+              f"{elapsed * 1000:.2f} ms, {result.get('error')}")
+    finally:
+        stripe.api_base, stripe.default_http_client, stripe.max_network_retries = original
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f"Stub provider on {base_url}")
+
+    scenario_hung_provider(base_url)
+    scenario_errors_and_recovery(base_url)
+    scenario_client_errors(base_url)
+    scenario_rate_limit(base_url)
+    scenario_stripe(base_url)
+
+    server.shutdown()
+    print(f"{sum(results)}/{len(results)} checks passed")
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Payment reconciliation check against a local Stripe stub
+
+Generates bookings with payments into a scratch SQLite database, then makes
+some of them drift the way missed webhooks would (succeeded payments left
+pending, refunds never recorded) and serves the true state from a local stub
+of Stripe's paginated GET /v1/payment_intents. Runs
+src/utils/payment_reconciliation.py against it and checks that every drifted
+payment is corrected, its booking's amount_paid follows, nothing else is
+touched and a second run finds nothing to do. Reports API pages, SQL round trips and intents per second.
+
+Usage:
+    python benchmarks/bench_reconciliation.py --bookings 50000
+    python benchmarks/bench_reconciliation.py --bookings 200000 --drift 0.1 --batch-size 1000
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import generate_dataset
+
+
+class StripeStub:
+    """PaymentIntents sorted by creation time, listed newest first like Stripe does"""
+
+    def __init__(self, intents):
+        self.intents = sorted(intents, key=lambda intent: (intent['created'], intent['id']))
+        self.created = [intent['created'] for intent in self.intents]
+        self.position = {intent['id']: i for i, intent in enumerate(self.intents)}
+        self.pages = 0
+
+    def list(self, params):
+        self.pages += 1
+        lo = bisect.bisect_left(self.created, int(params.get('created[gte]', ['0'])[0]))
+        hi = bisect.bisect_left(self.created, int(params.get('created[lt]', [str(2 ** 40)])[0]))
+        limit = int(params.get('limit', ['10'])[0])
+        start = hi - 1
+        if 'starting_after' in params:
+            start = self.position[params['starting_after'][0]] - 1
+        end = max(lo - 1, start - limit)
+        data = [self.intents[i] for i in range(start, end, -1)]
+        return {'object': 'list', 'url': '/v1/payment_intents', 'has_more': end >= lo, 'data': data}
+
+
+def serve(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/v1/payment_intents':
+                self.send_error(404)
+                return
+            body = json.dumps(stub.list(parse_qs(url.query))).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def to_intent(row, status, charge_refunded, created):
+    """A Stripe PaymentIntent for a payment's true state"""
+    intent = {'id': row.stripe_payment_intent_id, 'object': 'payment_intent', 'created': created,
+              'amount': int(row.amount * 100), 'currency': 'eur', 'latest_charge': None}
+    if status == 'FAILED':
+        intent.update(status='requires_payment_method', last_payment_error={'code': 'card_declined'})
+    else:
+        intent.update(status='succeeded', latest_charge={
+            'id': 'ch_bench_' + row.stripe_payment_intent_id[len('pi_bench_'):], 'object': 'charge',
+            'refunded': charge_refunded
+        })
+    return intent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check payment reconciliation against a local Stripe stub')
+    parser.add_argument('--clients', type=int, default=5000)
+    parser.add_argument('--bookings', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=30, help='Booking history window')
+    parser.add_argument('--drift', type=float, default=0.05, help='Share of payments that drift locally')
+    parser.add_argument('--batch-size', type=int, default=500, help='Intents compared per batch')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+    os.environ.setdefault('PROVIDER_RATE_LIMITS', '')  # measure the job, not the Stripe rate limit
+
+    import stripe
+    from flask_migrate import upgrade
+    from sqlalchemy import event, func, select, update
+    from src.main import create_app
+    from src.models import db, Booking, Payment, PaymentStatus, Subscription, SubscriptionStatus
+    from src.utils.payment_reconciliation import reconcile_payments
+    from src.utils.stripe_integration import StripeIntegration
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file.name}'})
+    server = None
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f' - {detail}' if detail else ''}")
+
+    try:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            generate_dataset(db, 10, args.clients, args.bookings, seed=args.seed,
+                             notifications_per_booking=0, past_days=args.days, future_days=0)
+
+            payments = Payment.__table__
+            rows = db.session.execute(select(
+                payments.c.id, payments.c.stripe_payment_intent_id, payments.c.status,
+                payments.c.amount, payments.c.created_at
+            )).all()
+
+            # The truth on Stripe, then local drift: missed payment_intent.succeeded and missed refunds
+            rng = random.Random(args.seed)
+            remote, missed_success, missed_refund = [], [], []
+            for row in rows:
+                status, refunded = row.status.name, row.status == PaymentStatus.REFUNDED
+                if row.status == PaymentStatus.SUCCEEDED and rng.random() < args.drift:
+                    if rng.random() < 0.8:
+                        missed_success.append(row.id)
+                    else:
+                        missed_refund.append(row.id)
+                        refunded = True
+                created = int(row.created_at.replace(tzinfo=timezone.utc).timestamp())
+                remote.append(to_intent(row, status, refunded, created))
+            db.session.execute(update(payments).where(payments.c.id.in_(missed_success))
+                               .values(status=PaymentStatus.PENDING, stripe_charge_id=None))
+            # Some of the missed successes were renewals of locally billed, past-due subscriptions
+            subscriptions = Subscription.__table__
+            renewal_subscription_ids = db.session.execute(select(subscriptions.c.id)).scalars().all()
+            renewal_subscription_ids = renewal_subscription_ids[:len(missed_success)]
+            db.session.execute(update(subscriptions).where(subscriptions.c.id.in_(renewal_subscription_ids)).values(
+                status=SubscriptionStatus.PAST_DUE, stripe_subscription_id=None,
+                current_period_end=datetime.utcnow() - timedelta(days=2)))
+            for subscription_id, payment_id in zip(renewal_subscription_ids, missed_success):
+                db.session.execute(update(payments).where(payments.c.id == payment_id)
+                                   .values(subscription_id=subscription_id))
+            db.session.commit()
+            expected = {row.id: row.status for row in rows}
+            expected.update({payment_id: PaymentStatus.REFUNDED for payment_id in missed_refund})
+            print(f"{len(rows)} payments, {len(missed_success)} left pending, {len(missed_refund)} refunds missed")
+
+            stub = StripeStub(remote)
+            server = serve(stub)
+            stripe.api_base = f'http://127.0.0.1:{server.server_address[1]}'
+            stripe.max_network_retries = 0
+            stripe_integration = StripeIntegration('sk_test_stub')
+
+            statements = []
+            listener = lambda *a, **k: statements.append(1)
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            # Payments are made ahead of the booking date, so the range starts before the history window
+            since = min(row.created_at for row in rows).replace(microsecond=0)
+            until = datetime.utcnow() + timedelta(days=1)
+
+            started = time.perf_counter()
+            stats = reconcile_payments(stripe_integration, since, until, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+            print(f"Reconciled {stats.get('checked', 0)} intents in {elapsed:.2f} s "
+                  f"({stats.get('checked', 0) / elapsed:,.0f}/s): {stub.pages} API pages, "
+                  f"{len(statements)} SQL round trips over {stats.get('windows', 0)} windows")
+            print(f"  {json.dumps({k: v for k, v in stats.items() if '->' in k or k == 'charge_id_set'})}")
+
+            actual = dict(db.session.execute(select(payments.c.id, payments.c.status)).all())
+            wrong = sum(1 for payment_id, status in expected.items() if actual[payment_id] != status)
+            check('every payment matches Stripe', wrong == 0, f'{wrong} differ')
+            check('only drifted payments were corrected',
+                  stats.get('corrected', 0) == len(missed_success) + len(missed_refund),
+                  f"{stats.get('corrected', 0)} corrected")
+            charges = db.session.execute(select(payments.c.stripe_charge_id).where(
+                payments.c.id.in_(missed_success[:1000]))).scalars().all()
+            check('charge ids restored', all(charges))
+            bookings = Booking.__table__
+            paid = select(payments.c.booking_id, func.sum(payments.c.amount).label('paid')).where(
+                payments.c.status == PaymentStatus.SUCCEEDED).group_by(payments.c.booking_id).subquery()
+            stale = db.session.execute(select(func.count()).select_from(bookings).outerjoin(
+                paid, paid.c.booking_id == bookings.c.id).where(
+                bookings.c.amount_paid != func.coalesce(paid.c.paid, 0))).scalar()
+            check('booking amount_paid rolled up', stale == 0, f'{stale} stale')
+            still_past_due = db.session.execute(select(func.count()).select_from(subscriptions).where(
+                subscriptions.c.id.in_(renewal_subscription_ids),
+                subscriptions.c.status != SubscriptionStatus.ACTIVE)).scalar()
+            check('paid renewals start the next period',
+                  still_past_due == 0 and stats.get('subscriptions_renewed', 0) == len(renewal_subscription_ids),
+                  f"{stats.get('subscriptions_renewed', 0)} renewed, {still_past_due} still past due")
+
+            stub.pages = 0
+            again = reconcile_payments(stripe_integration, since, until, batch_size=args.batch_size)
+            check('second run finds nothing to correct', again.get('corrected', 0) == 0,
+                  f"{again.get('matched', 0)} matched, {stub.pages} API pages")
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    finally:
+        if server:
+            server.shutdown()
+        os.unlink(db_file.name)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
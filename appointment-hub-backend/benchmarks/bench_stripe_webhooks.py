@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Stripe webhook processing benchmark
+
+Generates stores with Stripe subscriptions into a scratch SQLite database (or
+uses --database-url), then applies one renewal day of already verified
+invoice.payment_succeeded events through src/utils/stripe_webhooks.py: once
+as individual deliveries (one event per request, as Stripe sends them) and
+once as a replay in batches. Reports events per second and SQL round trips per
+event; each delivery should cost two lookups plus its writes.
+
+Usage:
+    python benchmarks/bench_stripe_webhooks.py --stores 5000
+    python benchmarks/bench_stripe_webhooks.py --stores 20000 --batch-size 1000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import SLUG_PREFIX, generate_dataset
+
+
+def invoice_events(count, kind, period_start):
+    import stripe
+    period_end = period_start + 30 * 86400
+    return [stripe.Event.construct_from({
+        'id': f'evt_{kind}_{i}', 'object': 'event', 'type': 'invoice.payment_succeeded', 'created': period_start,
+        'data': {'object': {
+            'id': f'in_{kind}_{i}', 'object': 'invoice', 'subscription': f'sub_{SLUG_PREFIX}{i}',
+            'payment_intent': f'pi_{kind}_{i}', 'amount_paid': 2900, 'amount_due': 2900, 'currency': 'eur',
+            'status_transitions': {'paid_at': period_start},
+            'lines': {'object': 'list', 'data': [{'period': {'start': period_start, 'end': period_end}}]}
+        }}
+    }, None) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Stripe webhook event processing')
+    parser.add_argument('--database-url', default=None,
+                        help='Existing database with generated data (default: a scratch SQLite file)')
+    parser.add_argument('--stores', type=int, default=5000, help='Generated stores, one subscription each')
+    parser.add_argument('--batch-size', type=int, default=500, help='Events per replay batch')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        database_url = f'sqlite:///{db_file.name}'
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_migrate import upgrade
+    from sqlalchemy import event
+    from src.main import create_app
+    from src.models import db, Subscription
+    from src.utils.stripe_webhooks import process_events
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+    try:
+        with app.app_context():
+            if db_file:
+                upgrade(directory=MIGRATIONS_DIR)
+                generate_dataset(db, args.stores, 10, 0, seed=args.seed)
+
+            stores = Subscription.query.filter(Subscription.stripe_subscription_id.like(f'sub_{SLUG_PREFIX}%')).count()
+            if not stores:
+                print("No generated data found; seed the database with generate_data.py first")
+                sys.exit(1)
+
+            statements = []
+            listener = lambda *a, **k: statements.append(1)
+            event.listen(db.engine, 'before_cursor_execute', listener)
+
+            runs = [('deliveries', 1), (f'replay x{args.batch_size}', args.batch_size)]
+            for run, (label, batch_size) in enumerate(runs):
+                events = invoice_events(stores, f'run{run}', int(time.time()) + run * 30 * 86400)
+                statements.clear()
+                started = time.perf_counter()
+                for start in range(0, len(events), batch_size):
+                    results = process_events(events[start:start + batch_size])
+                    db.session.commit()
+                elapsed = time.perf_counter() - started
+                print(f"{label:>16}: {len(events)} events in {elapsed:.2f} s ({len(events) / elapsed:,.0f}/s), "
+                      f"{len(statements) / len(events):.2f} SQL round trips per event, last result {results[-1]['result']}")
+
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    finally:
+        if db_file:
+            os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
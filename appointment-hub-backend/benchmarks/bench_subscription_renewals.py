@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Subscription renewal and expiry run
+
+Generates --subscriptions stores with one locally billed subscription each
+into a scratch SQLite database: most of them past the end of their period
+(some on a free plan), some still in it, some past due beyond the grace
+period, some past due within it. Runs `process_subscriptions` once and checks
+every subscription landed in the right state with one renewal payment and
+one queued email where due, that sending the queue emails each manager once
+and marks the notifications sent without counting them against the store
+plans, that a second run finds nothing to do, and that paying
+a renewal starts the next period. Reports subscriptions per second and the
+SQL statements per batch, and checks the batch scans use the
+(status, current_period_end) index.
+
+Usage:
+    python benchmarks/bench_subscription_renewals.py --subscriptions 30000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_data import generate_dataset
+
+# i % 10 -> (status, period end relative to now in days, updated_at relative to now in days)
+LAYOUT = {
+    0: ('ACTIVE', -1, -31), 1: ('ACTIVE', -3, -31), 2: ('ACTIVE', -6, -31), 3: ('ACTIVE', -0.01, -31),
+    4: ('ACTIVE', -2, -31), 5: ('TRIALING', -1, -15), 6: ('ACTIVE', 12, -18),
+    7: ('PAST_DUE', -20, -20), 8: ('PAST_DUE', -3, -3), 9: ('CANCELLED', -40, -40),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the subscription renewal job over many subscriptions')
+    parser.add_argument('--subscriptions', type=int, default=30000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--grace-days', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['FLASK_ENV'] = 'production'
+    os.environ.setdefault('NPLUSONE_GUARD', 'off')
+
+    from flask_migrate import upgrade
+    from sqlalchemy import bindparam, event, func, select, update
+    from src.main import create_app
+    from src.models import (
+        db, Notification, NotificationStatus, Payment, PaymentStatus, Store, StoreUsage, Subscription, SubscriptionInterval,
+        SubscriptionPlan, SubscriptionStatus
+    )
+    from src.utils.notification_outbox import send_pending_notifications
+    from src.utils.plan_limits import reconcile_usage
+    from src.utils.subscription_renewals import (
+        _batch_query, add_interval, process_subscriptions, renew_paid_subscriptions
+    )
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_file.name}'})
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f' - {detail}' if detail else ''}")
+
+    try:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            generate_dataset(db, args.subscriptions, 10, 0, seed=args.seed, notifications_per_booking=0)
+            free_plan = SubscriptionPlan(name='Free', price_amount=0, interval=SubscriptionInterval.MONTH)
+            db.session.add(free_plan)
+            db.session.flush()
+
+            now = datetime.utcnow()
+            subscriptions = Subscription.__table__
+            ids = db.session.execute(select(subscriptions.c.id).order_by(subscriptions.c.id)).scalars().all()
+            expected = Counter()
+            rows = []
+            for i, subscription_id in enumerate(ids):
+                status, end_days, updated_days = LAYOUT[i % 10]
+                free = i % 20 == 0
+                end = now + timedelta(days=end_days)
+                row = {'b_id': subscription_id, 'b_status': SubscriptionStatus[status], 'b_end': end,
+                       'b_start': end - timedelta(days=30), 'b_updated': now + timedelta(days=updated_days)}
+                if free:
+                    row['b_plan'] = free_plan.id
+                rows.append(row)
+                if status in ('ACTIVE', 'TRIALING') and end_days < 0:
+                    expected['renewed' if free else 'past_due'] += 1
+                elif status == 'PAST_DUE' and end_days <= -args.grace_days and updated_days <= -args.grace_days:
+                    expected['ended'] += 1
+            values = dict(status=bindparam('b_status'), current_period_start=bindparam('b_start'),
+                          current_period_end=bindparam('b_end'), updated_at=bindparam('b_updated'),
+                          stripe_subscription_id=None)
+            statement = update(subscriptions).where(subscriptions.c.id == bindparam('b_id'))
+            db.session.execute(statement.values(**values), [row for row in rows if 'b_plan' not in row])
+            db.session.execute(statement.values(plan_id=bindparam('b_plan'), **values),
+                               [row for row in rows if 'b_plan' in row])
+            db.session.commit()
+            payments_before = Payment.query.count()
+
+            plans = []
+            for name, where in (
+                ('due', (subscriptions.c.status == SubscriptionStatus.ACTIVE) & (subscriptions.c.current_period_end <= now)),
+                ('lapsed', (subscriptions.c.status == SubscriptionStatus.PAST_DUE)
+                 & (subscriptions.c.current_period_end <= now - timedelta(days=args.grace_days))),
+            ):
+                sql = str(_batch_query(where, args.batch_size).compile(
+                    dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+                plan = ' | '.join(row[-1] for row in db.session.connection().exec_driver_sql(
+                    f'EXPLAIN QUERY PLAN {sql}').fetchall())
+                plans.append((name, plan))
+            db.session.remove()
+
+            statements = Counter()
+
+            def listener(conn, cursor, statement, *a):
+                statements['sql'] += 1
+            event.listen(db.engine, 'before_cursor_execute', listener)
+
+            started = time.perf_counter()
+            stats = process_subscriptions(grace_days=args.grace_days, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+            event.remove(db.engine, 'before_cursor_execute', listener)
+            moved = stats['renewed'] + stats['past_due'] + stats['ended']
+            batches = max(1, sum(-(-count // args.batch_size) for count in (
+                expected['renewed'] + expected['past_due'], expected['ended'])))
+            print(f"{len(ids)} subscriptions, {moved} moved in {elapsed:.2f} s ({moved / elapsed:,.0f}/s): {stats}; "
+                  f"{statements['sql']} statements, about {statements['sql'] / batches:.0f} per batch")
+
+            check('due subscriptions renewed or past due',
+                  stats['renewed'] == expected['renewed'] and stats['past_due'] == expected['past_due'],
+                  f"expected {expected['renewed']} renewed, {expected['past_due']} past due")
+            check('lapsed subscriptions ended', stats['ended'] == expected['ended'], f"expected {expected['ended']}")
+
+            renewal_payments = db.session.execute(
+                select(Payment.subscription_id, func.count()).where(Payment.status == PaymentStatus.PENDING)
+                .group_by(Payment.subscription_id)).all()
+            check('one pending renewal payment per past-due subscription',
+                  Payment.query.count() - payments_before == stats['past_due']
+                  and len(renewal_payments) == stats['past_due'] and all(n == 1 for _, n in renewal_payments))
+            still_due = db.session.execute(select(func.count()).select_from(subscriptions).where(
+                subscriptions.c.status.in_([SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIALING]),
+                subscriptions.c.current_period_end <= now)).scalar()
+            check('no active subscription left past its period', still_due == 0, f'{still_due} left')
+            ended_with_plan = db.session.execute(select(func.count()).select_from(Store).join(
+                Subscription, Subscription.store_id == Store.id).where(
+                Subscription.status == SubscriptionStatus.ENDED,
+                Store.current_subscription_plan_id.isnot(None))).scalar()
+            check('ended subscriptions took the plan from their store', ended_with_plan == 0,
+                  f'{ended_with_plan} still have it')
+            pending = Notification.query.filter_by(status=NotificationStatus.PENDING).count()
+            check('one email queued per past-due or ended subscription',
+                  stats['notifications_queued'] == stats['past_due'] + stats['ended'] and pending == stats['notifications_queued'],
+                  f"{stats['notifications_queued']} queued, {pending} pending")
+
+            emails = []
+            started = time.perf_counter()
+            sent = send_pending_notifications(batch_size=args.batch_size,
+                                              sender=lambda to, subject, message: emails.append(to) or {'success': True})
+            elapsed = time.perf_counter() - started
+            print(f"{len(emails)} queued emails sent in {elapsed:.2f} s: {sent}")
+            marked = Notification.query.filter_by(status=NotificationStatus.SENT).count()
+            check('queued emails sent once and marked sent', len(emails) == pending and sent['sent'] == pending
+                  and marked == pending, f'{len(emails)} emails, {marked} marked sent')
+            reconcile_usage()
+            counted = db.session.execute(select(func.coalesce(func.sum(StoreUsage.count), 0)).where(
+                StoreUsage.metric == 'notifications')).scalar()
+            check('billing emails not counted as store notifications', counted == 0, f'{counted} counted')
+            resent = send_pending_notifications(sender=lambda *a: {'success': True})
+            check('nothing left to send', resent == {'sent': 0, 'failed': 0}, str(resent))
+
+            again = process_subscriptions(grace_days=args.grace_days, batch_size=args.batch_size)
+            check('second run finds nothing', not (again['renewed'] or again['past_due'] or again['ended']
+                                                   or again['notifications_queued']), str(again))
+
+            paid_id, old_end, start_date, interval = db.session.execute(
+                select(subscriptions.c.id, subscriptions.c.current_period_end, subscriptions.c.start_date,
+                       SubscriptionPlan.interval)
+                .join(SubscriptionPlan, SubscriptionPlan.id == subscriptions.c.plan_id)
+                .where(subscriptions.c.status == SubscriptionStatus.PAST_DUE)
+                .order_by(subscriptions.c.updated_at.desc()).limit(1)).one()
+            renewed = renew_paid_subscriptions([paid_id])
+            db.session.commit()
+            subscription = db.session.get(Subscription, paid_id)
+            check('paying a renewal starts the next period',
+                  renewed == 1 and subscription.status == SubscriptionStatus.ACTIVE
+                  and subscription.current_period_start == old_end
+                  and subscription.current_period_end == add_interval(old_end, interval, start_date.day))
+
+            for name, plan in plans:
+                check(f'{name} batches use the period index', 'ix_subscriptions_status_current_period_end' in plan, plan)
+    finally:
+        os.unlink(db_file.name)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
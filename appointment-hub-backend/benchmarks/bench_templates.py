@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Message template rendering benchmark
+
+Renders the same personalized message for many generated recipients with the
+old per-variable str.replace loop and with the compiled templates from
+src/utils/message_templates.py, and reports messages per second for both.
+
+Usage:
+    python benchmarks/bench_templates.py --messages 200000
+    python benchmarks/bench_templates.py --template booking_confirmation
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.utils.message_templates import DEFAULT_TEMPLATES, message_templates
+
+
+def naive_render(template, variables):
+    """The previous EasySMSIntegration.create_personalized_message"""
+    message = template
+    for key, value in variables.items():
+        message = message.replace(f"{{{key}}}", str(value))
+    return message
+
+
+def recipients(count):
+    for i in range(count):
+        yield {
+            'client_name': f'Client {i}',
+            'store_name': 'Bella Salon & Spa',
+            'service_name': 'Hair Cut & Style',
+            'booking_date': f'2026-11-{i % 28 + 1:02d}',
+            'start_time': f'{9 + i % 9:02d}:00',
+            'end_time': f'{10 + i % 9:02d}:00',
+            'number_of_persons': 1 + i % 3,
+            'total_amount': 45.0 + i % 10,
+            'amount': 20.0,
+        }
+
+
+def measure(render, rows):
+    started = time.perf_counter()
+    for variables in rows:
+        render(variables)
+    return len(rows) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare naive and compiled message template rendering')
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--template', choices=list(DEFAULT_TEMPLATES), default='booking_reminder')
+    args = parser.parse_args()
+
+    rows = list(recipients(args.messages))
+    source = DEFAULT_TEMPLATES[args.template]['body']
+    template_set = message_templates.get(args.template)
+
+    naive_rate = measure(lambda variables: naive_render(source, variables), rows)
+    compiled_rate = measure(template_set.body.render, rows)
+    lookup_rate = measure(lambda variables: message_templates.get(args.template).render(variables), rows)
+
+    print(f"Template: {args.template}, {args.messages} messages")
+    print(f"  str.replace per variable:   {naive_rate:12,.0f} msg/s")
+    print(f"  compiled body:              {compiled_rate:12,.0f} msg/s ({compiled_rate / naive_rate:.1f}x)")
+    print(f"  lookup + subject + body:    {lookup_rate:12,.0f} msg/s")
+
+
+if __name__ == '__main__':
+    main()
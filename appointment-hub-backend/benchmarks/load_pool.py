@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Connection pool load test
+
+Drives DB-backed public endpoints from many threads inside one worker process
+and checks the pool never times out a checkout. Run it with the same pool
+settings as production, e.g.:
+
+    DB_POOL_SIZE=5 DB_MAX_OVERFLOW=5 python benchmarks/load_pool.py --concurrency 8
+
+Pass DATABASE_URL=postgresql://... to test against a local Postgres instead of
+a throwaway SQLite file; that database must already be migrated and seeded.
+Exits non-zero if the pool was exhausted.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+ENDPOINTS = [
+    '/api/stores',
+    '/api/stores/bella-salon-spa',
+    '/api/subscription-plans',
+    '/health/db'
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the SQLAlchemy connection pool')
+    parser.add_argument('--requests', type=int, default=2000, help='Total number of requests')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Concurrent threads (gunicorn --threads per worker is the target)')
+    args = parser.parse_args()
+
+    db_file = None
+    if not os.environ.get('DATABASE_URL'):
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+    os.environ['FLASK_ENV'] = 'production'
+
+    from src.main import app, db
+    from src.utils.db_pool import get_pool_stats
+
+    if db_file:
+        from flask_migrate import upgrade
+        from init_demo_data import init_demo_data
+        with app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+            init_demo_data(db)
+
+    statuses = {}
+
+    def hit(i):
+        with app.test_client() as client:
+            return client.get(ENDPOINTS[i % len(ENDPOINTS)]).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for status in pool.map(hit, range(args.requests)):
+            statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stats = get_pool_stats(db.engine)
+
+    print(f"Requests:      {args.requests} (concurrency {args.concurrency})")
+    print(f"Status codes:  {statuses}")
+    print(f"Throughput:    {args.requests / elapsed:.1f} req/s")
+    for key, value in stats.items():
+        print(f"{key + ':':<18} {value}")
+
+    if db_file:
+        os.unlink(db_file.name)
+
+    exhausted = stats.get('checkout_timeouts', 0) > 0
+    print('RESULT: pool exhausted' if exhausted else 'RESULT: no pool exhaustion')
+    sys.exit(1 if exhausted else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration
+
+Loaded automatically from the working directory; command line flags in the
+Dockerfile still take precedence.
+"""
+
+import os
+import shutil
+
+def on_starting(server):
+    """Start every master with an empty Prometheus multiprocess directory"""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop live gauges of workers that have exited"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+# Import the app once in the master and fork workers from it, so module and
+# app setup is shared copy-on-write instead of repeated in every worker
+preload_app = True
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master after a preload"""
+    if not server.cfg.preload_app:
+        return
+    from src.main import app
+    from src.models import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def post_worker_init(worker):
+    """Load subscription plans and subscribe to their invalidations before serving"""
+    from src.main import app
+    from src.utils.plan_cache import plan_cache
+    with app.app_context():
+        try:
+            plan_cache.warm()
+        except Exception as e:
+            print(f"Plan cache warm-up failed, plans load on first use: {e}")
@@ -4,10 +4,10 @@ Initialize demo data for the appointment management system
 
 from src.models.user import User, UserRole
 from src.models.store import Store
-from src.models.service import Service
+from src.models.service import Service, PriceType
 from src.models.booking import Booking, BookingStatus, BookingPaymentStatus
 from src.models.payment import Payment, PaymentStatus
-from src.models.subscription import SubscriptionPlan, Subscription, SubscriptionInterval
+from src.models.subscription import SubscriptionPlan, Subscription, SubscriptionInterval, SubscriptionStatus
 from datetime import datetime, timedelta, date, time
 
 def init_demo_data(db):
@@ -109,7 +109,7 @@ def init_demo_data(db):
     store_subscription = Subscription(
         store_id=demo_store.id,
         plan_id=professional_plan.id,
-        status='active',
+        status=SubscriptionStatus.ACTIVE,
         current_period_start=datetime.utcnow(),
         current_period_end=datetime.utcnow() + timedelta(days=30),
         stripe_subscription_id='sub_demo_123'
@@ -123,42 +123,42 @@ def init_demo_data(db):
         Service(
             name='Hair Cut & Style',
             description='Professional haircut with styling',
-            duration=60,
-            price=65.00,
-            store_id=demo_store.id,
-            is_active=True
+            duration_minutes=60,
+            price_type=PriceType.FIXED,
+            base_price_amount=65.00,
+            store_id=demo_store.id
         ),
         Service(
             name='Hair Color',
             description='Full hair coloring service',
-            duration=120,
-            price=95.00,
-            store_id=demo_store.id,
-            is_active=True
+            duration_minutes=120,
+            price_type=PriceType.FIXED,
+            base_price_amount=95.00,
+            store_id=demo_store.id
         ),
         Service(
             name='Manicure',
             description='Classic manicure with nail polish',
-            duration=45,
-            price=35.00,
-            store_id=demo_store.id,
-            is_active=True
+            duration_minutes=45,
+            price_type=PriceType.FIXED,
+            base_price_amount=35.00,
+            store_id=demo_store.id
         ),
         Service(
             name='Facial Treatment',
             description='Deep cleansing facial with moisturizing',
-            duration=75,
-            price=80.00,
-            store_id=demo_store.id,
-            is_active=True
+            duration_minutes=75,
+            price_type=PriceType.FIXED,
+            base_price_amount=80.00,
+            store_id=demo_store.id
         ),
         Service(
             name='Massage Therapy',
             description='Relaxing full body massage',
-            duration=90,
-            price=100.00,
-            store_id=demo_store.id,
-            is_active=True
+            duration_minutes=90,
+            price_type=PriceType.FIXED,
+            base_price_amount=100.00,
+            store_id=demo_store.id
         )
     ]
     
@@ -217,6 +217,29 @@ def init_demo_data(db):
     db.session.add_all(client_users)
     db.session.commit()
 
+    # Create managers for the additional stores (a manager runs exactly one store)
+    additional_managers = [
+        User(
+            email='fitness.manager@demo.com',
+            password_hash=User.hash_password('password123'),
+            first_name='Nikos',
+            last_name='Georgiou',
+            role=UserRole.STORE_MANAGER,
+            phone_number='+30 123 456 7893'
+        ),
+        User(
+            email='spa.manager@demo.com',
+            password_hash=User.hash_password('password123'),
+            first_name='Maria',
+            last_name='Konstantinou',
+            role=UserRole.STORE_MANAGER,
+            phone_number='+30 123 456 7894'
+        )
+    ]
+
+    db.session.add_all(additional_managers)
+    db.session.commit()
+
     # Create additional stores
     additional_stores = [
         Store(
@@ -230,7 +253,7 @@ def init_demo_data(db):
             phone_number='+30 210 987 6543',
             email='info@athensfitness.gr',
             website='https://athensfitness.gr',
-            manager_user_id=manager_user.id,  # Same manager for demo
+            manager_user_id=additional_managers[0].id,
             is_active=True,
             business_hours={
                 'monday': {'open': '06:00', 'close': '22:00'},
@@ -253,7 +276,7 @@ def init_demo_data(db):
             phone_number='+30 210 555 1234',
             email='spa@wellnessretreat.gr',
             website='https://wellnessretreat.gr',
-            manager_user_id=manager_user.id,  # Same manager for demo
+            manager_user_id=additional_managers[1].id,
             is_active=True,
             business_hours={
                 'monday': {'open': '10:00', 'close': '20:00'},
@@ -275,26 +298,26 @@ def init_demo_data(db):
         Service(
             name='Personal Training Session',
             description='One-on-one personal training',
-            duration=60,
-            price=80.00,
-            store_id=additional_stores[0].id,
-            is_active=True
+            duration_minutes=60,
+            price_type=PriceType.FIXED,
+            base_price_amount=80.00,
+            store_id=additional_stores[0].id
         ),
         Service(
             name='Group Fitness Class',
             description='High-intensity group workout',
-            duration=45,
-            price=25.00,
-            store_id=additional_stores[0].id,
-            is_active=True
+            duration_minutes=45,
+            price_type=PriceType.FIXED,
+            base_price_amount=25.00,
+            store_id=additional_stores[0].id
         ),
         Service(
             name='Nutrition Consultation',
             description='Personalized nutrition planning',
-            duration=30,
-            price=60.00,
-            store_id=additional_stores[0].id,
-            is_active=True
+            duration_minutes=30,
+            price_type=PriceType.FIXED,
+            base_price_amount=60.00,
+            store_id=additional_stores[0].id
         )
     ]
 
@@ -302,26 +325,26 @@ def init_demo_data(db):
         Service(
             name='Swedish Massage',
             description='Relaxing full body massage',
-            duration=90,
-            price=120.00,
-            store_id=additional_stores[1].id,
-            is_active=True
+            duration_minutes=90,
+            price_type=PriceType.FIXED,
+            base_price_amount=120.00,
+            store_id=additional_stores[1].id
         ),
         Service(
             name='Hot Stone Therapy',
             description='Therapeutic hot stone massage',
-            duration=75,
-            price=140.00,
-            store_id=additional_stores[1].id,
-            is_active=True
+            duration_minutes=75,
+            price_type=PriceType.FIXED,
+            base_price_amount=140.00,
+            store_id=additional_stores[1].id
         ),
         Service(
             name='Aromatherapy Session',
             description='Essential oils and relaxation',
-            duration=60,
-            price=85.00,
-            store_id=additional_stores[1].id,
-            is_active=True
+            duration_minutes=60,
+            price_type=PriceType.FIXED,
+            base_price_amount=85.00,
+            store_id=additional_stores[1].id
         )
     ]
 
@@ -449,8 +472,8 @@ def init_demo_data(db):
                 status=PaymentStatus.SUCCEEDED,
                 payment_method='card',
                 payment_date=datetime.utcnow() - timedelta(days=1),
-                stripe_charge_id=f'ch_demo_{booking.id[:8]}',
-                stripe_payment_intent_id=f'pi_demo_{booking.id[:8]}'
+                stripe_charge_id=f'ch_demo_{booking.id[-12:]}',
+                stripe_payment_intent_id=f'pi_demo_{booking.id[-12:]}'
             )
             payments.append(payment)
 
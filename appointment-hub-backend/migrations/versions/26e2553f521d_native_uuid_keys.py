@@ -0,0 +1,133 @@
+"""native uuid keys
+
+Revision ID: 26e2553f521d
+Revises: 7b75f1a9edf9
+Create Date: 2026-10-19 00:40:43.884932
+
+Converts every id and id reference from VARCHAR(36) text to a native uuid
+column on PostgreSQL and a 16-byte BLOB on SQLite (src.models.types.GUID).
+
+PostgreSQL rewrites each table under an ACCESS EXCLUSIVE lock, so run this in
+a maintenance window on large databases. The SQLite conversion needs a live
+connection (no --sql mode).
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '26e2553f521d'
+down_revision = '7b75f1a9edf9'
+branch_labels = None
+depends_on = None
+
+UUID_COLUMNS = {
+    'subscription_plans': ['id'],
+    'users': ['id', 'store_id'],
+    'stores': ['id', 'manager_user_id', 'current_subscription_plan_id'],
+    'calendars': ['id', 'store_id'],
+    'calendar_slots': ['id', 'calendar_id'],
+    'services': ['id', 'store_id'],
+    'subscriptions': ['id', 'store_id', 'plan_id'],
+    'bookings': ['id', 'store_id', 'client_user_id', 'service_id'],
+    'notifications': ['id', 'store_id', 'recipient_user_id', 'booking_id'],
+    'payments': ['id', 'store_id', 'user_id', 'booking_id', 'subscription_id'],
+}
+
+# (table, column, referenced table) - PostgreSQL cannot change the type of a
+# referenced key while the constraint exists
+FOREIGN_KEYS = [
+    ('stores', 'manager_user_id', 'users'),
+    ('stores', 'current_subscription_plan_id', 'subscription_plans'),
+    ('calendars', 'store_id', 'stores'),
+    ('calendar_slots', 'calendar_id', 'calendars'),
+    ('services', 'store_id', 'stores'),
+    ('subscriptions', 'store_id', 'stores'),
+    ('subscriptions', 'plan_id', 'subscription_plans'),
+    ('bookings', 'store_id', 'stores'),
+    ('bookings', 'client_user_id', 'users'),
+    ('bookings', 'service_id', 'services'),
+    ('notifications', 'store_id', 'stores'),
+    ('notifications', 'recipient_user_id', 'users'),
+    ('notifications', 'booking_id', 'bookings'),
+    ('payments', 'store_id', 'stores'),
+    ('payments', 'user_id', 'users'),
+    ('payments', 'booking_id', 'bookings'),
+    ('payments', 'subscription_id', 'subscriptions'),
+]
+
+
+def _uuid_to_bytes(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _bytes_to_uuid(value):
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+
+def _convert_sqlite(function):
+    """Rewrite the stored ids in place before the declared types change.
+
+    SQLite keeps a BLOB as-is in a TEXT-affinity column (and text in a BLOB
+    column), so the values are converted first and the batch table copy
+    afterwards leaves them untouched.
+    """
+    bind = op.get_bind()
+    bind.connection.driver_connection.create_function('convert_uuid', 1, function, deterministic=True)
+    for table, columns in UUID_COLUMNS.items():
+        assignments = ', '.join(f'{column} = convert_uuid({column})' for column in columns)
+        bind.exec_driver_sql(f'UPDATE {table} SET {assignments}')
+
+
+def _change_types(old_type, new_type, using):
+    """Change every id column on PostgreSQL, dropping and restoring the foreign keys"""
+    for table, column, _ in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, existing_type=old_type, type_=new_type,
+                            postgresql_using=f'{column}::{using}')
+    for table, column, referenced in FOREIGN_KEYS:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referenced, [column], ['id'])
+
+
+def _batch_change_types(old_type, new_type):
+    """Recreate the SQLite tables with the new declared types.
+
+    The copy re-adds indexes in arbitrary order, and without statistics SQLite
+    breaks ties between equally good indexes by that order (e.g. picking
+    ix_payments_status over ix_payments_user_id), so they are rebuilt in their
+    original order afterwards.
+    """
+    bind = op.get_bind()
+    for table, columns in UUID_COLUMNS.items():
+        indexes = bind.exec_driver_sql(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+            "AND sql IS NOT NULL ORDER BY rowid", (table,)
+        ).fetchall()
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=old_type, type_=new_type)
+        for name, _ in indexes:
+            op.drop_index(name, table_name=table)
+        for _, sql in indexes:
+            bind.exec_driver_sql(sql)
+
+
+def upgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        _change_types(sa.String(length=36), postgresql.UUID(as_uuid=False), 'uuid')
+    else:
+        _convert_sqlite(_uuid_to_bytes)
+        _batch_change_types(sa.String(length=36), sa.LargeBinary(length=16))
+
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        _change_types(postgresql.UUID(as_uuid=False), sa.String(length=36), 'varchar(36)')
+    else:
+        _convert_sqlite(_bytes_to_uuid)
+        _batch_change_types(sa.LargeBinary(length=16), sa.String(length=36))
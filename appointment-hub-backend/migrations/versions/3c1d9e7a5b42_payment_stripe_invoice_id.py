@@ -0,0 +1,30 @@
+"""payment stripe_invoice_id
+
+Revision ID: 3c1d9e7a5b42
+Revises: f7cc233caa0e
+Create Date: 2026-10-19 03:12:40.518203
+
+Adds payments.stripe_invoice_id so subscription payments recorded from
+invoice webhooks are found again when Stripe redelivers the event. The column
+is added in place with a unique index rather than a constraint, so SQLite
+doesn't rebuild the table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1d9e7a5b42'
+down_revision = 'f7cc233caa0e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('payments', sa.Column('stripe_invoice_id', sa.String(length=255), nullable=True))
+    op.create_index('ix_payments_stripe_invoice_id', 'payments', ['stripe_invoice_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_payments_stripe_invoice_id', table_name='payments')
+    op.drop_column('payments', 'stripe_invoice_id')
@@ -0,0 +1,42 @@
+"""store usage
+
+Revision ID: 5d8a1c3e9f20
+Revises: 9e4b2f6c1a07
+Create Date: 2026-10-19 05:12:40.318205
+
+Adds store_usage, the per-store counters src/utils/plan_limits.py checks
+subscription plan limits against (bookings and notifications per calendar
+month, services in total). The counters start empty;
+`flask reconcile-usage` fills in the current period from the existing rows.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8a1c3e9f20'
+down_revision = '9e4b2f6c1a07'
+branch_labels = None
+depends_on = None
+
+
+def _uuid():
+    """Same storage as src.models.types.GUID"""
+    return sa.LargeBinary(length=16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def upgrade():
+    op.create_table('store_usage',
+    sa.Column('store_id', _uuid(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('store_id', 'metric', 'period')
+    )
+
+
+def downgrade():
+    op.drop_table('store_usage')
@@ -0,0 +1,44 @@
+"""message templates
+
+Revision ID: 64849eaf0684
+Revises: a8b4dd69760c
+Create Date: 2026-10-19 01:41:27.948619
+
+Adds message_templates, the per-store overrides of the built-in notification
+wording in src/utils/message_templates.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '64849eaf0684'
+down_revision = 'a8b4dd69760c'
+branch_labels = None
+depends_on = None
+
+
+def _uuid():
+    """Same storage as src.models.types.GUID"""
+    return sa.LargeBinary(length=16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def upgrade():
+    op.create_table('message_templates',
+    sa.Column('id', _uuid(), nullable=False),
+    sa.Column('store_id', _uuid(), nullable=False),
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('locale', sa.String(length=10), nullable=False),
+    sa.Column('subject', sa.String(length=500), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('store_id', 'key', 'locale', name='uq_message_templates_store_id_key_locale')
+    )
+
+
+def downgrade():
+    op.drop_table('message_templates')
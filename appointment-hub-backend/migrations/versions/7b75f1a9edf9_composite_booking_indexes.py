@@ -0,0 +1,65 @@
+"""composite booking indexes
+
+Revision ID: 7b75f1a9edf9
+Revises: 18d810e1c3c4
+Create Date: 2026-10-19 00:26:43.597017
+
+"""
+from contextlib import nullcontext
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b75f1a9edf9'
+down_revision = '18d810e1c3c4'
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = [
+    ('ix_bookings_store_id_booking_date', 'bookings', ['store_id', 'booking_date'], {}),
+    ('ix_bookings_store_id_status_booking_date', 'bookings', ['store_id', 'status', 'booking_date'], {}),
+    ('ix_bookings_store_id_created_at', 'bookings', ['store_id', 'created_at'], {}),
+    ('ix_bookings_client_user_id_created_at', 'bookings', ['client_user_id', 'created_at'], {}),
+    ('ix_bookings_service_id_booking_date_start_time', 'bookings', ['service_id', 'booking_date', 'start_time'], {}),
+    ('ix_bookings_created_at', 'bookings', ['created_at'], {}),
+    ('ix_payments_booking_id_status', 'payments', ['booking_id', 'status'], {}),
+    ('ix_notifications_external_message_id', 'notifications', ['external_message_id'], {
+        'postgresql_where': sa.text('external_message_id IS NOT NULL'),
+        'sqlite_where': sa.text('external_message_id IS NOT NULL'),
+    }),
+]
+
+# Single-column indexes that are now the leading column of a composite index
+REDUNDANT_INDEXES = [
+    ('ix_bookings_store_id', 'bookings', ['store_id']),
+    ('ix_bookings_client_user_id', 'bookings', ['client_user_id']),
+    ('ix_bookings_service_id', 'bookings', ['service_id']),
+    ('ix_payments_booking_id', 'payments', ['booking_id']),
+]
+
+
+def _concurrently():
+    """Build indexes without blocking writes on PostgreSQL (outside a transaction)"""
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        # Create the replacements before dropping anything so queries never lose coverage
+        for name, table, columns, kwargs in NEW_INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=concurrently, **kwargs)
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently)
+
+
+def downgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=concurrently)
+        for name, table, columns, kwargs in reversed(NEW_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently)
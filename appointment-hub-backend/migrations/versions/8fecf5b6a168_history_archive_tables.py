@@ -0,0 +1,144 @@
+"""history archive tables
+
+Revision ID: 8fecf5b6a168
+Revises: 26e2553f521d
+Create Date: 2026-10-19 01:19:09.450432
+
+Adds bookings_archive and notifications_archive, filled by
+`flask archive-history`, and drops the payments.booking_id foreign key because
+a payment's booking may now live in either table. Downgrading moves archived
+rows back into the live tables first.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8fecf5b6a168'
+down_revision = '26e2553f521d'
+branch_labels = None
+depends_on = None
+
+BOOKING_COLUMNS = [
+    'id', 'store_id', 'client_user_id', 'service_id', 'booking_date', 'start_time', 'end_time',
+    'number_of_persons', 'status', 'total_amount', 'advance_payment_amount', 'payment_status',
+    'calendly_event_uri', 'created_at', 'updated_at',
+]
+NOTIFICATION_COLUMNS = [
+    'id', 'store_id', 'recipient_user_id', 'booking_id', 'type', 'subject', 'body', 'status',
+    'external_message_id', 'sent_at', 'created_at', 'updated_at',
+]
+
+# Lets batch mode name the unnamed SQLite foreign key so it can be dropped
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _uuid():
+    """Same storage as src.models.types.GUID"""
+    return sa.LargeBinary(length=16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def _existing_enum(*values, name):
+    """Reuse the enum type the live table already created on PostgreSQL"""
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def _rebuild_payments(operation):
+    """Apply a batch operation to payments on SQLite, keeping the index order.
+
+    Without statistics SQLite breaks ties between equally good indexes by the
+    order they were created in (see 26e2553f521d).
+    """
+    bind = op.get_bind()
+    indexes = bind.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'payments' "
+        "AND sql IS NOT NULL ORDER BY rowid"
+    ).fetchall()
+    with op.batch_alter_table('payments', recreate='always', naming_convention=NAMING_CONVENTION) as batch_op:
+        operation(batch_op)
+    for name, _ in indexes:
+        op.drop_index(name, table_name='payments')
+    for _, sql in indexes:
+        bind.exec_driver_sql(sql)
+
+
+def upgrade():
+    op.create_table('bookings_archive',
+    sa.Column('id', _uuid(), nullable=False),
+    sa.Column('store_id', _uuid(), nullable=False),
+    sa.Column('client_user_id', _uuid(), nullable=False),
+    sa.Column('service_id', _uuid(), nullable=False),
+    sa.Column('booking_date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('number_of_persons', sa.Integer(), nullable=False),
+    sa.Column('status', _existing_enum('PENDING', 'CONFIRMED', 'CANCELLED', 'COMPLETED', 'RESCHEDULED', name='bookingstatus'), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('advance_payment_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('payment_status', _existing_enum('UNPAID', 'PARTIAL', 'PAID', 'REFUNDED', name='bookingpaymentstatus'), nullable=False),
+    sa.Column('calendly_event_uri', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['client_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bookings_archive_store_id_booking_date', 'bookings_archive', ['store_id', 'booking_date'], unique=False)
+    op.create_index('ix_bookings_archive_client_user_id_booking_date', 'bookings_archive', ['client_user_id', 'booking_date'], unique=False)
+    op.create_index('ix_bookings_archive_booking_date', 'bookings_archive', ['booking_date'], unique=False)
+
+    op.create_table('notifications_archive',
+    sa.Column('id', _uuid(), nullable=False),
+    sa.Column('store_id', _uuid(), nullable=False),
+    sa.Column('recipient_user_id', _uuid(), nullable=False),
+    sa.Column('booking_id', _uuid(), nullable=True),
+    sa.Column('type', _existing_enum('EMAIL', 'SMS', name='notificationtype'), nullable=False),
+    sa.Column('subject', sa.String(length=500), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', _existing_enum('SENT', 'FAILED', 'DELIVERED', 'READ', name='notificationstatus'), nullable=False),
+    sa.Column('external_message_id', sa.String(length=255), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['recipient_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_archive_store_id_sent_at', 'notifications_archive', ['store_id', 'sent_at'], unique=False)
+    op.create_index('ix_notifications_archive_recipient_user_id_sent_at', 'notifications_archive', ['recipient_user_id', 'sent_at'], unique=False)
+    op.create_index('ix_notifications_archive_sent_at', 'notifications_archive', ['sent_at'], unique=False)
+
+    if op.get_context().dialect.name == 'postgresql':
+        op.drop_constraint('payments_booking_id_fkey', 'payments', type_='foreignkey')
+    else:
+        _rebuild_payments(lambda batch_op: batch_op.drop_constraint(
+            'fk_payments_booking_id_bookings', type_='foreignkey'))
+
+
+def downgrade():
+    # Bring archived history back before the tables go (bookings first, notifications reference them)
+    booking_columns = ', '.join(BOOKING_COLUMNS)
+    notification_columns = ', '.join(NOTIFICATION_COLUMNS)
+    op.execute(f'INSERT INTO bookings ({booking_columns}) SELECT {booking_columns} FROM bookings_archive')
+    op.execute(f'INSERT INTO notifications ({notification_columns}) SELECT {notification_columns} FROM notifications_archive')
+
+    if op.get_context().dialect.name == 'postgresql':
+        op.create_foreign_key('payments_booking_id_fkey', 'payments', 'bookings', ['booking_id'], ['id'])
+    else:
+        _rebuild_payments(lambda batch_op: batch_op.create_foreign_key(
+            'fk_payments_booking_id_bookings', 'bookings', ['booking_id'], ['id']))
+
+    op.drop_index('ix_notifications_archive_sent_at', table_name='notifications_archive')
+    op.drop_index('ix_notifications_archive_recipient_user_id_sent_at', table_name='notifications_archive')
+    op.drop_index('ix_notifications_archive_store_id_sent_at', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.drop_index('ix_bookings_archive_booking_date', table_name='bookings_archive')
+    op.drop_index('ix_bookings_archive_client_user_id_booking_date', table_name='bookings_archive')
+    op.drop_index('ix_bookings_archive_store_id_booking_date', table_name='bookings_archive')
+    op.drop_table('bookings_archive')
@@ -0,0 +1,73 @@
+"""booking amount_paid
+
+Revision ID: 9e4b2f6c1a07
+Revises: 3c1d9e7a5b42
+Create Date: 2026-10-19 04:05:12.731946
+
+Adds amount_paid to bookings and bookings_archive: the sum of a booking's
+succeeded payments, kept together with payment_status by
+src/utils/booking_payments.py so revenue and unpaid-booking queries read
+bookings alone. Existing rows are backfilled from payments; bookings without
+payments keep the payment_status they were given by hand.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b2f6c1a07'
+down_revision = '3c1d9e7a5b42'
+branch_labels = None
+depends_on = None
+
+PAYMENT_STATUS = ('UNPAID', 'PARTIAL', 'PAID', 'REFUNDED')
+
+
+def _existing_enum(*values, name):
+    """Reuse the enum type the live table already created on PostgreSQL"""
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def _backfill(table_name):
+    status_type = _existing_enum(*PAYMENT_STATUS, name='bookingpaymentstatus')
+    bookings = sa.table(table_name, sa.column('id'), sa.column('total_amount'), sa.column('amount_paid'),
+                        sa.column('payment_status', status_type))
+    payments = sa.table('payments', sa.column('booking_id'), sa.column('amount'), sa.column('status'))
+
+    def payments_with(*statuses):
+        return sa.exists().where(payments.c.booking_id == bookings.c.id, payments.c.status.in_(statuses))
+
+    op.execute(bookings.update().where(payments_with('SUCCEEDED')).values(
+        amount_paid=sa.select(sa.func.sum(payments.c.amount)).where(
+            payments.c.booking_id == bookings.c.id, payments.c.status == 'SUCCEEDED'
+        ).scalar_subquery()
+    ))
+
+    def status(value):
+        return sa.cast(sa.literal(value), status_type)
+
+    op.execute(bookings.update().where(payments_with('SUCCEEDED', 'REFUNDED')).values(
+        payment_status=sa.case(
+            (sa.and_(bookings.c.amount_paid > 0, bookings.c.amount_paid >= bookings.c.total_amount), status('PAID')),
+            (bookings.c.amount_paid > 0, status('PARTIAL')),
+            else_=status('REFUNDED')
+        )
+    ))
+
+
+def upgrade():
+    op.add_column('bookings', sa.Column('amount_paid', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+    op.add_column('bookings_archive', sa.Column('amount_paid', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+    _backfill('bookings')
+    _backfill('bookings_archive')
+    op.create_index('ix_bookings_store_id_payment_status_booking_date', 'bookings',
+                    ['store_id', 'payment_status', 'booking_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_bookings_store_id_payment_status_booking_date', table_name='bookings')
+    op.drop_column('bookings_archive', 'amount_paid')
+    op.drop_column('bookings', 'amount_paid')
@@ -0,0 +1,47 @@
+"""user invites
+
+Revision ID: a8b4dd69760c
+Revises: 8fecf5b6a168
+Create Date: 2026-10-19 01:37:42.154547
+
+Adds user_invites, the one-time password tokens handed out by the bulk client
+import (POST /api/users/import).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8b4dd69760c'
+down_revision = '8fecf5b6a168'
+branch_labels = None
+depends_on = None
+
+
+def _uuid():
+    """Same storage as src.models.types.GUID"""
+    return sa.LargeBinary(length=16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def upgrade():
+    op.create_table('user_invites',
+    sa.Column('id', _uuid(), nullable=False),
+    sa.Column('user_id', _uuid(), nullable=False),
+    sa.Column('store_id', _uuid(), nullable=True),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('accepted_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token_hash'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index('ix_user_invites_store_id', 'user_invites', ['store_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_invites_store_id', table_name='user_invites')
+    op.drop_table('user_invites')
@@ -0,0 +1,44 @@
+"""subscription period index
+
+Revision ID: b7e3a91d4c58
+Revises: 5d8a1c3e9f20
+Create Date: 2026-10-19 09:41:17.502866
+
+Adds the (status, current_period_end) index `flask process-subscriptions`
+uses to find subscriptions whose period ended, and past-due ones whose grace
+period ran out, with range scans instead of reading the whole table. Partial:
+only locally billed subscriptions are renewed by the job, Stripe moves the
+ones with a stripe_subscription_id.
+"""
+from contextlib import nullcontext
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3a91d4c58'
+down_revision = '5d8a1c3e9f20'
+branch_labels = None
+depends_on = None
+
+
+def _concurrently():
+    """Build indexes without blocking writes on PostgreSQL (outside a transaction)"""
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        op.create_index('ix_subscriptions_status_current_period_end', 'subscriptions',
+                        ['status', 'current_period_end'], unique=False, postgresql_concurrently=concurrently,
+                        postgresql_where=sa.text('stripe_subscription_id IS NULL'),
+                        sqlite_where=sa.text('stripe_subscription_id IS NULL'))
+
+
+def downgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        op.drop_index('ix_subscriptions_status_current_period_end', table_name='subscriptions',
+                      postgresql_concurrently=concurrently)
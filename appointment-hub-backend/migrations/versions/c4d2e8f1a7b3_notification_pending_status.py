@@ -0,0 +1,33 @@
+"""notification pending status
+
+Revision ID: c4d2e8f1a7b3
+Revises: b7e3a91d4c58
+Create Date: 2026-10-19 14:12:36.184259
+
+Adds PENDING to the notification status enum: `flask process-subscriptions`
+queues its emails as PENDING notifications in the transaction that moves the
+subscriptions, and `flask send-notifications` sends them. SQLite stores the
+enum as plain text and needs no change.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d2e8f1a7b3'
+down_revision = 'b7e3a91d4c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        # ALTER TYPE ... ADD VALUE cannot be used in the transaction that added it
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE notificationstatus ADD VALUE IF NOT EXISTS 'PENDING'")
+
+
+def downgrade():
+    # PostgreSQL cannot drop an enum value; unsent notifications are marked failed instead
+    for table in ('notifications', 'notifications_archive'):
+        op.execute(sa.text(f"UPDATE {table} SET status = 'FAILED' WHERE status = 'PENDING'"))
@@ -0,0 +1,39 @@
+"""users lower email index
+
+Revision ID: d9a3f6b2c815
+Revises: c4d2e8f1a7b3
+Create Date: 2026-10-19 15:03:48.627114
+
+The client import matches existing accounts on lower(email), so an address
+registered as Maria@Example.com is found for maria@example.com. The unique
+index on email does not serve that comparison; this expression index does.
+"""
+from contextlib import nullcontext
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3f6b2c815'
+down_revision = 'c4d2e8f1a7b3'
+branch_labels = None
+depends_on = None
+
+
+def _concurrently():
+    """Build indexes without blocking writes on PostgreSQL (outside a transaction)"""
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')], unique=False,
+                        postgresql_concurrently=concurrently)
+
+
+def downgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        op.drop_index('ix_users_lower_email', table_name='users', postgresql_concurrently=concurrently)
@@ -0,0 +1,76 @@
+"""backfill subscription periods
+
+Revision ID: e6b1c4a8d273
+Revises: d9a3f6b2c815
+Create Date: 2026-10-19 17:26:09.318427
+
+Subscriptions created before the periods were set on subscribe/upgrade have
+no current_period_start/end, and `flask process-subscriptions` (which finds
+its work by current_period_end) would never renew, bill or end them. Each
+live locally billed one gets the period of its plan that contains now,
+counted from its start_date; months keep the start day like the job does.
+"""
+import calendar
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b1c4a8d273'
+down_revision = 'd9a3f6b2c815'
+branch_labels = None
+depends_on = None
+
+LIVE_STATUSES = ('ACTIVE', 'TRIALING', 'PAST_DUE')
+BATCH_SIZE = 1000
+
+subscriptions = sa.table(
+    'subscriptions',
+    sa.column('id'), sa.column('plan_id'), sa.column('status', sa.String), sa.column('start_date', sa.DateTime),
+    sa.column('current_period_start', sa.DateTime), sa.column('current_period_end', sa.DateTime),
+    sa.column('stripe_subscription_id', sa.String),
+)
+plans = sa.table('subscription_plans', sa.column('id'), sa.column('interval', sa.String))
+
+
+def _add_interval(when, interval, anchor_day):
+    """Same as subscription_renewals.add_interval, frozen here for the migration"""
+    months = 12 if interval == 'YEAR' else 1
+    month = when.month - 1 + months
+    year, month = when.year + month // 12, month % 12 + 1
+    return when.replace(year=year, month=month, day=min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def upgrade():
+    connection = op.get_bind()
+    now = datetime.utcnow()
+    rows = connection.execute(
+        sa.select(subscriptions.c.id, subscriptions.c.start_date, plans.c.interval)
+        .join(plans, plans.c.id == subscriptions.c.plan_id)
+        .where(
+            subscriptions.c.current_period_end.is_(None),
+            subscriptions.c.stripe_subscription_id.is_(None),
+            subscriptions.c.status.in_(LIVE_STATUSES),
+        )
+    ).all()
+
+    periods = []
+    for row in rows:
+        start = row.start_date
+        end = _add_interval(start, row.interval, start.day)
+        while end <= now:
+            start, end = end, _add_interval(end, row.interval, row.start_date.day)
+        periods.append({'b_id': row.id, 'b_start': start, 'b_end': end})
+
+    statement = subscriptions.update().where(subscriptions.c.id == sa.bindparam('b_id')).values(
+        current_period_start=sa.bindparam('b_start'), current_period_end=sa.bindparam('b_end')
+    )
+    for offset in range(0, len(periods), BATCH_SIZE):
+        connection.execute(statement, periods[offset:offset + BATCH_SIZE])
+
+
+def downgrade():
+    # The backfilled periods are indistinguishable from real ones and harmless to keep
+    pass
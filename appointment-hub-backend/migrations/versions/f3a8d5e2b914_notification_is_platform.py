@@ -0,0 +1,32 @@
+"""notification is_platform
+
+Revision ID: f3a8d5e2b914
+Revises: e6b1c4a8d273
+Create Date: 2026-10-19 17:58:41.902316
+
+Marks notifications the platform sends to a store (subscription renewal and
+expiry emails) so `flask reconcile-usage` leaves them out of the store's
+notifications counter; only the store's own messaging goes through
+consume(). The archive table gets the column too, as archival copies rows
+column by column. A constant server default adds it without rewriting the
+table on PostgreSQL 11+.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8d5e2b914'
+down_revision = 'e6b1c4a8d273'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('notifications', 'notifications_archive'):
+        op.add_column(table, sa.Column('is_platform', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('notifications_archive', 'is_platform')
+    op.drop_column('notifications', 'is_platform')
@@ -0,0 +1,78 @@
+"""sms campaigns
+
+Revision ID: f7cc233caa0e
+Revises: 64849eaf0684
+Create Date: 2026-10-19 02:03:51.220914
+
+Adds campaigns (bulk SMS sent in batches by src/utils/campaigns.py) and a
+nullable campaign_id on notifications and notifications_archive. The columns
+are added in place, so the existing notification indexes keep their order.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7cc233caa0e'
+down_revision = '64849eaf0684'
+branch_labels = None
+depends_on = None
+
+
+def _uuid():
+    """Same storage as src.models.types.GUID"""
+    return sa.LargeBinary(length=16).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+
+
+def _existing_enum(*values, name):
+    """Reuse the enum type the live table already created on PostgreSQL"""
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def upgrade():
+    op.create_table('campaigns',
+    sa.Column('id', _uuid(), nullable=False),
+    sa.Column('store_id', _uuid(), nullable=False),
+    sa.Column('created_by_user_id', _uuid(), nullable=True),
+    sa.Column('type', _existing_enum('EMAIL', 'SMS', name='notificationtype'), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('audience', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', 'CANCELLED', name='campaignstatus'), nullable=False),
+    sa.Column('batch_size', sa.Integer(), nullable=False),
+    sa.Column('total_recipients', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('batches', sa.JSON(), nullable=False),
+    sa.Column('last_recipient_id', _uuid(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_campaigns_status', 'campaigns', ['status'], unique=False)
+    op.create_index('ix_campaigns_store_id_created_at', 'campaigns', ['store_id', 'created_at'], unique=False)
+
+    op.add_column('notifications', sa.Column('campaign_id', _uuid(), nullable=True))
+    op.create_index('ix_notifications_campaign_id', 'notifications', ['campaign_id'], unique=False,
+                    postgresql_where=sa.text('campaign_id IS NOT NULL'),
+                    sqlite_where=sa.text('campaign_id IS NOT NULL'))
+    op.add_column('notifications_archive', sa.Column('campaign_id', _uuid(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('notifications_archive', 'campaign_id')
+    op.drop_index('ix_notifications_campaign_id', table_name='notifications')
+    op.drop_column('notifications', 'campaign_id')
+
+    op.drop_index('ix_campaigns_store_id_created_at', table_name='campaigns')
+    op.drop_index('ix_campaigns_status', table_name='campaigns')
+    op.drop_table('campaigns')
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute('DROP TYPE campaignstatus')
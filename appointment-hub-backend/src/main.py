@@ -1,8 +1,10 @@
 import os
 import sys
+from datetime import datetime, timedelta
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import click
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from flask_migrate import Migrate
@@ -10,102 +12,329 @@ from flask_jwt_extended import JWTManager
 
 # Import all models to ensure they are registered with SQLAlchemy
 from src.models import (
-    db, User, Store, Service, Calendar, CalendarSlot, 
+    db, User, Store, Service, Calendar, CalendarSlot,
     Booking, Payment, SubscriptionPlan, Subscription, Notification
 )
 
-# Import routes
-from src.routes.user import user_bp
-from src.routes.auth import auth_bp
-from src.routes.store import store_bp
-from src.routes.service import service_bp
-from src.routes.booking import booking_bp
-from src.routes.payment import payment_bp
-from src.routes.subscription import subscription_bp
-from src.routes.notification import notification_bp
-from src.routes.dashboard import dashboard_bp
-
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-
-# Configuration
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
-
-# Database configuration - SQLite for deployment, PostgreSQL for production
-if os.environ.get('FLASK_ENV') == 'production' and os.environ.get('DATABASE_URL'):
-    # PostgreSQL configuration for production
-    database_url = os.environ.get('DATABASE_URL')
-    if database_url and database_url.startswith('postgres://'):
-        database_url = database_url.replace('postgres://', 'postgresql://', 1)
-    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-else:
-    # SQLite for development and deployment
-    db_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
-
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Initialize extensions
-db.init_app(app)
-migrate = Migrate(app, db)
-jwt = JWTManager(app)
-CORS(app, origins="*")  # Allow all origins for development
-
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(store_bp, url_prefix='/api')
-app.register_blueprint(service_bp, url_prefix='/api')
-app.register_blueprint(booking_bp, url_prefix='/api')
-app.register_blueprint(payment_bp, url_prefix='/api')
-app.register_blueprint(subscription_bp, url_prefix='/api')
-app.register_blueprint(notification_bp, url_prefix='/api')
-app.register_blueprint(dashboard_bp, url_prefix='/api')
-
-# Create database tables
-with app.app_context():
-    try:
-        db.create_all()
-        print("Database tables created successfully")
-        
-        # Initialize demo data for deployment
+from src.utils.token_blocklist import token_blocklist
+from src.utils.db_pool import build_engine_options, get_pool_stats
+from src.utils.db_routing import get_replica_bind, init_replica_routing
+from src.utils.metrics import init_metrics
+from src.utils.query_profiler import init_query_profiler
+from src.utils.nplusone import init_nplusone_guard
+from src.utils.password_hasher import check_password_hasher_config
+
+migrate = Migrate()
+jwt = JWTManager()
+
+
+def configure_app(app, config=None):
+    """Load settings from the environment, then apply explicit overrides"""
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(seconds=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 7 * 24 * 3600)))
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(seconds=int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 30 * 24 * 3600)))
+
+    # Password hashing - method/cost is tunable, stored hashes are upgraded on login
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_MAX_QUEUE'] = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 16))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Query profiling - opt-in per request (header or sampling), slow statements always logged
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 200))
+    app.config['QUERY_PROFILE_SAMPLE_RATE'] = float(os.environ.get('QUERY_PROFILE_SAMPLE_RATE', 0))
+    app.config['QUERY_PROFILE_HEADER_ENABLED'] = os.environ.get(
+        'QUERY_PROFILE_HEADER_ENABLED', 'false' if os.environ.get('FLASK_ENV') == 'production' else 'true'
+    ).lower() == 'true'
+
+    # N+1 guard - 'warn' or 'raise' when a relationship is lazily loaded in a loop
+    app.config['NPLUSONE_GUARD'] = os.environ.get(
+        'NPLUSONE_GUARD', 'off' if os.environ.get('FLASK_ENV') == 'production' else 'warn'
+    )
+    app.config['NPLUSONE_THRESHOLD'] = int(os.environ.get('NPLUSONE_THRESHOLD', 3))
+    app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')
+
+    # History archival - bookings/notifications older than this move to the *_archive tables
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+    app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', 1000))
+
+    # Bulk client import - rows per insert/commit, upload cap, invite token lifetime
+    app.config['CLIENT_IMPORT_CHUNK_SIZE'] = int(os.environ.get('CLIENT_IMPORT_CHUNK_SIZE', 500))
+    app.config['CLIENT_IMPORT_MAX_ROWS'] = int(os.environ.get('CLIENT_IMPORT_MAX_ROWS', 20000))
+    app.config['INVITE_TOKEN_TTL_DAYS'] = int(os.environ.get('INVITE_TOKEN_TTL_DAYS', 14))
+
+    # SMS campaigns - recipients per provider bulk call; without background sending
+    # campaigns wait for `flask run-campaigns` (e.g. a cron job or worker container)
+    app.config['CAMPAIGN_BATCH_SIZE'] = int(os.environ.get('CAMPAIGN_BATCH_SIZE', 1000))
+    app.config['CAMPAIGN_SEND_IN_BACKGROUND'] = os.environ.get('CAMPAIGN_SEND_IN_BACKGROUND', 'true').lower() == 'true'
+    app.config['CAMPAIGN_STALE_MINUTES'] = int(os.environ.get('CAMPAIGN_STALE_MINUTES', 10))
+
+    # Payment reconciliation against Stripe - how far back `flask reconcile-payments` looks
+    app.config['RECONCILE_LOOKBACK_DAYS'] = int(os.environ.get('RECONCILE_LOOKBACK_DAYS', 3))
+    app.config['RECONCILE_BATCH_SIZE'] = int(os.environ.get('RECONCILE_BATCH_SIZE', 500))
+
+    # Subscription renewals - days a past-due subscription has to pay before
+    # `flask process-subscriptions` ends it, subscriptions moved per transaction
+    app.config['SUBSCRIPTION_GRACE_DAYS'] = int(os.environ.get('SUBSCRIPTION_GRACE_DAYS', 7))
+    app.config['SUBSCRIPTION_BATCH_SIZE'] = int(os.environ.get('SUBSCRIPTION_BATCH_SIZE', 1000))
+
+    # Queued email notifications - sent and marked per transaction by `flask send-notifications`
+    app.config['NOTIFICATION_SEND_BATCH_SIZE'] = int(os.environ.get('NOTIFICATION_SEND_BATCH_SIZE', 100))
+
+    # Idempotency-Key - how long first responses are replayed, how long a running
+    # request holds its key, and how long a concurrent duplicate waits for it
+    app.config['IDEMPOTENCY_TTL_SECONDS'] = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600))
+    app.config['IDEMPOTENCY_LOCK_SECONDS'] = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+    app.config['IDEMPOTENCY_WAIT_SECONDS'] = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', 10))
+    
+    # Database configuration - SQLite for deployment, PostgreSQL for production
+    if os.environ.get('FLASK_ENV') == 'production' and os.environ.get('DATABASE_URL'):
+        # PostgreSQL configuration for production
+        database_url = os.environ.get('DATABASE_URL')
+        if database_url and database_url.startswith('postgres://'):
+            database_url = database_url.replace('postgres://', 'postgresql://', 1)
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    else:
+        # SQLite for development and deployment
+        db_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DATABASE_REPLICA_URL'] = os.environ.get('DATABASE_REPLICA_URL')
+
+    # Explicit settings (benchmarks, scripts) win over the environment
+    app.config.update(config or {})
+    check_password_hasher_config(app.config)
+
+    # Connection pool (per gunicorn worker) - sizes, recycle, pre-ping and statement timeout
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    # Optional read replica - GET requests read from it unless the client just wrote
+    replica_url = app.config['DATABASE_REPLICA_URL']
+    app.config.setdefault('SQLALCHEMY_BINDS', get_replica_bind(replica_url, build_engine_options(replica_url or '')))
+
+
+def register_blueprints(app):
+    """Import and register the API blueprints.
+
+    Route modules are only imported when an app is created, and import the
+    integration SDKs (stripe, requests) inside the handlers that use them.
+    """
+    from src.routes.user import user_bp
+    from src.routes.auth import auth_bp
+    from src.routes.store import store_bp
+    from src.routes.service import service_bp
+    from src.routes.booking import booking_bp
+    from src.routes.payment import payment_bp
+    from src.routes.subscription import subscription_bp
+    from src.routes.notification import notification_bp
+    from src.routes.dashboard import dashboard_bp
+    from src.routes.campaign import campaign_bp
+
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(store_bp, url_prefix='/api')
+    app.register_blueprint(service_bp, url_prefix='/api')
+    app.register_blueprint(booking_bp, url_prefix='/api')
+    app.register_blueprint(payment_bp, url_prefix='/api')
+    app.register_blueprint(subscription_bp, url_prefix='/api')
+    app.register_blueprint(notification_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
+    app.register_blueprint(campaign_bp, url_prefix='/api')
+
+
+def register_commands(app):
+    """Register CLI commands.
+
+    Schema changes are applied with `flask db upgrade` (Alembic migrations) and
+    demo data with `flask seed-demo`, so creating the app stays cheap.
+    `flask archive-history`, `flask run-campaigns`, `flask reconcile-payments`,
+    `flask reconcile-usage`, `flask process-subscriptions` and
+    `flask send-notifications` are meant to run periodically (cron).
+    """
+
+    @app.cli.command('seed-demo')
+    def seed_demo():
+        """Load the demo plans, users, store, services and bookings"""
         from init_demo_data import init_demo_data
         init_demo_data(db)
-        print("Demo data initialized successfully")
-    except Exception as e:
-        print(f"Database initialization: {e}")
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    """Serve frontend files and handle client-side routing"""
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-        return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+
+    @app.cli.command('archive-history')
+    @click.option('--days', type=int, default=None,
+                  help='Archive bookings dated more than this many days ago (default: ARCHIVE_AFTER_DAYS)')
+    @click.option('--batch-size', type=int, default=None, help='Rows moved per transaction')
+    @click.option('--dry-run', is_flag=True, help='Only count what would be archived')
+    def archive_history_command(days, batch_size, dry_run):
+        """Move old bookings and notifications to the archive tables"""
+        from src.utils.archival import archive_cutoff, archive_history
+        cutoff = archive_cutoff(days if days is not None else app.config['ARCHIVE_AFTER_DAYS'])
+        moved = archive_history(cutoff, batch_size or app.config['ARCHIVE_BATCH_SIZE'], dry_run=dry_run)
+        print(f"{'Would archive' if dry_run else 'Archived'} {moved['bookings']} bookings and "
+              f"{moved['notifications']} notifications dated before {cutoff.isoformat()}")
+
+
+    @app.cli.command('run-campaigns')
+    def run_campaigns_command():
+        """Send pending campaigns and resume ones whose runner stopped"""
+        from src.models import Campaign, CampaignStatus
+        from src.utils.campaigns import run_campaign
+        stale_before = datetime.utcnow() - timedelta(minutes=app.config['CAMPAIGN_STALE_MINUTES'])
+        campaign_ids = [campaign_id for campaign_id, in db.session.query(Campaign.id).filter(
+            Campaign.status.in_([CampaignStatus.PENDING, CampaignStatus.RUNNING])
+        ).order_by(Campaign.created_at).all()]
+        for campaign_id in campaign_ids:
+            campaign = run_campaign(campaign_id, stale_before=stale_before)
+            if campaign is not None:
+                print(f"Campaign {campaign.id}: {campaign.status.value}, {campaign.sent_count} sent, "
+                      f"{campaign.failed_count} failed")
+
+    @app.cli.command('reconcile-payments')
+    @click.option('--days', type=int, default=None,
+                  help='Check intents created in the last N days (default: RECONCILE_LOOKBACK_DAYS)')
+    @click.option('--since', type=click.DateTime(), default=None, help='Start of the range (UTC), instead of --days')
+    @click.option('--until', type=click.DateTime(), default=None, help='End of the range (UTC, default: now)')
+    @click.option('--dry-run', is_flag=True, help='Only report what would be corrected')
+    def reconcile_payments_command(days, since, until, dry_run):
+        """Correct local payments that drifted from Stripe (e.g. missed webhooks)"""
+        import stripe
+        from src.utils.payment_reconciliation import reconcile_payments
+        from src.utils.stripe_integration import create_stripe_integration
+        stripe_integration = create_stripe_integration()
+        if stripe_integration is None:
+            raise click.ClickException('STRIPE_SECRET_KEY is not set')
+
+        until = until or datetime.utcnow()
+        since = since or until - timedelta(days=days if days is not None else app.config['RECONCILE_LOOKBACK_DAYS'])
+        try:
+            stats = reconcile_payments(stripe_integration, since, until,
+                                       batch_size=app.config['RECONCILE_BATCH_SIZE'], dry_run=dry_run)
+        except stripe.error.StripeError as e:
+            # Batches already committed stay corrected; the next run picks up the rest
+            raise click.ClickException(f'Stripe request failed: {e}')
+        print(f"Checked {stats.get('checked', 0)} payment intents created {since.isoformat()} - {until.isoformat()}: "
+              f"{stats.get('corrected', 0)} {'to correct' if dry_run else 'corrected'}, "
+              f"{stats.get('missing_locally', 0)} unknown locally, {stats.get('conflicts', 0)} conflicts")
+        for key, count in sorted(stats.items()):
+            if '->' in key or key == 'charge_id_set':
+                print(f"  {key}: {count}")
+
+    @app.cli.command('reconcile-usage')
+    def reconcile_usage_command():
+        """Recount the plan usage counters (bookings, services, notifications) from their tables"""
+        from src.utils.plan_limits import reconcile_usage
+        corrected = reconcile_usage()
+        print('Usage counters corrected: ' + ', '.join(f'{metric} {count}' for metric, count in corrected.items()))
+
+    @app.cli.command('process-subscriptions')
+    @click.option('--grace-days', type=int, default=None,
+                  help='Days a past-due subscription has to pay before it ends (default: SUBSCRIPTION_GRACE_DAYS)')
+    @click.option('--batch-size', type=int, default=None, help='Subscriptions moved per transaction')
+    @click.option('--dry-run', is_flag=True, help='Only count what would change')
+    def process_subscriptions_command(grace_days, batch_size, dry_run):
+        """Renew subscriptions whose period ended and end past-due ones that were not paid"""
+        from src.utils.subscription_renewals import process_subscriptions
+        grace_days = grace_days if grace_days is not None else app.config['SUBSCRIPTION_GRACE_DAYS']
+        stats = process_subscriptions(grace_days=grace_days,
+                                      batch_size=batch_size or app.config['SUBSCRIPTION_BATCH_SIZE'],
+                                      dry_run=dry_run)
+        if dry_run:
+            print(f"Would process {stats['due']} subscriptions due for renewal and end {stats['ended']} past-due ones")
+            return
+        print(f"Subscriptions: {stats['renewed']} free renewals, {stats['past_due']} awaiting renewal payment, "
+              f"{stats['ended']} ended; {stats['notifications_queued']} emails queued")
+
+    @app.cli.command('send-notifications')
+    @click.option('--batch-size', type=int, default=None, help='Notifications sent per transaction')
+    def send_notifications_command(batch_size):
+        """Send the email notifications queued by the periodic jobs"""
+        from src.utils.notification_outbox import send_pending_notifications
+        stats = send_pending_notifications(batch_size=batch_size or app.config['NOTIFICATION_SEND_BATCH_SIZE'])
+        print(f"Notifications: {stats['sent']} sent, {stats['failed']} failed")
+
+
+def register_core_routes(app):
+    """Frontend, health check and error handler routes"""
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        """Serve frontend files and handle client-side routing"""
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+            return "Static folder not configured", 404
+
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
 
-@app.route('/health')
-def health_check():
-    """Health check endpoint"""
-    return {'status': 'healthy', 'message': 'Appointment Hub API is running'}
+    @app.route('/health')
+    def health_check():
+        """Health check endpoint"""
+        return {'status': 'healthy', 'message': 'Appointment Hub API is running'}
 
-@app.errorhandler(404)
-def not_found(error):
-    return {'error': 'Not found'}, 404
+    @app.route('/health/db')
+    def database_health_check():
+        """Database health check with connection pool metrics for this worker"""
+        try:
+            db.session.execute(db.text('SELECT 1'))
+            status = 'healthy'
+        except Exception as e:
+            status = f'unhealthy: {e}'
+        finally:
+            db.session.remove()
 
-@app.errorhandler(500)
-def internal_error(error):
-    return {'error': 'Internal server error'}, 500
+        return {'status': status, 'pool': get_pool_stats(db.engine)}, 200 if status == 'healthy' else 503
+
+    @app.errorhandler(404)
+    def not_found(error):
+        return {'error': 'Not found'}, 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return {'error': 'Internal server error'}, 500
+
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """Reject revoked tokens (rotated refresh tokens, logouts)"""
+    return token_blocklist.is_revoked(jwt_payload['jti'])
+
+
+def create_app(config=None):
+    """Create and configure the Flask application.
+
+    gunicorn loads `src.main:app` once in the master (preload_app) and forks
+    the workers from it, so the work done here is shared copy-on-write.
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    configure_app(app, config)
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+
+    # Initialize extensions
+    db.init_app(app)
+    migrate.init_app(app, db, render_as_batch=True)
+    jwt.init_app(app)
+    init_replica_routing(app)
+    init_metrics(app)
+    init_query_profiler(app)
+    init_nplusone_guard(app)
+
+    CORS(app, origins="*")  # Allow all origins for development
+
+    register_blueprints(app)
+    register_commands(app)
+    register_core_routes(app)
+    return app
+
+
+app = create_app()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5002, debug=True)
-
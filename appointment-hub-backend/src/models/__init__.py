@@ -6,6 +6,11 @@ from .booking import Booking, BookingStatus, BookingPaymentStatus
 from .payment import Payment, PaymentStatus
 from .subscription import SubscriptionPlan, Subscription, SubscriptionInterval, SubscriptionStatus
 from .notification import Notification, NotificationType, NotificationStatus
+from .archive import BookingArchive, NotificationArchive
+from .invite import UserInvite
+from .message_template import MessageTemplate
+from .campaign import Campaign, CampaignStatus
+from .usage import StoreUsage
 
 __all__ = [
     'db',
@@ -16,6 +21,11 @@ __all__ = [
     'Booking', 'BookingStatus', 'BookingPaymentStatus',
     'Payment', 'PaymentStatus',
     'SubscriptionPlan', 'Subscription', 'SubscriptionInterval', 'SubscriptionStatus',
-    'Notification', 'NotificationType', 'NotificationStatus'
+    'Notification', 'NotificationType', 'NotificationStatus',
+    'BookingArchive', 'NotificationArchive',
+    'UserInvite',
+    'MessageTemplate',
+    'Campaign', 'CampaignStatus',
+    'StoreUsage'
 ]
 
@@ -0,0 +1,115 @@
+from src.models.user import db
+from src.models.types import GUID
+from src.models.booking import BookingStatus, BookingPaymentStatus
+from src.models.notification import NotificationType, NotificationStatus
+from datetime import datetime
+
+class BookingArchive(db.Model):
+    """Bookings moved out of `bookings` by the archival job (src/utils/archival.py)"""
+    __tablename__ = 'bookings_archive'
+    __table_args__ = (
+        # History API - per store or per client, newest first
+        db.Index('ix_bookings_archive_store_id_booking_date', 'store_id', 'booking_date'),
+        db.Index('ix_bookings_archive_client_user_id_booking_date', 'client_user_id', 'booking_date'),
+        db.Index('ix_bookings_archive_booking_date', 'booking_date'),
+    )
+
+    id = db.Column(GUID, primary_key=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id', ondelete='CASCADE'), nullable=False)
+    client_user_id = db.Column(GUID, db.ForeignKey('users.id'), nullable=False)
+    service_id = db.Column(GUID, db.ForeignKey('services.id'), nullable=False)
+
+    booking_date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    number_of_persons = db.Column(db.Integer, nullable=False, default=1)
+    status = db.Column(db.Enum(BookingStatus), nullable=False)
+
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    advance_payment_amount = db.Column(db.Numeric(10, 2))
+    payment_status = db.Column(db.Enum(BookingPaymentStatus), nullable=False)
+    amount_paid = db.Column(db.Numeric(10, 2), nullable=False, default=0, server_default='0')
+    calendly_event_uri = db.Column(db.String(500))
+
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relationships (read-only history, nothing points back here)
+    store = db.relationship('Store')
+    client = db.relationship('User')
+    service = db.relationship('Service')
+
+    def __repr__(self):
+        return f'<BookingArchive {self.id} ({self.status.value}) - Store: {self.store_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'store_id': self.store_id,
+            'client_user_id': self.client_user_id,
+            'service_id': self.service_id,
+            'booking_date': self.booking_date.isoformat() if self.booking_date else None,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'number_of_persons': self.number_of_persons,
+            'status': self.status.value,
+            'total_amount': float(self.total_amount) if self.total_amount else None,
+            'advance_payment_amount': float(self.advance_payment_amount) if self.advance_payment_amount else None,
+            'payment_status': self.payment_status.value,
+            'amount_paid': float(self.amount_paid) if self.amount_paid is not None else 0.0,
+            'calendly_event_uri': self.calendly_event_uri,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
+            'archived': True
+        }
+
+class NotificationArchive(db.Model):
+    """Notifications moved out of `notifications` by the archival job"""
+    __tablename__ = 'notifications_archive'
+    __table_args__ = (
+        db.Index('ix_notifications_archive_store_id_sent_at', 'store_id', 'sent_at'),
+        db.Index('ix_notifications_archive_recipient_user_id_sent_at', 'recipient_user_id', 'sent_at'),
+        db.Index('ix_notifications_archive_sent_at', 'sent_at'),
+    )
+
+    id = db.Column(GUID, primary_key=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id', ondelete='CASCADE'), nullable=False)
+    recipient_user_id = db.Column(GUID, db.ForeignKey('users.id'), nullable=False)
+    booking_id = db.Column(GUID, nullable=True)  # live or archived booking
+    campaign_id = db.Column(GUID, nullable=True)
+
+    type = db.Column(db.Enum(NotificationType), nullable=False)
+    subject = db.Column(db.String(500))
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Enum(NotificationStatus), nullable=False)
+    external_message_id = db.Column(db.String(255))
+    is_platform = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    sent_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NotificationArchive {self.type.value} to {self.recipient_user_id} ({self.status.value})>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'store_id': self.store_id,
+            'recipient_user_id': self.recipient_user_id,
+            'booking_id': self.booking_id,
+            'campaign_id': self.campaign_id,
+            'type': self.type.value,
+            'subject': self.subject,
+            'body': self.body,
+            'status': self.status.value,
+            'external_message_id': self.external_message_id,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
+            'archived': True
+        }
@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime, date, time
 import enum
 
@@ -17,15 +18,26 @@ class BookingPaymentStatus(enum.Enum):
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        # Store calendars, dashboards and the per-store listing filter on these
+        db.Index('ix_bookings_store_id_booking_date', 'store_id', 'booking_date'),
+        db.Index('ix_bookings_store_id_status_booking_date', 'store_id', 'status', 'booking_date'),
+        db.Index('ix_bookings_store_id_created_at', 'store_id', 'created_at'),
+        db.Index('ix_bookings_client_user_id_created_at', 'client_user_id', 'created_at'),
+        # Unpaid/partially paid bookings per store, revenue by booking date
+        db.Index('ix_bookings_store_id_payment_status_booking_date', 'store_id', 'payment_status', 'booking_date'),
+        # Slot conflict check when creating a booking
+        db.Index('ix_bookings_service_id_booking_date_start_time', 'service_id', 'booking_date', 'start_time'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Multi-tenancy
-    store_id = db.Column(db.String(36), db.ForeignKey('stores.id'), nullable=False, index=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id'), nullable=False)
     
     # Booking relationships
-    client_user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
-    service_id = db.Column(db.String(36), db.ForeignKey('services.id'), nullable=False, index=True)
+    client_user_id = db.Column(GUID, db.ForeignKey('users.id'), nullable=False)
+    service_id = db.Column(GUID, db.ForeignKey('services.id'), nullable=False)
     
     # Booking details
     booking_date = db.Column(db.Date, nullable=False, index=True)
@@ -40,18 +52,21 @@ class Booking(db.Model):
     total_amount = db.Column(db.Numeric(10, 2), nullable=False)
     advance_payment_amount = db.Column(db.Numeric(10, 2))
     payment_status = db.Column(db.Enum(BookingPaymentStatus), nullable=False, default=BookingPaymentStatus.UNPAID, index=True)
+    # Sum of succeeded payments, kept with payment_status by src/utils/booking_payments.py
+    amount_paid = db.Column(db.Numeric(10, 2), nullable=False, default=0, server_default='0')
     
     # Calendly integration
     calendly_event_uri = db.Column(db.String(500))  # Link to Calendly event for sync
     
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)  # Admin recent bookings
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     store = db.relationship('Store', back_populates='bookings')
     client = db.relationship('User', back_populates='client_bookings', foreign_keys=[client_user_id])
     service = db.relationship('Service', back_populates='bookings')
-    payments = db.relationship('Payment', back_populates='booking')
+    payments = db.relationship('Payment', back_populates='booking',
+                               primaryjoin='Booking.id == foreign(Payment.booking_id)')
 
     def __repr__(self):
         return f'<Booking {self.id} ({self.status.value}) - Store: {self.store_id}>'
@@ -70,6 +85,7 @@ class Booking(db.Model):
             'total_amount': float(self.total_amount) if self.total_amount else None,
             'advance_payment_amount': float(self.advance_payment_amount) if self.advance_payment_amount else None,
             'payment_status': self.payment_status.value,
+            'amount_paid': float(self.amount_paid) if self.amount_paid is not None else 0.0,
             'calendly_event_uri': self.calendly_event_uri,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
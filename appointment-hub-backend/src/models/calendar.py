@@ -1,13 +1,14 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime
 
 class Calendar(db.Model):
     __tablename__ = 'calendars'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Multi-tenancy
-    store_id = db.Column(db.String(36), db.ForeignKey('stores.id'), nullable=False, index=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id'), nullable=False, index=True)
     
     # Calendar details
     name = db.Column(db.String(255), nullable=False)
@@ -48,10 +49,10 @@ class Calendar(db.Model):
 class CalendarSlot(db.Model):
     __tablename__ = 'calendar_slots'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Calendar relationship
-    calendar_id = db.Column(db.String(36), db.ForeignKey('calendars.id'), nullable=False, index=True)
+    calendar_id = db.Column(GUID, db.ForeignKey('calendars.id'), nullable=False, index=True)
     
     # Time slot details
     start_time = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,72 @@
+from src.models.user import db
+from src.models.types import GUID, generate_uuid
+from src.models.notification import NotificationType
+from datetime import datetime
+import enum
+
+class CampaignStatus(enum.Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+class Campaign(db.Model):
+    """A bulk message to a store's clients, sent in provider-sized batches (src/utils/campaigns.py)"""
+    __tablename__ = 'campaigns'
+    __table_args__ = (
+        db.Index('ix_campaigns_store_id_created_at', 'store_id', 'created_at'),
+    )
+
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id', ondelete='CASCADE'), nullable=False)
+    created_by_user_id = db.Column(GUID, db.ForeignKey('users.id'), nullable=True)
+
+    type = db.Column(db.Enum(NotificationType), nullable=False, default=NotificationType.SMS)
+    message = db.Column(db.Text, nullable=False)
+    audience = db.Column(db.JSON, nullable=False)  # e.g. {"booked_within_days": 90}
+
+    status = db.Column(db.Enum(CampaignStatus), nullable=False, default=CampaignStatus.PENDING, index=True)
+    batch_size = db.Column(db.Integer, nullable=False)
+    total_recipients = db.Column(db.Integer, nullable=False, default=0)
+    sent_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    batches = db.Column(db.JSON, nullable=False, default=list)  # one entry per provider call
+    # Keyset cursor - recipients are walked in users.id order, so a run can resume after it
+    last_recipient_id = db.Column(GUID)
+    error = db.Column(db.Text)
+
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Campaign {self.id} ({self.status.value}) - Store: {self.store_id}>'
+
+    def to_dict(self, include_batches=False):
+        data = {
+            'id': self.id,
+            'store_id': self.store_id,
+            'created_by_user_id': self.created_by_user_id,
+            'type': self.type.value,
+            'message': self.message,
+            'audience': self.audience,
+            'status': self.status.value,
+            'batch_size': self.batch_size,
+            'total_recipients': self.total_recipients,
+            'sent_count': self.sent_count,
+            'failed_count': self.failed_count,
+            'batches_sent': len(self.batches or []),
+            'progress': round((self.sent_count + self.failed_count) / self.total_recipients, 4) if self.total_recipients else None,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+        if include_batches:
+            data['batches'] = self.batches or []
+
+        return data
@@ -0,0 +1,41 @@
+from src.models.user import db
+from src.models.types import GUID, generate_uuid
+from datetime import datetime
+import hashlib
+import secrets
+
+# Stored as password_hash until the invite is accepted; never matches a password
+PENDING_PASSWORD_HASH = '!invite-pending'
+
+class UserInvite(db.Model):
+    """One-time token that lets an imported client choose their own password"""
+    __tablename__ = 'user_invites'
+
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
+    user_id = db.Column(GUID, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, unique=True)
+    # Store that imported the client - kept after acceptance so the store still sees them
+    store_id = db.Column(GUID, db.ForeignKey('stores.id', ondelete='CASCADE'), nullable=True, index=True)
+
+    # Only the SHA-256 of the token is stored; the token itself is handed out once
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    accepted_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    user = db.relationship('User')
+
+    def __repr__(self):
+        return f'<UserInvite {self.user_id} - Store: {self.store_id}>'
+
+    @staticmethod
+    def new_token():
+        """Return (token, token_hash) for a fresh invite"""
+        token = secrets.token_urlsafe(32)
+        return token, UserInvite.hash_token(token)
+
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def is_usable(self, now=None):
+        return self.accepted_at is None and self.expires_at > (now or datetime.utcnow())
@@ -0,0 +1,38 @@
+from src.models.user import db
+from src.models.types import GUID, generate_uuid
+from datetime import datetime
+
+class MessageTemplate(db.Model):
+    """A store's own wording for one notification template (src/utils/message_templates.py)"""
+    __tablename__ = 'message_templates'
+    __table_args__ = (
+        # One override per store, template and locale; also the lookup index
+        db.UniqueConstraint('store_id', 'key', 'locale', name='uq_message_templates_store_id_key_locale'),
+    )
+
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id', ondelete='CASCADE'), nullable=False)
+
+    key = db.Column(db.String(50), nullable=False)  # e.g. booking_confirmation
+    locale = db.Column(db.String(10), nullable=False, default='en')
+    subject = db.Column(db.String(500))  # Unused for SMS
+    body = db.Column(db.Text, nullable=False)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MessageTemplate {self.key} ({self.locale}) - Store: {self.store_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'store_id': self.store_id,
+            'key': self.key,
+            'locale': self.locale,
+            'subject': self.subject,
+            'body': self.body,
+            'custom': True,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime
 import enum
 
@@ -7,6 +8,7 @@ class NotificationType(enum.Enum):
     SMS = 'sms'
 
 class NotificationStatus(enum.Enum):
+    PENDING = 'pending'  # queued by a job, not sent yet
     SENT = 'sent'
     FAILED = 'failed'
     DELIVERED = 'delivered'
@@ -14,15 +16,30 @@ class NotificationStatus(enum.Enum):
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Delivery reports look notifications up by provider message ID (SMS only)
+        db.Index(
+            'ix_notifications_external_message_id', 'external_message_id',
+            postgresql_where=db.text('external_message_id IS NOT NULL'),
+            sqlite_where=db.text('external_message_id IS NOT NULL')
+        ),
+        # Campaign progress/reporting - most notifications belong to no campaign
+        db.Index(
+            'ix_notifications_campaign_id', 'campaign_id',
+            postgresql_where=db.text('campaign_id IS NOT NULL'),
+            sqlite_where=db.text('campaign_id IS NOT NULL')
+        ),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Multi-tenancy
-    store_id = db.Column(db.String(36), db.ForeignKey('stores.id'), nullable=False, index=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id'), nullable=False, index=True)
     
     # Notification relationships
-    recipient_user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
-    booking_id = db.Column(db.String(36), db.ForeignKey('bookings.id'), nullable=True, index=True)
+    recipient_user_id = db.Column(GUID, db.ForeignKey('users.id'), nullable=False, index=True)
+    booking_id = db.Column(GUID, db.ForeignKey('bookings.id'), nullable=True, index=True)
+    campaign_id = db.Column(GUID, nullable=True)  # not a foreign key, kept when rows move to the archive
     
     # Notification details
     type = db.Column(db.Enum(NotificationType), nullable=False, index=True)
@@ -35,6 +52,9 @@ class Notification(db.Model):
     # External service integration
     external_message_id = db.Column(db.String(255))  # e.g., EasySMS message ID for delivery reports
     
+    # Sent by the platform itself (e.g. subscription billing), not counted against the store's plan
+    is_platform = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    
     sent_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -53,6 +73,7 @@ class Notification(db.Model):
             'store_id': self.store_id,
             'recipient_user_id': self.recipient_user_id,
             'booking_id': self.booking_id,
+            'campaign_id': self.campaign_id,
             'type': self.type.value,
             'subject': self.subject,
             'body': self.body,
@@ -95,20 +116,17 @@ class Notification(db.Model):
         self.updated_at = datetime.utcnow()
 
     @staticmethod
-    def create_booking_confirmation(store_id, recipient_user_id, booking_id, booking_details):
-        """Create a booking confirmation notification"""
-        subject = f"Booking Confirmation - {booking_details.get('service_name', 'Service')}"
-        body = f"""
-        Your booking has been confirmed!
-        
-        Service: {booking_details.get('service_name', 'N/A')}
-        Date: {booking_details.get('booking_date', 'N/A')}
-        Time: {booking_details.get('start_time', 'N/A')} - {booking_details.get('end_time', 'N/A')}
-        Number of persons: {booking_details.get('number_of_persons', 1)}
-        Total amount: {booking_details.get('total_amount', 0)} EUR
-        
-        Thank you for choosing our services!
-        """
+    def _from_template(key, store_id, recipient_user_id, booking_id, booking_details, locale=None):
+        """Build an email notification from the store's (or the built-in) template"""
+        from src.utils.message_templates import message_templates
+        template_set = message_templates.get(key, store_id, locale)
+        # Same fallbacks as the original hand-written notifications; other missing details show as N/A
+        subject = template_set.subject.render(
+            {'service_name': 'Service', **booking_details}, missing='N/A'
+        ) if template_set.subject else None
+        body = template_set.body.render(
+            {'number_of_persons': 1, 'total_amount': 0, **booking_details}, missing='N/A'
+        )
         
         return Notification(
             store_id=store_id,
@@ -116,52 +134,26 @@ class Notification(db.Model):
             booking_id=booking_id,
             type=NotificationType.EMAIL,
             subject=subject,
-            body=body.strip()
+            body=body
+        )
+
+    @staticmethod
+    def create_booking_confirmation(store_id, recipient_user_id, booking_id, booking_details, locale=None):
+        """Create a booking confirmation notification"""
+        return Notification._from_template(
+            'booking_confirmation', store_id, recipient_user_id, booking_id, booking_details, locale
         )
 
     @staticmethod
-    def create_booking_reminder(store_id, recipient_user_id, booking_id, booking_details):
+    def create_booking_reminder(store_id, recipient_user_id, booking_id, booking_details, locale=None):
         """Create a booking reminder notification"""
-        subject = f"Booking Reminder - {booking_details.get('service_name', 'Service')}"
-        body = f"""
-        This is a reminder for your upcoming booking:
-        
-        Service: {booking_details.get('service_name', 'N/A')}
-        Date: {booking_details.get('booking_date', 'N/A')}
-        Time: {booking_details.get('start_time', 'N/A')} - {booking_details.get('end_time', 'N/A')}
-        
-        We look forward to seeing you!
-        """
-        
-        return Notification(
-            store_id=store_id,
-            recipient_user_id=recipient_user_id,
-            booking_id=booking_id,
-            type=NotificationType.EMAIL,
-            subject=subject,
-            body=body.strip()
+        return Notification._from_template(
+            'booking_reminder', store_id, recipient_user_id, booking_id, booking_details, locale
         )
 
     @staticmethod
-    def create_booking_cancellation(store_id, recipient_user_id, booking_id, booking_details):
+    def create_booking_cancellation(store_id, recipient_user_id, booking_id, booking_details, locale=None):
         """Create a booking cancellation notification"""
-        subject = f"Booking Cancelled - {booking_details.get('service_name', 'Service')}"
-        body = f"""
-        Your booking has been cancelled:
-        
-        Service: {booking_details.get('service_name', 'N/A')}
-        Date: {booking_details.get('booking_date', 'N/A')}
-        Time: {booking_details.get('start_time', 'N/A')} - {booking_details.get('end_time', 'N/A')}
-        
-        If you have any questions, please contact us.
-        """
-        
-        return Notification(
-            store_id=store_id,
-            recipient_user_id=recipient_user_id,
-            booking_id=booking_id,
-            type=NotificationType.EMAIL,
-            subject=subject,
-            body=body.strip()
+        return Notification._from_template(
+            'booking_cancellation', store_id, recipient_user_id, booking_id, booking_details, locale
         )
-
@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime
 import enum
 
@@ -10,20 +11,26 @@ class PaymentStatus(enum.Enum):
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        # Revenue queries join bookings to their succeeded payments
+        db.Index('ix_payments_booking_id_status', 'booking_id', 'status'),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Multi-tenancy
-    store_id = db.Column(db.String(36), db.ForeignKey('stores.id'), nullable=False, index=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id'), nullable=False, index=True)
     
     # Payment relationships
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)  # Client or manager
-    booking_id = db.Column(db.String(36), db.ForeignKey('bookings.id'), nullable=True, index=True)  # For service payments
-    subscription_id = db.Column(db.String(36), db.ForeignKey('subscriptions.id'), nullable=True, index=True)  # For subscription payments
+    user_id = db.Column(GUID, db.ForeignKey('users.id'), nullable=False, index=True)  # Client or manager
+    # For service payments - not a foreign key, old bookings move to bookings_archive
+    booking_id = db.Column(GUID, nullable=True)
+    subscription_id = db.Column(GUID, db.ForeignKey('subscriptions.id'), nullable=True, index=True)  # For subscription payments
     
     # Stripe integration
     stripe_charge_id = db.Column(db.String(255), unique=True)
     stripe_payment_intent_id = db.Column(db.String(255), unique=True)
+    stripe_invoice_id = db.Column(db.String(255), unique=True, index=True)  # Subscription invoice payments
     
     # Payment details
     amount = db.Column(db.Numeric(10, 2), nullable=False)
@@ -38,7 +45,8 @@ class Payment(db.Model):
     # Relationships
     store = db.relationship('Store', back_populates='payments')
     user = db.relationship('User', back_populates='payments')
-    booking = db.relationship('Booking', back_populates='payments')
+    booking = db.relationship('Booking', back_populates='payments',
+                              primaryjoin='foreign(Payment.booking_id) == Booking.id')
     subscription = db.relationship('Subscription', back_populates='payments')
 
     def __repr__(self):
@@ -53,6 +61,7 @@ class Payment(db.Model):
             'subscription_id': self.subscription_id,
             'stripe_charge_id': self.stripe_charge_id,
             'stripe_payment_intent_id': self.stripe_payment_intent_id,
+            'stripe_invoice_id': self.stripe_invoice_id,
             'amount': float(self.amount) if self.amount else None,
             'currency': self.currency,
             'status': self.status.value,
@@ -98,8 +107,13 @@ class Payment(db.Model):
         """Update payment status based on Stripe webhook event"""
         if stripe_event.type == 'payment_intent.succeeded':
             self.status = PaymentStatus.SUCCEEDED
-            if hasattr(stripe_event.data.object, 'charges') and stripe_event.data.object.charges.data:
-                self.stripe_charge_id = stripe_event.data.object.charges.data[0].id
+            intent = stripe_event.data.object
+            if getattr(intent, 'latest_charge', None):
+                # An id, or the Charge itself when the event was expanded
+                self.stripe_charge_id = getattr(intent.latest_charge, 'id', intent.latest_charge)
+            elif hasattr(intent, 'charges') and intent.charges.data:
+                # API versions before 2022-11-15
+                self.stripe_charge_id = intent.charges.data[0].id
         elif stripe_event.type == 'payment_intent.payment_failed':
             self.status = PaymentStatus.FAILED
         elif stripe_event.type == 'charge.dispute.created':
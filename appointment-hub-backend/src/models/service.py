@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime
 import enum
 
@@ -20,10 +21,10 @@ class RecurringInterval(enum.Enum):
 class Service(db.Model):
     __tablename__ = 'services'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Multi-tenancy
-    store_id = db.Column(db.String(36), db.ForeignKey('stores.id'), nullable=False, index=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id'), nullable=False, index=True)
     
     # Service details
     name = db.Column(db.String(255), nullable=False)
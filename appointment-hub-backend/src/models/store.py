@@ -1,11 +1,12 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime
 import json
 
 class Store(db.Model):
     __tablename__ = 'stores'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     name = db.Column(db.String(255), nullable=False)
     slug = db.Column(db.String(100), unique=True, nullable=False, index=True)  # For URL: web-app-url/slug
     address = db.Column(db.Text)
@@ -19,7 +20,7 @@ class Store(db.Model):
     photos_url = db.Column(db.JSON)  # Array of photo URLs
     
     # Manager relationship (one-to-one)
-    manager_user_id = db.Column(db.String(36), db.ForeignKey('users.id'), unique=True, nullable=False)
+    manager_user_id = db.Column(GUID, db.ForeignKey('users.id'), unique=True, nullable=False)
     
     # External integrations
     calendly_api_key = db.Column(db.Text)  # Encrypted storage recommended
@@ -28,7 +29,7 @@ class Store(db.Model):
     business_hours = db.Column(db.JSON)  # Store business hours as JSON
 
     # Subscription
-    current_subscription_plan_id = db.Column(db.String(36), db.ForeignKey('subscription_plans.id'))
+    current_subscription_plan_id = db.Column(GUID, db.ForeignKey('subscription_plans.id'))
     
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
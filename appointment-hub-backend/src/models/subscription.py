@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.types import GUID, generate_uuid
 from datetime import datetime
 import enum
 import json
@@ -17,7 +18,7 @@ class SubscriptionStatus(enum.Enum):
 class SubscriptionPlan(db.Model):
     __tablename__ = 'subscription_plans'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Plan details
     name = db.Column(db.String(255), nullable=False)
@@ -72,12 +73,21 @@ class SubscriptionPlan(db.Model):
 
 class Subscription(db.Model):
     __tablename__ = 'subscriptions'
+    __table_args__ = (
+        # Renewal/expiry runs (flask process-subscriptions) scan locally billed
+        # subscriptions by status and period end; Stripe moves the others
+        db.Index(
+            'ix_subscriptions_status_current_period_end', 'status', 'current_period_end',
+            postgresql_where=db.text('stripe_subscription_id IS NULL'),
+            sqlite_where=db.text('stripe_subscription_id IS NULL')
+        ),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     
     # Subscription relationships
-    store_id = db.Column(db.String(36), db.ForeignKey('stores.id'), nullable=False, index=True)
-    plan_id = db.Column(db.String(36), db.ForeignKey('subscription_plans.id'), nullable=False, index=True)
+    store_id = db.Column(GUID, db.ForeignKey('stores.id'), nullable=False, index=True)
+    plan_id = db.Column(GUID, db.ForeignKey('subscription_plans.id'), nullable=False, index=True)
     
     # Subscription period
     start_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
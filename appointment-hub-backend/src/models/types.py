@@ -0,0 +1,85 @@
+import os
+import time
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import CHAR, LargeBinary, TypeDecorator
+
+
+def uuid7():
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit Unix ms timestamp, then random bits"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    # version 7 in bits 76-79, RFC 4122 variant in bits 62-63
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
+
+
+def generate_uuid():
+    """Primary key default - new rows land at the right-hand edge of the key index"""
+    return str(uuid7())
+
+
+class GUID(TypeDecorator):
+    """UUID column stored natively on PostgreSQL and as 16 raw bytes elsewhere.
+
+    Values are canonical lowercase strings on the Python side, so ids in JWTs,
+    URLs and to_dict() output are unchanged. A malformed id binds as NULL and
+    simply matches no row.
+    """
+
+    impl = CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    @staticmethod
+    def _to_bytes(value):
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        try:
+            raw = bytes.fromhex(str(value).replace('-', ''))
+        except ValueError:
+            return None
+        return raw if len(raw) == 16 else None
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = self._to_bytes(value)
+        if raw is None or dialect.name != 'postgresql':
+            return raw
+        return str(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else str(value)
+
+    def result_processor(self, dialect, coltype):
+        if dialect.name == 'postgresql':
+            return super().result_processor(dialect, coltype)
+
+        # Plain closure - list endpoints convert thousands of keys per response
+        def process(value):
+            if value is None:
+                return None
+            h = value.hex()
+            return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+        return process
+
+    def literal_processor(self, dialect):
+        # The impl types render bytes as quoted text, which SQLite would not
+        # compare equal to a BLOB key
+        def process(value):
+            value = self.process_bind_param(value, dialect)
+            if value is None:
+                return 'NULL'
+            if isinstance(value, bytes):
+                return f"X'{value.hex()}'"
+            return f"'{value}'"
+
+        return process
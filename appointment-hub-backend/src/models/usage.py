@@ -0,0 +1,30 @@
+from src.models.user import db
+from src.models.types import GUID
+from datetime import datetime
+
+class StoreUsage(db.Model):
+    """Running count of one plan-limited resource for a store (src/utils/plan_limits.py).
+
+    period is the calendar month ('2026-10') for limits that reset monthly,
+    '' for totals such as the number of services.
+    """
+    __tablename__ = 'store_usage'
+
+    store_id = db.Column(GUID, db.ForeignKey('stores.id', ondelete='CASCADE'), primary_key=True)
+    metric = db.Column(db.String(32), primary_key=True)  # bookings, services, notifications
+    period = db.Column(db.String(7), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoreUsage {self.metric} {self.period or "total"}={self.count} - Store: {self.store_id}>'
+
+    def to_dict(self):
+        return {
+            'store_id': self.store_id,
+            'metric': self.metric,
+            'period': self.period or None,
+            'count': self.count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import enum
+from src.utils.db_routing import RoutingSession
+from src.models.types import GUID, generate_uuid
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class UserRole(enum.Enum):
     CLIENT = 'client'
@@ -11,8 +13,12 @@ class UserRole(enum.Enum):
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Case-insensitive email lookups (client import)
+        db.Index('ix_users_lower_email', db.text('lower(email)')),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(__import__('uuid').uuid4()))
+    id = db.Column(GUID, primary_key=True, default=generate_uuid)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
@@ -26,7 +32,7 @@ class User(db.Model):
     
     # Multi-tenancy: store_id for store managers, nullable for admins
     # Note: This is for data filtering, not a direct relationship
-    store_id = db.Column(db.String(36), nullable=True, index=True)
+    store_id = db.Column(GUID, nullable=True, index=True)
     
     # Relationships
     client_bookings = db.relationship('Booking', back_populates='client', foreign_keys='Booking.client_user_id')
@@ -58,10 +64,14 @@ class User(db.Model):
 
     @staticmethod
     def hash_password(password):
-        from werkzeug.security import generate_password_hash
-        return generate_password_hash(password, method='pbkdf2:sha256')
+        from src.utils.password_hasher import get_password_hasher
+        return get_password_hasher().hash(password)
     
     def check_password(self, password):
-        from werkzeug.security import check_password_hash
-        return check_password_hash(self.password_hash, password)
+        from src.utils.password_hasher import get_password_hasher
+        return get_password_hasher().verify(self.password_hash, password)
 
+    def password_needs_rehash(self):
+        """Check if the stored hash was made with an outdated method or cost"""
+        from src.utils.password_hasher import get_password_hasher
+        return get_password_hasher().needs_rehash(self.password_hash)
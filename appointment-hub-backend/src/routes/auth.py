@@ -1,10 +1,21 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from src.models import db, User, UserRole
-from datetime import timedelta
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
+)
+from datetime import datetime
+from src.models import db, User, UserRole, UserInvite
+from src.utils.password_hasher import HasherBusyError
+from src.utils.token_blocklist import token_blocklist
 
 auth_bp = Blueprint('auth', __name__)
 
+def create_token_pair(user_id):
+    """Create an access token and a refresh token for a user"""
+    return {
+        'access_token': create_access_token(identity=user_id),
+        'refresh_token': create_refresh_token(identity=user_id)
+    }
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user (client)"""
@@ -36,18 +47,15 @@ def register():
         db.session.add(user)
         db.session.commit()
         
-        # Create access token
-        access_token = create_access_token(
-            identity=user.id,
-            expires_delta=timedelta(days=7)
-        )
-        
         return jsonify({
             'message': 'User registered successfully',
-            'access_token': access_token,
+            **create_token_pair(user.id),
             'user': user.to_dict()
         }), 201
         
+    except HasherBusyError:
+        db.session.rollback()
+        return jsonify({'error': 'Too many requests in progress, please retry shortly'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -67,18 +75,85 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
-        # Create access token
-        access_token = create_access_token(
-            identity=user.id,
-            expires_delta=timedelta(days=7)
-        )
+        # Transparently upgrade hashes made with an outdated method or cost
+        if user.password_needs_rehash():
+            try:
+                user.password_hash = User.hash_password(data['password'])
+                db.session.commit()
+            except HasherBusyError:
+                pass
         
         return jsonify({
             'message': 'Login successful',
-            'access_token': access_token,
+            **create_token_pair(user.id),
             'user': user.to_dict()
         }), 200
         
+    except HasherBusyError:
+        return jsonify({'error': 'Too many login attempts in progress, please retry shortly'}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/accept-invite', methods=['POST'])
+def accept_invite():
+    """Set the password of an imported client from their invite token and log them in"""
+    try:
+        data = request.get_json()
+        
+        if not data.get('token') or not data.get('password'):
+            return jsonify({'error': 'Token and password are required'}), 400
+        
+        invite = UserInvite.query.filter_by(token_hash=UserInvite.hash_token(data['token'])).first()
+        if not invite or not invite.is_usable():
+            return jsonify({'error': 'Invite is invalid or has expired'}), 400
+        
+        user = invite.user
+        user.password_hash = User.hash_password(data['password'])
+        invite.accepted_at = datetime.utcnow()
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Invite accepted',
+            **create_token_pair(user.id),
+            'user': user.to_dict()
+        }), 200
+        
+    except HasherBusyError:
+        db.session.rollback()
+        return jsonify({'error': 'Too many requests in progress, please retry shortly'}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Exchange a refresh token for a new token pair (rotation)"""
+    try:
+        claims = get_jwt()
+        
+        # The old refresh token can only be used once
+        if not token_blocklist.revoke(claims['jti'], claims.get('exp')):
+            return jsonify({'error': 'Refresh token has already been used'}), 401
+        
+        return jsonify({
+            'message': 'Token refreshed successfully',
+            **create_token_pair(get_jwt_identity())
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """Revoke the presented access or refresh token"""
+    try:
+        claims = get_jwt()
+        token_blocklist.revoke(claims['jti'], claims.get('exp'))
+        
+        return jsonify({'message': 'Logged out successfully'}), 200
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -124,6 +199,9 @@ def change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except HasherBusyError:
+        db.session.rollback()
+        return jsonify({'error': 'Too many requests in progress, please retry shortly'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -1,9 +1,12 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from src.models import (
-    db, Booking, BookingStatus, BookingPaymentStatus, Service, Store, User, UserRole
+    db, Booking, BookingArchive, BookingStatus, BookingPaymentStatus, Payment, Service, Store, User, UserRole
 )
 from src.utils.auth import get_current_user, ensure_store_access
+from src.utils.idempotency import idempotent
+from src.utils.plan_limits import PlanLimitExceeded, consume
+from sqlalchemy.orm import joinedload
 from datetime import datetime, date, time
 
 booking_bp = Blueprint('booking', __name__)
@@ -17,15 +20,20 @@ def get_bookings():
         if not current_user:
             return jsonify({'error': 'User not found'}), 404
         
+        # Eager-load everything serialized below to avoid a query per booking
+        query = Booking.query.options(
+            joinedload(Booking.service), joinedload(Booking.store), joinedload(Booking.client)
+        )
+        
         if current_user.role == UserRole.ADMIN:
             # Admin can see all bookings
-            bookings = Booking.query.all()
+            bookings = query.all()
         elif current_user.role == UserRole.STORE_MANAGER:
             # Store manager can see bookings for their store
-            bookings = Booking.query.filter_by(store_id=current_user.store_id).all()
+            bookings = query.filter_by(store_id=current_user.store_id).all()
         else:
             # Clients can see their own bookings
-            bookings = Booking.query.filter_by(client_user_id=current_user.id).all()
+            bookings = query.filter_by(client_user_id=current_user.id).all()
         
         # Include related data
         booking_data = []
@@ -54,7 +62,18 @@ def get_store_bookings(store_id):
         if not ensure_store_access(current_user, store_id):
             return jsonify({'error': 'Access denied'}), 403
         
-        bookings = Booking.query.filter_by(store_id=store_id).all()
+        query = Booking.query.options(
+            joinedload(Booking.service), joinedload(Booking.client)
+        ).filter_by(store_id=store_id)
+        
+        # e.g. ?payment_status=unpaid - served by the (store_id, payment_status, booking_date) index
+        if request.args.get('payment_status'):
+            try:
+                query = query.filter_by(payment_status=BookingPaymentStatus(request.args.get('payment_status')))
+            except ValueError:
+                return jsonify({'error': 'Invalid payment status'}), 400
+        
+        bookings = query.order_by(Booking.booking_date).all()
         
         # Include related data
         booking_data = []
@@ -100,6 +119,7 @@ def get_booking(booking_id):
 
 @booking_bp.route('/bookings', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_booking():
     """Create a new booking"""
     try:
@@ -154,6 +174,12 @@ def create_booking():
         if existing_booking:
             return jsonify({'error': 'Time slot is already booked'}), 409
         
+        # Counts against the store's plan, committed with the booking
+        try:
+            consume(service.store_id, 'bookings')
+        except PlanLimitExceeded as e:
+            return jsonify({'error': str(e)}), 403
+        
         # Create booking
         booking = Booking(
             store_id=service.store_id,
@@ -217,9 +243,17 @@ def update_booking(booking_id):
             
             if 'payment_status' in data:
                 try:
-                    booking.payment_status = BookingPaymentStatus(data['payment_status'])
+                    payment_status = BookingPaymentStatus(data['payment_status'])
                 except ValueError:
                     return jsonify({'error': 'Invalid payment status'}), 400
+
+                # Once payments exist the status is rolled up from them along with amount_paid
+                # (src/utils/booking_payments.py), which dashboard revenue relies on
+                if payment_status != booking.payment_status:
+                    has_payments = Payment.query.filter_by(booking_id=booking.id).count()
+                    if has_payments:
+                        return jsonify({'error': 'Payment status follows the payments of this booking'}), 409
+                    booking.payment_status = payment_status
         
         # Clients can reschedule if allowed
         if current_user.role == UserRole.CLIENT and booking.can_be_rescheduled():
@@ -328,7 +362,7 @@ def get_bookings_calendar():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        query = Booking.query
+        query = Booking.query.options(joinedload(Booking.service), joinedload(Booking.client))
         
         # Apply user-based filtering
         if current_user.role == UserRole.CLIENT:
@@ -374,3 +408,66 @@ def get_bookings_calendar():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@booking_bp.route('/bookings/history', methods=['GET'])
+@jwt_required()
+def get_booking_history():
+    """Get archived bookings (moved out by `flask archive-history`), newest first"""
+    try:
+        current_user = get_current_user()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        
+        query = BookingArchive.query.options(
+            joinedload(BookingArchive.service), joinedload(BookingArchive.store), joinedload(BookingArchive.client)
+        )
+        
+        # Apply user-based filtering
+        if current_user.role == UserRole.CLIENT:
+            query = query.filter_by(client_user_id=current_user.id)
+        elif current_user.role == UserRole.STORE_MANAGER:
+            query = query.filter_by(store_id=current_user.store_id)
+        elif request.args.get('store_id'):
+            query = query.filter_by(store_id=request.args.get('store_id'))
+        
+        # Apply date filtering
+        if start_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                query = query.filter(BookingArchive.booking_date >= start_date)
+            except ValueError:
+                return jsonify({'error': 'Invalid start_date format'}), 400
+        
+        if end_date:
+            try:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+                query = query.filter(BookingArchive.booking_date <= end_date)
+            except ValueError:
+                return jsonify({'error': 'Invalid end_date format'}), 400
+        
+        # One extra row tells whether there is a next page without counting the archive
+        bookings = query.order_by(
+            BookingArchive.booking_date.desc(), BookingArchive.start_time.desc()
+        ).offset((page - 1) * per_page).limit(per_page + 1).all()
+        
+        booking_data = []
+        for booking in bookings[:per_page]:
+            data = booking.to_dict()
+            data['service'] = booking.service.to_dict() if booking.service else None
+            data['store'] = booking.store.to_dict() if booking.store else None
+            data['client'] = booking.client.to_dict() if booking.client else None
+            booking_data.append(data)
+        
+        return jsonify({
+            'bookings': booking_data,
+            'page': page,
+            'per_page': per_page,
+            'has_more': len(bookings) > per_page
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,152 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from src.models import db, Campaign, CampaignStatus, NotificationType, Store, UserRole
+from src.utils.auth import get_current_user, ensure_store_access, require_role
+from src.utils.campaigns import (
+    CAMPAIGN_VARIABLES, MAX_MESSAGE_LENGTH, count_recipients, start_campaign
+)
+from src.utils.message_templates import compile_template
+
+campaign_bp = Blueprint('campaign', __name__)
+
+@campaign_bp.route('/campaigns', methods=['POST'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def create_campaign():
+    """Create an SMS campaign to a store's clients and start sending it"""
+    try:
+        current_user = get_current_user()
+        data = request.get_json()
+
+        store_id = current_user.store_id if current_user.role == UserRole.STORE_MANAGER else data.get('store_id')
+        if not store_id:
+            return jsonify({'error': 'store_id is required'}), 400
+
+        store = Store.query.get(store_id)
+        if not store:
+            return jsonify({'error': 'Store not found'}), 404
+
+        if not data.get('message'):
+            return jsonify({'error': 'message is required'}), 400
+
+        template = compile_template(data['message'])
+        unknown = sorted(template.variables - set(CAMPAIGN_VARIABLES))
+        if unknown:
+            return jsonify({
+                'error': f"Unknown variables: {', '.join(unknown)}",
+                'variables': CAMPAIGN_VARIABLES
+            }), 400
+
+        message = template.render({'store_name': store.name})
+        if len(message) > MAX_MESSAGE_LENGTH:
+            return jsonify({'error': f'message is longer than {MAX_MESSAGE_LENGTH} characters'}), 400
+
+        # Default audience: clients who booked in the last 90 days; null means every store client
+        booked_within_days = data.get('booked_within_days', 90)
+        if booked_within_days is not None:
+            try:
+                booked_within_days = int(booked_within_days)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'booked_within_days must be a number of days'}), 400
+            if booked_within_days < 1:
+                return jsonify({'error': 'booked_within_days must be at least 1'}), 400
+        audience = {'booked_within_days': booked_within_days}
+
+        total_recipients = count_recipients(store.id, audience)
+        if not total_recipients:
+            return jsonify({'error': 'No clients with a phone number match this audience'}), 400
+
+        campaign = Campaign(
+            store_id=store.id,
+            created_by_user_id=current_user.id,
+            type=NotificationType.SMS,
+            message=message,
+            audience=audience,
+            batch_size=current_app.config['CAMPAIGN_BATCH_SIZE'],
+            total_recipients=total_recipients
+        )
+        db.session.add(campaign)
+        db.session.commit()
+
+        if current_app.config['CAMPAIGN_SEND_IN_BACKGROUND']:
+            start_campaign(current_app._get_current_object(), campaign.id)
+
+        return jsonify({
+            'message': 'Campaign created successfully',
+            'campaign': campaign.to_dict()
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@campaign_bp.route('/campaigns', methods=['GET'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def get_campaigns():
+    """List campaigns, newest first - store managers see their store's"""
+    try:
+        current_user = get_current_user()
+
+        query = Campaign.query
+        if current_user.role == UserRole.STORE_MANAGER:
+            query = query.filter_by(store_id=current_user.store_id)
+        elif request.args.get('store_id'):
+            query = query.filter_by(store_id=request.args.get('store_id'))
+
+        campaigns = query.order_by(Campaign.created_at.desc()).limit(100).all()
+
+        return jsonify([campaign.to_dict() for campaign in campaigns]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@campaign_bp.route('/campaigns/<campaign_id>', methods=['GET'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def get_campaign(campaign_id):
+    """Get a campaign with its per-batch progress"""
+    try:
+        current_user = get_current_user()
+
+        campaign = Campaign.query.get(campaign_id)
+        if not campaign:
+            return jsonify({'error': 'Campaign not found'}), 404
+
+        if not ensure_store_access(current_user, campaign.store_id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        return jsonify(campaign.to_dict(include_batches=True)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@campaign_bp.route('/campaigns/<campaign_id>/cancel', methods=['POST'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def cancel_campaign(campaign_id):
+    """Stop a campaign; batches already handed to the provider stay sent"""
+    try:
+        current_user = get_current_user()
+
+        campaign = Campaign.query.get(campaign_id)
+        if not campaign:
+            return jsonify({'error': 'Campaign not found'}), 404
+
+        if not ensure_store_access(current_user, campaign.store_id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        if campaign.status not in (CampaignStatus.PENDING, CampaignStatus.RUNNING):
+            return jsonify({'error': f'Campaign is already {campaign.status.value}'}), 409
+
+        campaign.status = CampaignStatus.CANCELLED
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Campaign cancelled',
+            'campaign': campaign.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
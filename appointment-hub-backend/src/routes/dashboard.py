@@ -1,14 +1,18 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from src.models import (
-    db, Booking, BookingStatus, Service, Store, User, UserRole, Payment, PaymentStatus
+    db, Booking, BookingPaymentStatus, BookingStatus, Service, Store, User, UserRole, Payment, PaymentStatus
 )
 from src.utils.auth import get_current_user, ensure_store_access
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import joinedload
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+# Bookings with money on them; amount_paid is 0 for every other payment status
+PAID_STATUSES = (BookingPaymentStatus.PAID, BookingPaymentStatus.PARTIAL)
+
 @dashboard_bp.route('/dashboard/stats', methods=['GET'])
 @jwt_required()
 def get_dashboard_stats():
@@ -73,7 +77,9 @@ def get_client_stats(user_id, start_date, today):
     ).scalar() or 0
     
     # Recent bookings (last 5)
-    recent_bookings = Booking.query.filter_by(
+    recent_bookings = Booking.query.options(
+        joinedload(Booking.service), joinedload(Booking.store)
+    ).filter_by(
         client_user_id=user_id
     ).order_by(Booking.created_at.desc()).limit(5).all()
     
@@ -130,22 +136,22 @@ def get_store_manager_stats(store_id, start_date, today):
     if last_month_bookings > 0:
         booking_change = ((month_bookings - last_month_bookings) / last_month_bookings) * 100
     
-    # Revenue (this month)
-    month_revenue = db.session.query(func.sum(Payment.amount)).join(Booking).filter(
+    # Revenue (this month), from the amount_paid rollup kept on bookings
+    month_revenue = db.session.query(func.sum(Booking.amount_paid)).filter(
         and_(
             Booking.store_id == store_id,
-            Booking.booking_date >= first_day_of_month,
-            Payment.status == PaymentStatus.SUCCEEDED
+            Booking.payment_status.in_(PAID_STATUSES),
+            Booking.booking_date >= first_day_of_month
         )
     ).scalar() or 0
     
     # Last month revenue for comparison
-    last_month_revenue = db.session.query(func.sum(Payment.amount)).join(Booking).filter(
+    last_month_revenue = db.session.query(func.sum(Booking.amount_paid)).filter(
         and_(
             Booking.store_id == store_id,
+            Booking.payment_status.in_(PAID_STATUSES),
             Booking.booking_date >= last_month_start,
-            Booking.booking_date <= last_month_end,
-            Payment.status == PaymentStatus.SUCCEEDED
+            Booking.booking_date <= last_month_end
         )
     ).scalar() or 0
     
@@ -186,7 +192,9 @@ def get_store_manager_stats(store_id, start_date, today):
     ).count()
     
     # Recent bookings (last 10)
-    recent_bookings = Booking.query.filter_by(
+    recent_bookings = Booking.query.options(
+        joinedload(Booking.service), joinedload(Booking.client)
+    ).filter_by(
         store_id=store_id
     ).order_by(Booking.created_at.desc()).limit(10).all()
     
@@ -256,7 +264,9 @@ def get_admin_stats(start_date, today):
     total_managers = User.query.filter_by(role=UserRole.STORE_MANAGER).count()
     
     # Recent bookings (last 10 across all stores)
-    recent_bookings = Booking.query.order_by(Booking.created_at.desc()).limit(10).all()
+    recent_bookings = Booking.query.options(
+        joinedload(Booking.service), joinedload(Booking.store), joinedload(Booking.client)
+    ).order_by(Booking.created_at.desc()).limit(10).all()
     
     recent_bookings_data = []
     for booking in recent_bookings:
@@ -270,13 +280,11 @@ def get_admin_stats(start_date, today):
     top_stores = db.session.query(
         Store.id,
         Store.name,
-        func.sum(Payment.amount).label('revenue')
-    ).join(Booking, Store.id == Booking.store_id).join(
-        Payment, Booking.id == Payment.booking_id
-    ).filter(
-        Payment.status == PaymentStatus.SUCCEEDED
+        func.sum(Booking.amount_paid).label('revenue')
+    ).join(Booking, Store.id == Booking.store_id).filter(
+        Booking.payment_status.in_(PAID_STATUSES)
     ).group_by(Store.id, Store.name).order_by(
-        func.sum(Payment.amount).desc()
+        func.sum(Booking.amount_paid).desc()
     ).limit(5).all()
     
     top_stores_data = [
@@ -363,8 +371,8 @@ def get_revenue_analytics():
         # Build base query
         query = db.session.query(
             Booking.booking_date,
-            func.sum(Payment.amount).label('revenue')
-        ).join(Payment, Booking.id == Payment.booking_id)
+            func.sum(Booking.amount_paid).label('revenue')
+        )
         
         if current_user.role == UserRole.STORE_MANAGER:
             if not current_user.store_id:
@@ -376,7 +384,7 @@ def get_revenue_analytics():
             and_(
                 Booking.booking_date >= start_date,
                 Booking.booking_date <= end_date,
-                Payment.status == PaymentStatus.SUCCEEDED
+                Booking.payment_status.in_(PAID_STATUSES)
             )
         ).group_by(Booking.booking_date).order_by(Booking.booking_date).all()
         
@@ -1,14 +1,20 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from src.models import (
-    db, Notification, NotificationType, NotificationStatus, 
-    Booking, User, UserRole
+    db, Notification, NotificationArchive, NotificationType, NotificationStatus, 
+    Booking, User, UserRole, Store, MessageTemplate
 )
 from src.utils.auth import get_current_user, ensure_store_access, require_role
+from src.utils.metrics import observe_external_call
+from src.utils.plan_limits import PlanLimitExceeded, release, reserve
+from src.utils.message_templates import (
+    DEFAULT_TEMPLATES, locale_chain, message_templates, unknown_variables
+)
 
 notification_bp = Blueprint('notification', __name__)
 
 # EasySMS integration (placeholder - would need actual EasySMS SDK)
+@observe_external_call('easysms')
 def send_sms_via_easysms(phone_number, message):
     """Send SMS via EasySMS (placeholder implementation)"""
     # In production, this would use the actual EasySMS API:
@@ -28,6 +34,7 @@ def send_sms_via_easysms(phone_number, message):
         'cost': 0.05
     }
 
+@observe_external_call('easysms')
 def send_email_via_easysms(email, subject, message):
     """Send email via EasySMS (placeholder implementation)"""
     # In production, this would use the actual EasySMS email API
@@ -62,6 +69,41 @@ def get_notifications():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@notification_bp.route('/notifications/history', methods=['GET'])
+@jwt_required()
+def get_notification_history():
+    """Get archived notifications (moved out by `flask archive-history`), newest first"""
+    try:
+        current_user = get_current_user()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        
+        query = NotificationArchive.query
+        if current_user.role == UserRole.CLIENT:
+            query = query.filter_by(recipient_user_id=current_user.id)
+        elif current_user.role == UserRole.STORE_MANAGER:
+            query = query.filter_by(store_id=current_user.store_id)
+        elif request.args.get('store_id'):
+            query = query.filter_by(store_id=request.args.get('store_id'))
+        
+        # One extra row tells whether there is a next page without counting the archive
+        notifications = query.order_by(NotificationArchive.sent_at.desc()).offset(
+            (page - 1) * per_page
+        ).limit(per_page + 1).all()
+        
+        return jsonify({
+            'notifications': [notification.to_dict() for notification in notifications[:per_page]],
+            'page': page,
+            'per_page': per_page,
+            'has_more': len(notifications) > per_page
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @notification_bp.route('/notifications/<notification_id>', methods=['GET'])
 @jwt_required()
 def get_notification(notification_id):
@@ -144,12 +186,20 @@ def send_notification():
             status=NotificationStatus.SENT
         )
         
+        if notification_type == NotificationType.SMS and not recipient.phone_number:
+            return jsonify({'error': 'Recipient has no phone number'}), 400
+        if notification_type == NotificationType.EMAIL and not recipient.email:
+            return jsonify({'error': 'Recipient has no email address'}), 400
+        
+        # Committed before the provider call, so the usage row is not locked during it
+        try:
+            reserve(notification.store_id, 'notifications')
+        except PlanLimitExceeded as e:
+            return jsonify({'error': str(e)}), 403
+        
         # Send the actual notification
         try:
             if notification_type == NotificationType.SMS:
-                if not recipient.phone_number:
-                    return jsonify({'error': 'Recipient has no phone number'}), 400
-                
                 response = send_sms_via_easysms(recipient.phone_number, data['body'])
                 if response.get('status') == 'success':
                     notification.external_message_id = response.get('message_id')
@@ -158,9 +208,6 @@ def send_notification():
                     notification.status = NotificationStatus.FAILED
             
             elif notification_type == NotificationType.EMAIL:
-                if not recipient.email:
-                    return jsonify({'error': 'Recipient has no email address'}), 400
-                
                 subject = data.get('subject', 'Notification')
                 response = send_email_via_easysms(recipient.email, subject, data['body'])
                 if response.get('status') == 'success':
@@ -172,6 +219,9 @@ def send_notification():
         except Exception as e:
             notification.status = NotificationStatus.FAILED
         
+        if notification.status == NotificationStatus.FAILED:
+            release(notification.store_id, 'notifications')
+        
         db.session.add(notification)
         db.session.commit()
         
@@ -217,7 +267,9 @@ def send_booking_confirmation(booking_id):
             'start_time': booking.start_time.strftime('%H:%M'),
             'end_time': booking.end_time.strftime('%H:%M'),
             'number_of_persons': booking.number_of_persons,
-            'total_amount': float(booking.total_amount) if booking.total_amount else 0
+            'total_amount': float(booking.total_amount) if booking.total_amount else 0,
+            'client_name': f'{booking.client.first_name} {booking.client.last_name}',
+            'store_name': booking.store.name
         }
         
         # Create notification
@@ -232,11 +284,17 @@ def send_booking_confirmation(booking_id):
         
         # Send the notification
         recipient = booking.client
+        if notification_type == NotificationType.SMS and not recipient.phone_number:
+            return jsonify({'error': 'Client has no phone number'}), 400
+        
+        # Committed before the provider call, so the usage row is not locked during it
+        try:
+            reserve(notification.store_id, 'notifications')
+        except PlanLimitExceeded as e:
+            return jsonify({'error': str(e)}), 403
+        
         try:
             if notification_type == NotificationType.SMS:
-                if not recipient.phone_number:
-                    return jsonify({'error': 'Client has no phone number'}), 400
-                
                 response = send_sms_via_easysms(recipient.phone_number, notification.body)
                 if response.get('status') == 'success':
                     notification.external_message_id = response.get('message_id')
@@ -255,6 +313,9 @@ def send_booking_confirmation(booking_id):
         except Exception as e:
             notification.status = NotificationStatus.FAILED
         
+        if notification.status == NotificationStatus.FAILED:
+            release(notification.store_id, 'notifications')
+        
         db.session.add(notification)
         db.session.commit()
         
@@ -298,7 +359,9 @@ def send_booking_reminder(booking_id):
             'service_name': booking.service.name,
             'booking_date': booking.booking_date.strftime('%Y-%m-%d'),
             'start_time': booking.start_time.strftime('%H:%M'),
-            'end_time': booking.end_time.strftime('%H:%M')
+            'end_time': booking.end_time.strftime('%H:%M'),
+            'client_name': f'{booking.client.first_name} {booking.client.last_name}',
+            'store_name': booking.store.name
         }
         
         # Create notification
@@ -313,11 +376,17 @@ def send_booking_reminder(booking_id):
         
         # Send the notification
         recipient = booking.client
+        if notification_type == NotificationType.SMS and not recipient.phone_number:
+            return jsonify({'error': 'Client has no phone number'}), 400
+        
+        # Committed before the provider call, so the usage row is not locked during it
+        try:
+            reserve(notification.store_id, 'notifications')
+        except PlanLimitExceeded as e:
+            return jsonify({'error': str(e)}), 403
+        
         try:
             if notification_type == NotificationType.SMS:
-                if not recipient.phone_number:
-                    return jsonify({'error': 'Client has no phone number'}), 400
-                
                 response = send_sms_via_easysms(recipient.phone_number, notification.body)
                 if response.get('status') == 'success':
                     notification.external_message_id = response.get('message_id')
@@ -336,6 +405,9 @@ def send_booking_reminder(booking_id):
         except Exception as e:
             notification.status = NotificationStatus.FAILED
         
+        if notification.status == NotificationStatus.FAILED:
+            release(notification.store_id, 'notifications')
+        
         db.session.add(notification)
         db.session.commit()
         
@@ -348,6 +420,119 @@ def send_booking_reminder(booking_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@notification_bp.route('/stores/<store_id>/message-templates', methods=['GET'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def get_message_templates(store_id):
+    """List a store's notification templates - its own wording where saved, else the built-in one"""
+    try:
+        current_user = get_current_user()
+        if not ensure_store_access(current_user, store_id):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        locale = request.args.get('locale')
+        templates = []
+        for key, default in DEFAULT_TEMPLATES.items():
+            template_set = message_templates.get(key, store_id, locale)
+            templates.append({
+                'key': key,
+                'subject': template_set.subject.source if template_set.subject else None,
+                'body': template_set.body.source,
+                'custom': template_set.custom,
+                'variables': default['variables']
+            })
+        
+        custom = MessageTemplate.query.filter_by(store_id=store_id).order_by(
+            MessageTemplate.key, MessageTemplate.locale
+        ).all()
+        
+        return jsonify({
+            'locale': locale_chain(locale)[0],
+            'templates': templates,
+            'custom_templates': [template.to_dict() for template in custom]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@notification_bp.route('/stores/<store_id>/message-templates/<key>', methods=['PUT'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def save_message_template(store_id, key):
+    """Save a store's own wording for a notification template"""
+    try:
+        current_user = get_current_user()
+        if not ensure_store_access(current_user, store_id):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        if key not in DEFAULT_TEMPLATES:
+            return jsonify({'error': 'Unknown template', 'templates': list(DEFAULT_TEMPLATES)}), 404
+        
+        if not Store.query.get(store_id):
+            return jsonify({'error': 'Store not found'}), 404
+        
+        data = request.get_json()
+        if not data.get('body'):
+            return jsonify({'error': 'body is required'}), 400
+        
+        locale = data.get('locale') or 'en'
+        if len(locale) > 10:
+            return jsonify({'error': 'Invalid locale'}), 400
+        
+        unknown = unknown_variables(key, data.get('subject'), data['body'])
+        if unknown:
+            return jsonify({
+                'error': f"Unknown variables: {', '.join(unknown)}",
+                'variables': DEFAULT_TEMPLATES[key]['variables']
+            }), 400
+        
+        template = MessageTemplate.query.filter_by(store_id=store_id, key=key, locale=locale).first()
+        status_code = 200
+        if not template:
+            template = MessageTemplate(store_id=store_id, key=key, locale=locale)
+            db.session.add(template)
+            status_code = 201
+        
+        template.subject = data.get('subject')
+        template.body = data['body']
+        db.session.commit()
+        message_templates.invalidate(store_id)
+        
+        return jsonify({
+            'message': 'Template saved successfully',
+            'template': template.to_dict()
+        }), status_code
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@notification_bp.route('/stores/<store_id>/message-templates/<key>', methods=['DELETE'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def delete_message_template(store_id, key):
+    """Go back to the built-in wording for a template"""
+    try:
+        current_user = get_current_user()
+        if not ensure_store_access(current_user, store_id):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        template = MessageTemplate.query.filter_by(
+            store_id=store_id, key=key, locale=request.args.get('locale') or 'en'
+        ).first()
+        if not template:
+            return jsonify({'error': 'Template not found'}), 404
+        
+        db.session.delete(template)
+        db.session.commit()
+        message_templates.invalidate(store_id)
+        
+        return jsonify({'message': 'Template reset to default'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @notification_bp.route('/easysms-webhook', methods=['POST'])
 def easysms_webhook():
     """Handle EasySMS webhook events for delivery reports"""
@@ -2,11 +2,15 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from src.models import db, Payment, PaymentStatus, Booking, Subscription, UserRole
 from src.utils.auth import get_current_user, ensure_store_access
+from src.utils.booking_payments import rollup_booking_payments
+from src.utils.idempotency import idempotent
+from src.utils.metrics import observe_external_call
 import os
 
 payment_bp = Blueprint('payment', __name__)
 
 # Stripe integration (placeholder - would need actual Stripe SDK)
+@observe_external_call('stripe')
 def create_stripe_payment_intent(amount, currency='eur', metadata=None):
     """Create a Stripe PaymentIntent (placeholder implementation)"""
     # In production, this would use the actual Stripe SDK:
@@ -72,6 +76,7 @@ def get_payment(payment_id):
 
 @payment_bp.route('/bookings/<booking_id>/create-payment-intent', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_booking_payment_intent(booking_id):
     """Create a payment intent for a booking"""
     try:
@@ -148,6 +153,7 @@ def create_booking_payment_intent(booking_id):
 
 @payment_bp.route('/subscriptions/<subscription_id>/create-payment-intent', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_subscription_payment_intent(subscription_id):
     """Create a payment intent for a subscription"""
     try:
@@ -163,14 +169,22 @@ def create_subscription_payment_intent(subscription_id):
         if not ensure_store_access(current_user, subscription.store_id):
             return jsonify({'error': 'Access denied'}), 403
         
+        # A renewal left by `flask process-subscriptions` is paid through this intent
+        renewal = Payment.query.filter_by(
+            subscription_id=subscription_id,
+            status=PaymentStatus.PENDING,
+            stripe_payment_intent_id=None
+        ).first()
+        
         # Get subscription plan amount
-        amount = float(subscription.plan.price_amount)
+        amount = float(renewal.amount if renewal else subscription.plan.price_amount)
+        currency = renewal.currency if renewal else subscription.plan.currency
         amount_cents = int(amount * 100)
         
         # Create Stripe PaymentIntent
         payment_intent = create_stripe_payment_intent(
             amount=amount_cents,
-            currency=subscription.plan.currency.lower(),
+            currency=currency.lower(),
             metadata={
                 'subscription_id': subscription_id,
                 'store_id': subscription.store_id,
@@ -179,14 +193,17 @@ def create_subscription_payment_intent(subscription_id):
         )
         
         # Create Payment record
-        payment = Payment.create_from_stripe_intent(
-            payment_intent,
-            store_id=subscription.store_id,
-            user_id=current_user.id,
-            subscription_id=subscription_id
-        )
-        
-        db.session.add(payment)
+        if renewal:
+            payment = renewal
+            payment.stripe_payment_intent_id = payment_intent['id']
+        else:
+            payment = Payment.create_from_stripe_intent(
+                payment_intent,
+                store_id=subscription.store_id,
+                user_id=current_user.id,
+                subscription_id=subscription_id
+            )
+            db.session.add(payment)
         db.session.commit()
         
         return jsonify({
@@ -194,7 +211,7 @@ def create_subscription_payment_intent(subscription_id):
                 'id': payment_intent['id'],
                 'client_secret': payment_intent['client_secret'],
                 'amount': amount,
-                'currency': subscription.plan.currency
+                'currency': currency
             },
             'payment': payment.to_dict()
         }), 201
@@ -205,56 +222,29 @@ def create_subscription_payment_intent(subscription_id):
 
 @payment_bp.route('/stripe-webhook', methods=['POST'])
 def stripe_webhook():
-    """Handle Stripe webhook events"""
+    """Handle Stripe webhook events - only signed events are processed"""
+    # Loaded on first use so importing the app does not pull in the Stripe SDK
+    from src.utils.stripe_integration import create_stripe_integration
+    from src.utils.stripe_webhooks import process_events
+    stripe_integration = create_stripe_integration()
+    if not stripe_integration or not stripe_integration.webhook_secret:
+        return jsonify({'error': 'Stripe webhooks are not configured'}), 503
+
+    verified = stripe_integration.construct_webhook_event(
+        request.get_data(), request.headers.get('Stripe-Signature', '')
+    )
+    if not verified['success']:
+        return jsonify({'error': verified['error']}), 400
+
     try:
-        payload = request.get_data()
-        sig_header = request.headers.get('Stripe-Signature')
-        
-        # In production, verify the webhook signature:
-        # event = stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
-        
-        # For now, parse the JSON payload directly (in production, use the verified event)
-        import json
-        event_data = json.loads(payload)
-        
-        event_type = event_data.get('type')
-        event_object = event_data.get('data', {}).get('object', {})
-        
-        if event_type in ['payment_intent.succeeded', 'payment_intent.payment_failed']:
-            # Find payment by Stripe PaymentIntent ID
-            payment_intent_id = event_object.get('id')
-            payment = Payment.query.filter_by(stripe_payment_intent_id=payment_intent_id).first()
-            
-            if payment:
-                payment.update_from_stripe_event(event_data)
-                
-                # Update booking payment status if it's a booking payment
-                if payment.booking_id:
-                    booking = payment.booking
-                    if payment.is_successful():
-                        if payment.amount >= booking.total_amount:
-                            booking.payment_status = PaymentStatus.PAID
-                        else:
-                            booking.payment_status = PaymentStatus.PARTIAL
-                    else:
-                        booking.payment_status = PaymentStatus.UNPAID
-                
-                db.session.commit()
-        
-        elif event_type in ['customer.subscription.created', 'customer.subscription.updated', 'customer.subscription.deleted']:
-            # Handle subscription events
-            stripe_subscription_id = event_object.get('id')
-            subscription = Subscription.query.filter_by(stripe_subscription_id=stripe_subscription_id).first()
-            
-            if subscription:
-                subscription.update_from_stripe_event(event_data)
-                db.session.commit()
-        
-        return jsonify({'status': 'success'}), 200
-        
+        results = process_events([verified['event']])
+        db.session.commit()
+        return jsonify({'status': 'success', 'events': results}), 200
+
     except Exception as e:
+        # 5xx makes Stripe deliver the event again later
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return jsonify({'error': str(e)}), 500
 
 @payment_bp.route('/payments/<payment_id>/refund', methods=['POST'])
 @jwt_required()
@@ -288,8 +278,9 @@ def refund_payment(payment_id):
         #     amount=int(refund_amount * 100) if refund_amount else None
         # )
         
-        # Update payment status
+        # Update payment status, and the booking's totals with it
         payment.status = PaymentStatus.REFUNDED
+        rollup_booking_payments([payment.booking_id])
         db.session.commit()
         
         return jsonify({
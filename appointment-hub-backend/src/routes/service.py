@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from src.models import db, Service, Store, UserRole, PriceType, AdvancePaymentType, RecurringInterval
 from src.utils.auth import get_current_user, ensure_store_access
+from src.utils.plan_limits import PlanLimitExceeded, consume, release
 
 service_bp = Blueprint('service', __name__)
 
@@ -91,6 +92,11 @@ def create_service(store_id):
             except ValueError:
                 return jsonify({'error': 'Invalid recurring_interval'}), 400
         
+        try:
+            consume(store_id, 'services')
+        except PlanLimitExceeded as e:
+            return jsonify({'error': str(e)}), 403
+        
         service = Service(
             store_id=store_id,
             name=data['name'],
@@ -212,6 +218,7 @@ def delete_service(service_id):
             return jsonify({'error': 'Cannot delete service with active bookings'}), 409
         
         db.session.delete(service)
+        release(service.store_id, 'services')
         db.session.commit()
         
         return jsonify({'message': 'Service deleted successfully'}), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models import db, Store, User, UserRole
 from src.utils.auth import require_role, get_current_user, ensure_store_access
+from src.utils.plan_limits import usage_summary
 import re
 
 store_bp = Blueprint('store', __name__)
@@ -246,6 +247,24 @@ def remove_store_photo(store_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@store_bp.route('/stores/<store_id>/usage', methods=['GET'])
+@jwt_required()
+def get_store_usage(store_id):
+    """Get a store's usage against its subscription plan limits"""
+    try:
+        current_user = get_current_user()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Authorization check
+        if not ensure_store_access(current_user, store_id):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        return jsonify(usage_summary(store_id)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @store_bp.route('/my-store', methods=['GET'])
 @jwt_required()
 @require_role([UserRole.STORE_MANAGER])
@@ -1,19 +1,22 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
+from datetime import datetime
 from src.models import (
     db, SubscriptionPlan, Subscription, SubscriptionInterval, 
     SubscriptionStatus, UserRole, Store
 )
 from src.utils.auth import get_current_user, require_role, ensure_store_access
+from src.utils.plan_cache import plan_cache
+from src.utils.subscription_renewals import add_interval
+from sqlalchemy.orm import joinedload
 
 subscription_bp = Blueprint('subscription', __name__)
 
 @subscription_bp.route('/subscription-plans', methods=['GET'])
 def get_subscription_plans():
-    """Get all active subscription plans (public endpoint)"""
+    """Get all active subscription plans (public endpoint, served from the plan cache)"""
     try:
-        plans = SubscriptionPlan.query.filter_by(is_active=True).all()
-        return jsonify([plan.to_dict() for plan in plans]), 200
+        return jsonify([plan.to_dict() for plan in plan_cache.active_plans()]), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -51,6 +54,7 @@ def create_subscription_plan():
         
         db.session.add(plan)
         db.session.commit()
+        plan_cache.invalidate()
         
         return jsonify({
             'message': 'Subscription plan created successfully',
@@ -65,7 +69,7 @@ def create_subscription_plan():
 def get_subscription_plan(plan_id):
     """Get a specific subscription plan"""
     try:
-        plan = SubscriptionPlan.query.get(plan_id)
+        plan = plan_cache.get(plan_id)
         if not plan:
             return jsonify({'error': 'Subscription plan not found'}), 404
         
@@ -101,6 +105,7 @@ def update_subscription_plan(plan_id):
                 return jsonify({'error': 'Invalid interval'}), 400
         
         db.session.commit()
+        plan_cache.invalidate()
         
         return jsonify({
             'message': 'Subscription plan updated successfully',
@@ -132,6 +137,7 @@ def delete_subscription_plan(plan_id):
         
         db.session.delete(plan)
         db.session.commit()
+        plan_cache.invalidate()
         
         return jsonify({'message': 'Subscription plan deleted successfully'}), 200
         
@@ -148,20 +154,23 @@ def get_subscriptions():
         if not current_user:
             return jsonify({'error': 'User not found'}), 404
         
+        query = Subscription.query.options(joinedload(Subscription.store))
+        
         if current_user.role == UserRole.ADMIN:
             # Admin can see all subscriptions
-            subscriptions = Subscription.query.all()
+            subscriptions = query.all()
         elif current_user.role == UserRole.STORE_MANAGER:
             # Store manager can see their store's subscriptions
-            subscriptions = Subscription.query.filter_by(store_id=current_user.store_id).all()
+            subscriptions = query.filter_by(store_id=current_user.store_id).all()
         else:
             return jsonify({'error': 'Access denied'}), 403
         
-        # Include plan details
+        # Include plan details (from the plan cache)
         subscription_data = []
         for subscription in subscriptions:
+            plan = plan_cache.get(subscription.plan_id)
             data = subscription.to_dict()
-            data['plan'] = subscription.plan.to_dict() if subscription.plan else None
+            data['plan'] = plan.to_dict() if plan else None
             data['store'] = subscription.store.to_dict() if subscription.store else None
             subscription_data.append(data)
         
@@ -185,11 +194,12 @@ def get_store_subscriptions(store_id):
         
         subscriptions = Subscription.query.filter_by(store_id=store_id).all()
         
-        # Include plan details
+        # Include plan details (from the plan cache)
         subscription_data = []
         for subscription in subscriptions:
+            plan = plan_cache.get(subscription.plan_id)
             data = subscription.to_dict()
-            data['plan'] = subscription.plan.to_dict() if subscription.plan else None
+            data['plan'] = plan.to_dict() if plan else None
             subscription_data.append(data)
         
         return jsonify(subscription_data), 200
@@ -220,7 +230,7 @@ def create_subscription(store_id):
         if not plan_id:
             return jsonify({'error': 'plan_id is required'}), 400
         
-        plan = SubscriptionPlan.query.get(plan_id)
+        plan = plan_cache.get(plan_id)
         if not plan or not plan.is_active:
             return jsonify({'error': 'Invalid or inactive subscription plan'}), 404
         
@@ -233,11 +243,15 @@ def create_subscription(store_id):
         if existing_subscription:
             return jsonify({'error': 'Store already has an active subscription'}), 409
         
-        # Create subscription
+        # Create subscription; `flask process-subscriptions` renews it at the end of the period
+        now = datetime.utcnow()
         subscription = Subscription(
             store_id=store_id,
             plan_id=plan_id,
-            status=SubscriptionStatus.ACTIVE
+            status=SubscriptionStatus.ACTIVE,
+            start_date=now,
+            current_period_start=now,
+            current_period_end=add_interval(now, plan.data['interval'])
         )
         
         db.session.add(subscription)
@@ -278,8 +292,9 @@ def get_subscription(subscription_id):
             return jsonify({'error': 'Access denied'}), 403
         
         # Include plan details
+        plan = plan_cache.get(subscription.plan_id)
         data = subscription.to_dict()
-        data['plan'] = subscription.plan.to_dict() if subscription.plan else None
+        data['plan'] = plan.to_dict() if plan else None
         data['store'] = subscription.store.to_dict() if subscription.store else None
         
         return jsonify(data), 200
@@ -347,7 +362,7 @@ def upgrade_subscription(subscription_id):
         if not new_plan_id:
             return jsonify({'error': 'plan_id is required'}), 400
         
-        new_plan = SubscriptionPlan.query.get(new_plan_id)
+        new_plan = plan_cache.get(new_plan_id)
         if not new_plan or not new_plan.is_active:
             return jsonify({'error': 'Invalid or inactive subscription plan'}), 404
         
@@ -361,10 +376,14 @@ def upgrade_subscription(subscription_id):
         subscription.cancel()
         
         # Create new subscription
+        now = datetime.utcnow()
         new_subscription = Subscription(
             store_id=subscription.store_id,
             plan_id=new_plan_id,
-            status=SubscriptionStatus.ACTIVE
+            status=SubscriptionStatus.ACTIVE,
+            start_date=now,
+            current_period_start=now,
+            current_period_end=add_interval(now, new_plan.data['interval'])
         )
         
         db.session.add(new_subscription)
@@ -407,8 +426,9 @@ def get_my_subscription():
             return jsonify({'error': 'No active subscription found'}), 404
         
         # Include plan details
+        plan = plan_cache.get(subscription.plan_id)
         data = subscription.to_dict()
-        data['plan'] = subscription.plan.to_dict() if subscription.plan else None
+        data['plan'] = plan.to_dict() if plan else None
         
         return jsonify(data), 200
         
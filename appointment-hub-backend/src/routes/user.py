@@ -1,7 +1,8 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models import db, User, UserRole
+from src.models import db, Store, User, UserRole, UserInvite
 from src.utils.auth import require_role, get_current_user
+from src.utils.client_import import ClientImporter, ImportFormatError, iter_import_rows
 
 user_bp = Blueprint('user', __name__)
 
@@ -18,11 +19,12 @@ def get_users():
             # Admin can see all users
             users = User.query.all()
         elif current_user.role == UserRole.STORE_MANAGER:
-            # Store manager can see clients who have bookings in their store
+            # Store manager can see clients who have bookings in their store or were imported by it
             from src.models import Booking
             client_ids = db.session.query(Booking.client_user_id).filter_by(store_id=current_user.store_id).distinct().all()
             client_ids = [id[0] for id in client_ids]
-            users = User.query.filter(User.id.in_(client_ids)).all()
+            invited_ids = db.session.query(UserInvite.user_id).filter_by(store_id=current_user.store_id)
+            users = User.query.filter(db.or_(User.id.in_(client_ids), User.id.in_(invited_ids))).all()
         else:
             # Clients can only see themselves
             users = [current_user]
@@ -84,6 +86,41 @@ def create_user():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@user_bp.route('/users/import', methods=['POST'])
+@jwt_required()
+@require_role([UserRole.ADMIN, UserRole.STORE_MANAGER])
+def import_clients():
+    """Bulk-create client accounts from a CSV or NDJSON upload (store onboarding)"""
+    try:
+        current_user = get_current_user()
+        
+        if current_user.role == UserRole.STORE_MANAGER:
+            if not current_user.store_id:
+                return jsonify({'error': 'Store manager has no store'}), 403
+            store_id = current_user.store_id
+        else:
+            store_id = request.args.get('store_id')
+            if store_id and not Store.query.get(store_id):
+                return jsonify({'error': 'Store not found'}), 404
+        
+        importer = ClientImporter(
+            store_id=store_id,
+            chunk_size=current_app.config['CLIENT_IMPORT_CHUNK_SIZE'],
+            max_rows=current_app.config['CLIENT_IMPORT_MAX_ROWS'],
+            invite_ttl_days=current_app.config['INVITE_TOKEN_TTL_DAYS']
+        )
+        # Rows are validated and written while the body is still streaming in
+        report = importer.run(iter_import_rows(request.stream, request.content_type))
+        
+        return jsonify({'message': 'Import finished', **report}), 200
+        
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @user_bp.route('/users/<user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
@@ -108,7 +145,11 @@ def get_user(user_id):
                     client_user_id=user_id,
                     store_id=current_user.store_id
                 ).first()
-                if not booking_exists and current_user.id != user_id:
+                invite_exists = UserInvite.query.filter_by(
+                    user_id=user_id,
+                    store_id=current_user.store_id
+                ).first()
+                if not booking_exists and not invite_exists and current_user.id != user_id:
                     return jsonify({'error': 'Access denied'}), 403
             elif current_user.id != user_id:
                 return jsonify({'error': 'Access denied'}), 403
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta
+from typing import Dict
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.types import DateTime
+from src.models import db, Booking, BookingArchive, Notification, NotificationArchive
+
+def archive_cutoff(days: int, today: date = None) -> date:
+    """First booking date that stays in the live tables"""
+    return (today or date.today()) - timedelta(days=days)
+
+def _copy_rows(source, target, ids, archived_at):
+    """INSERT ... SELECT the given rows of a live table into its archive table"""
+    columns = [column.name for column in source.columns]
+    db.session.execute(target.insert().from_select(
+        columns + ['archived_at'],
+        select(*source.columns, literal(archived_at, DateTime)).where(source.c.id.in_(ids))
+    ))
+
+def _move_notifications(ids, archived_at):
+    notifications = Notification.__table__
+    _copy_rows(notifications, NotificationArchive.__table__, ids, archived_at)
+    db.session.execute(notifications.delete().where(notifications.c.id.in_(ids)))
+
+def archive_history(cutoff: date, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+    """Move bookings dated before `cutoff` and notifications sent before it to the archive tables.
+
+    Works in batches, each in its own transaction, so the live tables are only
+    locked briefly and an interrupted run can simply be started again. A
+    booking's notifications move with it. Payments stay in place; their
+    booking_id then refers to the archived booking.
+    """
+    bookings = Booking.__table__
+    notifications = Notification.__table__
+    cutoff_at = datetime.combine(cutoff, datetime.min.time())
+    old_bookings = bookings.c.booking_date < cutoff
+
+    if dry_run:
+        booking_count = db.session.execute(select(func.count()).select_from(bookings).where(old_bookings)).scalar()
+        notification_count = db.session.execute(
+            select(func.count()).select_from(notifications).where(or_(
+                notifications.c.sent_at < cutoff_at,
+                notifications.c.booking_id.in_(select(bookings.c.id).where(old_bookings))
+            ))
+        ).scalar()
+        db.session.rollback()
+        return {'bookings': booking_count, 'notifications': notification_count}
+
+    moved = {'bookings': 0, 'notifications': 0}
+    archived_at = datetime.utcnow()
+
+    while True:
+        booking_ids = db.session.execute(
+            select(bookings.c.id).where(old_bookings).limit(batch_size)
+        ).scalars().all()
+        if not booking_ids:
+            break
+
+        # Notifications first - they reference the bookings being moved
+        notification_ids = db.session.execute(
+            select(notifications.c.id).where(notifications.c.booking_id.in_(booking_ids))
+        ).scalars().all()
+        for start in range(0, len(notification_ids), batch_size):
+            _move_notifications(notification_ids[start:start + batch_size], archived_at)
+
+        _copy_rows(bookings, BookingArchive.__table__, booking_ids, archived_at)
+        db.session.execute(bookings.delete().where(bookings.c.id.in_(booking_ids)))
+        db.session.commit()
+        moved['bookings'] += len(booking_ids)
+        moved['notifications'] += len(notification_ids)
+
+    while True:
+        notification_ids = db.session.execute(
+            select(notifications.c.id).where(notifications.c.sent_at < cutoff_at).limit(batch_size)
+        ).scalars().all()
+        if not notification_ids:
+            break
+        _move_notifications(notification_ids, archived_at)
+        db.session.commit()
+        moved['notifications'] += len(notification_ids)
+
+    return moved
@@ -0,0 +1,49 @@
+from typing import Iterable
+from sqlalchemy import and_, case, cast, exists, func, literal, select, update
+from src.models import db, Booking, BookingPaymentStatus, Payment, PaymentStatus
+
+def rollup_booking_payments(booking_ids: Iterable[str]) -> int:
+    """Recompute bookings' amount_paid and payment_status from their payments.
+
+    Call it in the transaction that changed the payments, after the change.
+    The bookings are locked first (in id order, so concurrent webhooks can't
+    deadlock), then updated by one statement that sums their succeeded
+    payments - on PostgreSQL that statement runs after any concurrent payment
+    change to the same booking has committed, so the totals are never stale.
+    Bookings already in the archive are left as they were; ones loaded in the
+    session see the new values.
+    """
+    booking_ids = sorted(set(filter(None, booking_ids)))
+    if not booking_ids:
+        return 0
+
+    bookings = Booking.__table__
+    payments = Payment.__table__
+    db.session.execute(
+        select(Booking.id).where(Booking.id.in_(booking_ids)).order_by(Booking.id).with_for_update()
+    ).all()
+
+    paid = select(func.coalesce(func.sum(payments.c.amount), 0)).where(
+        payments.c.booking_id == bookings.c.id,
+        payments.c.status == PaymentStatus.SUCCEEDED
+    ).scalar_subquery()
+    refunded = exists().where(
+        payments.c.booking_id == bookings.c.id,
+        payments.c.status == PaymentStatus.REFUNDED
+    )
+
+    def status(value):
+        # Cast, so PostgreSQL types the CASE as the enum rather than text
+        return cast(literal(value, bookings.c.payment_status.type), bookings.c.payment_status.type)
+
+    return db.session.execute(
+        update(Booking).where(Booking.id.in_(booking_ids)).values(
+            amount_paid=paid,
+            payment_status=case(
+                (and_(paid > 0, paid >= bookings.c.total_amount), status(BookingPaymentStatus.PAID)),
+                (paid > 0, status(BookingPaymentStatus.PARTIAL)),
+                (refunded, status(BookingPaymentStatus.REFUNDED)),
+                else_=status(BookingPaymentStatus.UNPAID)
+            )
+        ).execution_options(synchronize_session='fetch')
+    ).rowcount
@@ -2,6 +2,8 @@ import os
 import requests
 from datetime import datetime
 from typing import Dict, List, Optional
+from src.utils.metrics import mark_external_call_failed, observe_external_call
+from src.utils.provider_guard import ProviderHTTP
 
 class CalendlyIntegration:
     """Calendly API v2 integration for calendar synchronization"""
@@ -9,28 +11,32 @@ class CalendlyIntegration:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.calendly.com"
+        self.http = ProviderHTTP('calendly')
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
     
+    @observe_external_call('calendly')
     def get_current_user(self) -> Optional[Dict]:
         """Get current user information"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/users/me",
                 headers=self.headers
             )
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
+            mark_external_call_failed()
             print(f"Error getting current user: {e}")
             return None
     
+    @observe_external_call('calendly')
     def get_event_types(self, user_uri: str) -> List[Dict]:
         """Get event types for a user"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/event_types",
                 headers=self.headers,
                 params={"user": user_uri}
@@ -38,9 +44,11 @@ class CalendlyIntegration:
             response.raise_for_status()
             return response.json().get("collection", [])
         except requests.RequestException as e:
+            mark_external_call_failed()
             print(f"Error getting event types: {e}")
             return []
     
+    @observe_external_call('calendly')
     def get_scheduled_events(self, user_uri: str, start_time: str = None, end_time: str = None) -> List[Dict]:
         """Get scheduled events for a user"""
         try:
@@ -50,7 +58,7 @@ class CalendlyIntegration:
             if end_time:
                 params["max_start_time"] = end_time
             
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/scheduled_events",
                 headers=self.headers,
                 params=params
@@ -58,9 +66,11 @@ class CalendlyIntegration:
             response.raise_for_status()
             return response.json().get("collection", [])
         except requests.RequestException as e:
+            mark_external_call_failed()
             print(f"Error getting scheduled events: {e}")
             return []
     
+    @observe_external_call('calendly')
     def create_webhook_subscription(self, url: str, events: List[str], organization_uri: str) -> Optional[Dict]:
         """Create a webhook subscription"""
         try:
@@ -71,7 +81,7 @@ class CalendlyIntegration:
                 "scope": "organization"
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/webhook_subscriptions",
                 headers=self.headers,
                 json=data
@@ -79,19 +89,22 @@ class CalendlyIntegration:
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
+            mark_external_call_failed()
             print(f"Error creating webhook subscription: {e}")
             return None
     
+    @observe_external_call('calendly')
     def delete_webhook_subscription(self, webhook_uuid: str) -> bool:
         """Delete a webhook subscription"""
         try:
-            response = requests.delete(
+            response = self.http.delete(
                 f"{self.base_url}/webhook_subscriptions/{webhook_uuid}",
                 headers=self.headers
             )
             response.raise_for_status()
             return True
         except requests.RequestException as e:
+            mark_external_call_failed()
             print(f"Error deleting webhook subscription: {e}")
             return False
     
@@ -0,0 +1,199 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import and_, func, or_, select, union, update
+from src.models import (
+    db, Booking, Campaign, CampaignStatus, Notification, NotificationStatus, NotificationType,
+    User, UserInvite, UserRole
+)
+from src.models.types import generate_uuid
+from src.utils.plan_limits import PlanLimitExceeded, release, reserve
+
+# Placeholders a campaign message may use; it is rendered once, not per recipient,
+# because the provider's bulk endpoint sends one text to every number in a batch
+CAMPAIGN_VARIABLES = ['store_name']
+MAX_MESSAGE_LENGTH = 1600
+
+def audience_query(store_id: str, audience: Dict):
+    """Ids of the store's clients a campaign targets.
+
+    `booked_within_days` limits it to clients with a booking in that window;
+    without it every client who ever booked or was imported by the store is in.
+    """
+    bookings = Booking.__table__
+    clients = select(bookings.c.client_user_id).where(bookings.c.store_id == store_id)
+    if audience.get('booked_within_days'):
+        since = date.today() - timedelta(days=int(audience['booked_within_days']))
+        return clients.where(bookings.c.booking_date >= since)
+
+    invites = UserInvite.__table__
+    return union(clients, select(invites.c.user_id).where(invites.c.store_id == store_id))
+
+def _recipients(store_id: str, audience: Dict):
+    """Clients with a phone number in the audience, in users.id order"""
+    users = User.__table__
+    return (
+        select(users.c.id, users.c.phone_number)
+        .where(
+            users.c.id.in_(audience_query(store_id, audience)),
+            users.c.role == UserRole.CLIENT,
+            users.c.phone_number.isnot(None),
+            users.c.phone_number != ''
+        )
+        .order_by(users.c.id)
+    )
+
+def count_recipients(store_id: str, audience: Dict) -> int:
+    return db.session.execute(
+        select(func.count()).select_from(_recipients(store_id, audience).subquery())
+    ).scalar()
+
+def create_bulk_sender() -> Callable[[List[str], str], Dict]:
+    """Return a function sending one text to a batch of numbers through EasySMS"""
+    # Loaded on first use so importing the app does not pull in requests
+    from src.utils.easysms_integration import create_easysms_integration
+    integration = create_easysms_integration()
+    if integration is None:
+        # Same placeholder behaviour as the single-message routes without an API key
+        def send_mock(phone_numbers, message):
+            return {'success': True, 'batch_id': f'sms_bulk_mock_{uuid.uuid4().hex[:12]}',
+                    'total_messages': len(phone_numbers)}
+        return send_mock
+
+    def send(phone_numbers, message):
+        return integration.send_bulk_sms([integration.format_phone_number(phone) for phone in phone_numbers], message)
+    return send
+
+def _claim(campaign_id: str, stale_before: Optional[datetime]) -> bool:
+    """Move a campaign to RUNNING unless another runner already has it"""
+    campaigns = Campaign.__table__
+    claimable = campaigns.c.status == CampaignStatus.PENDING
+    if stale_before is not None:
+        # A RUNNING campaign whose runner stopped reporting progress (worker restart)
+        claimable = or_(claimable, and_(campaigns.c.status == CampaignStatus.RUNNING,
+                                        campaigns.c.updated_at < stale_before))
+    claimed = db.session.execute(
+        update(campaigns).where(campaigns.c.id == campaign_id, claimable)
+        .values(status=CampaignStatus.RUNNING, updated_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return claimed == 1
+
+def run_campaign(campaign_id: str, sender: Optional[Callable] = None,
+                 stale_before: Optional[datetime] = None) -> Optional[Campaign]:
+    """Send a campaign batch by batch, resuming from its cursor.
+
+    The audience is read once per run (ids and phone numbers after the
+    cursor, in id order); re-running the audience query for every batch
+    would make a large campaign quadratic. Then per batch: one plan-usage
+    update, one provider call, one multi-row insert of the Notification rows
+    and one commit that also records the batch and moves the cursor. A batch
+    that would go over the store's plan stops the campaign. A batch
+    interrupted between the provider call and the commit is sent again on
+    resume.
+    """
+    if not _claim(campaign_id, stale_before):
+        return None
+
+    campaign = db.session.get(Campaign, campaign_id)
+    if campaign.started_at is None:
+        campaign.started_at = datetime.utcnow()
+        db.session.commit()
+
+    send = sender or create_bulk_sender()
+    notifications = Notification.__table__
+    query = _recipients(campaign.store_id, campaign.audience)
+    if campaign.last_recipient_id:
+        query = query.where(User.__table__.c.id > campaign.last_recipient_id)
+    recipients = db.session.execute(query).all()
+
+    for start in range(0, len(recipients), campaign.batch_size):
+        if campaign.status != CampaignStatus.RUNNING:
+            break
+        batch = recipients[start:start + campaign.batch_size]
+
+        try:
+            reserve(campaign.store_id, 'notifications', len(batch))
+        except PlanLimitExceeded as e:
+            # Batches already sent stay sent; the rest would go over the plan
+            campaign.status = CampaignStatus.FAILED
+            campaign.error = str(e)
+            campaign.completed_at = datetime.utcnow()
+            db.session.commit()
+            break
+
+        try:
+            result = send([phone for _, phone in batch], campaign.message)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        status = NotificationStatus.SENT if result.get('success') else NotificationStatus.FAILED
+        if status == NotificationStatus.FAILED:
+            release(campaign.store_id, 'notifications', len(batch))
+
+        now = datetime.utcnow()
+        db.session.execute(notifications.insert(), [{
+            'id': generate_uuid(),
+            'store_id': campaign.store_id,
+            'recipient_user_id': user_id,
+            'campaign_id': campaign.id,
+            'type': NotificationType.SMS,
+            'body': campaign.message,
+            'status': status,
+            'sent_at': now,
+            'created_at': now,
+            'updated_at': now,
+        } for user_id, _ in batch])
+
+        campaign.batches = (campaign.batches or []) + [{
+            'batch': len(campaign.batches or []) + 1,
+            'recipients': len(batch),
+            'status': status.value,
+            'provider_batch_id': result.get('batch_id'),
+            'error': result.get('error'),
+            'sent_at': now.isoformat()
+        }]
+        if status == NotificationStatus.SENT:
+            campaign.sent_count += len(batch)
+        else:
+            campaign.failed_count += len(batch)
+        campaign.last_recipient_id = batch[-1][0]
+        db.session.commit()  # expires campaign, so the loop sees a cancellation made meanwhile
+
+    if campaign.status == CampaignStatus.RUNNING:
+        campaign.status = (CampaignStatus.FAILED if campaign.failed_count and not campaign.sent_count
+                           else CampaignStatus.COMPLETED)
+        campaign.completed_at = datetime.utcnow()
+        db.session.commit()
+    return campaign
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def start_campaign(app, campaign_id: str):
+    """Run a campaign on this worker's background sender thread"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Created lazily so gunicorn workers don't inherit the master's thread
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='campaign-sender')
+
+    _executor.submit(_run_in_app_context, app, campaign_id)
+
+def _run_in_app_context(app, campaign_id):
+    with app.app_context():
+        try:
+            run_campaign(campaign_id)
+        except Exception as e:
+            print(f"Campaign {campaign_id} failed: {e}")
+            db.session.rollback()
+            campaign = db.session.get(Campaign, campaign_id)
+            if campaign is not None:
+                campaign.status = CampaignStatus.FAILED
+                campaign.error = str(e)
+                db.session.commit()
+        finally:
+            db.session.remove()
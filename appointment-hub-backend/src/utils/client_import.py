@@ -0,0 +1,212 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from src.models import db, User, UserRole, UserInvite
+from src.models.invite import PENDING_PASSWORD_HASH
+from src.models.types import generate_uuid
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+REQUIRED_FIELDS = ('first_name', 'last_name', 'email')
+MAX_LENGTHS = {'first_name': 100, 'last_name': 100, 'email': 255, 'phone_number': 20}
+
+class ImportFormatError(ValueError):
+    """Raised when the upload as a whole cannot be read (bad content type or CSV header)"""
+
+
+def iter_import_rows(stream, content_type: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, fields, parse error) from a CSV or NDJSON upload without reading it all into memory"""
+    content_type = (content_type or '').split(';', 1)[0].strip().lower()
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8-sig', newline='')
+
+    if content_type == 'text/csv':
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFormatError('CSV upload is empty')
+        missing = [field for field in REQUIRED_FIELDS if field not in reader.fieldnames]
+        if missing:
+            raise ImportFormatError(f"CSV header is missing: {', '.join(missing)}")
+        for fields in reader:
+            yield reader.line_num, fields, None
+    elif content_type in ('application/x-ndjson', 'application/jsonl', 'application/json-lines'):
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+            except ValueError:
+                yield line_number, None, 'Invalid JSON'
+                continue
+            if not isinstance(fields, dict):
+                yield line_number, None, 'Each line must be a JSON object'
+                continue
+            yield line_number, fields, None
+    else:
+        raise ImportFormatError('Content-Type must be text/csv or application/x-ndjson')
+
+
+def validate_row(fields: dict) -> Tuple[Optional[dict], List[str]]:
+    """Return (user values, errors) for one client row"""
+    values, errors = {}, []
+    for field in ('first_name', 'last_name', 'email', 'phone_number', 'address'):
+        value = fields.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            if field in REQUIRED_FIELDS:
+                errors.append(f'{field} is required')
+            values[field] = None
+            continue
+        if field in MAX_LENGTHS and len(value) > MAX_LENGTHS[field]:
+            errors.append(f'{field} is longer than {MAX_LENGTHS[field]} characters')
+        values[field] = value
+
+    if values['email'] and not EMAIL_PATTERN.match(values['email']):
+        errors.append('email is not a valid address')
+
+    age = fields.get('age')
+    values['age'] = None
+    if age not in (None, ''):
+        try:
+            values['age'] = int(age)
+        except (TypeError, ValueError):
+            errors.append('age must be a whole number')
+        else:
+            if not 0 < values['age'] < 150:
+                errors.append('age is out of range')
+
+    return (None if errors else values), errors
+
+
+class ClientImporter:
+    """Creates client accounts from an upload, a chunk at a time.
+
+    Each chunk costs one email lookup, one multi-row insert for users and one
+    for invites, and one commit. Nobody gets a password hash here: clients
+    set their own password through the invite token, so the import never
+    touches the hashing pool. Row problems are reported, not raised.
+    """
+
+    def __init__(self, store_id: Optional[str] = None, chunk_size: int = 500,
+                 max_rows: int = 20000, invite_ttl_days: int = 14):
+        self.store_id = store_id
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+        self.invite_expires_at = datetime.utcnow() + timedelta(days=invite_ttl_days)
+        self.results: List[dict] = []
+        self.summary = {'rows': 0, 'created': 0, 'existing': 0, 'failed': 0, 'truncated': False}
+        self._seen_emails: Dict[str, int] = {}
+
+    def run(self, rows: Iterable[Tuple[int, Optional[dict], Optional[str]]]) -> dict:
+        chunk = []
+        for row_number, fields, parse_error in rows:
+            if self.summary['rows'] >= self.max_rows:
+                self.summary['truncated'] = True
+                break
+            self.summary['rows'] += 1
+
+            if parse_error:
+                self._fail(row_number, None, [parse_error])
+                continue
+            values, errors = validate_row(fields)
+            if errors:
+                self._fail(row_number, fields.get('email'), errors)
+                continue
+
+            email_key = values['email'].lower()
+            if email_key in self._seen_emails:
+                self._fail(row_number, values['email'], [f'Duplicate of row {self._seen_emails[email_key]}'])
+                continue
+            self._seen_emails[email_key] = row_number
+
+            chunk.append((row_number, values))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self._import_chunk(chunk)
+
+        return {
+            'summary': self.summary,
+            'invite_expires_at': self.invite_expires_at.isoformat(),
+            'results': sorted(self.results, key=lambda result: result['row'])
+        }
+
+    def _fail(self, row_number, email, errors):
+        self.summary['failed'] += 1
+        self.results.append({'row': row_number, 'email': email, 'status': 'error', 'errors': errors})
+
+    def _import_chunk(self, chunk):
+        users = User.__table__
+        # Case-insensitive like the duplicate check above, through the lower(email) index
+        existing = set(db.session.execute(
+            select(func.lower(users.c.email)).where(
+                func.lower(users.c.email).in_([values['email'].lower() for _, values in chunk])
+            )
+        ).scalars())
+
+        new_rows = []
+        for row_number, values in chunk:
+            if values['email'].lower() in existing:
+                self.summary['existing'] += 1
+                self.results.append({'row': row_number, 'email': values['email'], 'status': 'exists'})
+            else:
+                new_rows.append((row_number, values))
+        if not new_rows:
+            return
+
+        prepared = [self._prepare(row_number, values) for row_number, values in new_rows]
+        try:
+            db.session.execute(users.insert(), [user for user, _, _ in prepared])
+            db.session.execute(UserInvite.__table__.insert(), [invite for _, invite, _ in prepared])
+            db.session.commit()
+        except IntegrityError:
+            # Someone registered one of these emails since the lookup - retry row by row
+            db.session.rollback()
+            self._import_rows_individually(prepared)
+            return
+
+        for _, _, result in prepared:
+            self._created(result)
+
+    def _import_rows_individually(self, prepared):
+        for user, invite, result in prepared:
+            try:
+                db.session.execute(User.__table__.insert(), user)
+                db.session.execute(UserInvite.__table__.insert(), invite)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                self.summary['existing'] += 1
+                self.results.append({'row': result['row'], 'email': result['email'], 'status': 'exists'})
+            else:
+                self._created(result)
+
+    def _created(self, result):
+        self.summary['created'] += 1
+        self.results.append(result)
+
+    def _prepare(self, row_number, values):
+        """Build the user row, its invite row and the result entry reported back"""
+        user_id = generate_uuid()
+        token, token_hash = UserInvite.new_token()
+        user = dict(values, id=user_id, password_hash=PENDING_PASSWORD_HASH, role=UserRole.CLIENT)
+        invite = {
+            'id': generate_uuid(),
+            'user_id': user_id,
+            'store_id': self.store_id,
+            'token_hash': token_hash,
+            'expires_at': self.invite_expires_at,
+        }
+        result = {
+            'row': row_number,
+            'email': values['email'],
+            'status': 'created',
+            'user_id': user_id,
+            'invite_token': token
+        }
+        return user, invite, result
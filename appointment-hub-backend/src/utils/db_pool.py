@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from typing import Dict
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_in_use = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self.peak_in_use = max(self.peak_in_use, self.checkedout())
+        return connection
+
+    def get_stats(self) -> Dict:
+        """Snapshot of pool usage for this process"""
+        with self._stats_lock:
+            return {
+                'pid': os.getpid(),
+                'pool_size': self.size(),
+                'max_overflow': self._max_overflow,
+                'in_use': self.checkedout(),
+                'idle': self.checkedin(),
+                'overflow': max(0, self.overflow()),
+                'peak_in_use': self.peak_in_use,
+                'checkouts': self.checkouts,
+                'checkout_timeouts': self.checkout_timeouts,
+                'avg_wait_ms': round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait_seconds * 1000, 3)
+            }
+
+
+def build_engine_options(database_uri: str) -> Dict:
+    """Build SQLAlchemy engine options from environment settings"""
+    # In-memory SQLite needs its own single-connection pool
+    if database_uri.startswith('sqlite') and ':memory:' in database_uri:
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
+
+    statement_timeout_ms = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    if database_uri.startswith('postgresql') and statement_timeout_ms > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+
+    return options
+
+
+def get_pool_stats(engine) -> Dict:
+    """Get pool statistics for an engine, if its pool is instrumented"""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.get_stats()
+    return {'pid': os.getpid(), 'pool': pool.status()}
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from src.utils.redis_client import get_redis_client, report_redis_error
+
+REPLICA_BIND_KEY = 'replica'
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingSession(Session):
+    """Session that sends reads from GET requests to the replica, everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            return self._db.engines[REPLICA_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause) -> bool:
+        if REPLICA_BIND_KEY not in self._db.engines:
+            return False
+        if self._flushing or isinstance(clause, UpdateBase):
+            return False
+        return has_request_context() and g.get('use_replica', False)
+
+
+class StickyPrimaryTracker:
+    """Remembers clients that just wrote, so their next reads go to the primary.
+
+    Stored in Redis so it holds across gunicorn workers, with an in-process
+    fallback when Redis is unavailable.
+    """
+
+    KEY_PREFIX = 'sticky-primary:'
+
+    def __init__(self):
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, client_key: str, seconds: int):
+        """Pin a client to the primary for a number of seconds"""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.set(f'{self.KEY_PREFIX}{client_key}', 1, ex=seconds)
+                return
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis sticky mark failed, using in-process tracker: {e}")
+
+        with self._lock:
+            now = time.time()
+            for key in [key for key, until in self._local.items() if until <= now]:
+                del self._local[key]
+            self._local[client_key] = now + seconds
+
+    def is_sticky(self, client_key: str) -> bool:
+        """Check if a client recently wrote and should read from the primary"""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if client.exists(f'{self.KEY_PREFIX}{client_key}'):
+                    return True
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis sticky lookup failed, using in-process tracker: {e}")
+
+        until = self._local.get(client_key)
+        return until is not None and until > time.time()
+
+
+sticky_primary = StickyPrimaryTracker()
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, even during a GET request.
+
+    For reads whose result outlives the request (process-wide caches): a
+    lagging replica would otherwise be cached as the current state.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get('use_replica', False)
+    g.use_replica = False
+    try:
+        yield
+    finally:
+        g.use_replica = previous
+
+
+def get_client_key() -> str:
+    """Identify the requesting client by JWT subject, falling back to its address.
+
+    The token is decoded without verification: the key only picks a database,
+    authentication still happens in the route.
+    """
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        try:
+            import jwt
+            claims = jwt.decode(auth_header[7:], options={'verify_signature': False})
+            if claims.get('sub'):
+                return f"user:{claims['sub']}"
+        except Exception:
+            pass
+    return f'addr:{request.remote_addr}'
+
+
+def get_replica_bind(replica_url: Optional[str], engine_options: Dict) -> Dict:
+    """Build the SQLALCHEMY_BINDS entry for the read replica, if configured"""
+    if not replica_url:
+        return {}
+    if replica_url.startswith('postgres://'):
+        replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+    return {REPLICA_BIND_KEY: {'url': replica_url, **engine_options}}
+
+
+def init_replica_routing(app):
+    """Register request hooks that decide between replica and primary"""
+    if REPLICA_BIND_KEY not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+
+    sticky_seconds = int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', 10))
+
+    @app.before_request
+    def choose_database():
+        g.use_replica = (
+            request.method in READ_METHODS and
+            not sticky_primary.is_sticky(get_client_key())
+        )
+
+    @app.after_request
+    def remember_writes(response):
+        # Read-your-writes: after a successful write, keep this client on the primary
+        if request.method not in READ_METHODS and response.status_code < 400:
+            sticky_primary.mark(get_client_key(), sticky_seconds)
+        return response
@@ -1,6 +1,9 @@
 import os
 import requests
 from typing import Dict, List, Optional
+from src.utils.metrics import observe_external_call
+from src.utils.provider_guard import ProviderHTTP
+from src.utils.message_templates import compile_template
 
 class EasySMSIntegration:
     """EasySMS API integration for email and SMS notifications"""
@@ -8,10 +11,12 @@ class EasySMSIntegration:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.easysms.gr"
+        self.http = ProviderHTTP('easysms')
         self.headers = {
             "Content-Type": "application/json"
         }
     
+    @observe_external_call('easysms')
     def send_sms(self, to: str, message: str, sender: str = None) -> Dict:
         """Send SMS message"""
         try:
@@ -24,7 +29,7 @@ class EasySMSIntegration:
             if sender:
                 data["sender"] = sender
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/sms/send",
                 headers=self.headers,
                 json=data
@@ -51,6 +56,7 @@ class EasySMSIntegration:
                 "error": str(e)
             }
     
+    @observe_external_call('easysms')
     def send_email(self, to: str, subject: str, message: str, sender_email: str = None, sender_name: str = None) -> Dict:
         """Send email message"""
         try:
@@ -66,7 +72,7 @@ class EasySMSIntegration:
             if sender_name:
                 data["sender_name"] = sender_name
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/email/send",
                 headers=self.headers,
                 json=data
@@ -92,10 +98,11 @@ class EasySMSIntegration:
                 "error": str(e)
             }
     
+    @observe_external_call('easysms')
     def get_account_balance(self) -> Dict:
         """Get account balance and credits"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/api/account/balance",
                 headers=self.headers,
                 params={"api_key": self.api_key}
@@ -122,10 +129,11 @@ class EasySMSIntegration:
                 "error": str(e)
             }
     
+    @observe_external_call('easysms')
     def get_delivery_report(self, message_id: str) -> Dict:
         """Get delivery report for a message"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/api/reports/delivery",
                 headers=self.headers,
                 params={
@@ -157,6 +165,7 @@ class EasySMSIntegration:
                 "error": str(e)
             }
     
+    @observe_external_call('easysms')
     def send_bulk_sms(self, recipients: List[str], message: str, sender: str = None) -> Dict:
         """Send SMS to multiple recipients"""
         try:
@@ -169,7 +178,7 @@ class EasySMSIntegration:
             if sender:
                 data["sender"] = sender
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/sms/bulk",
                 headers=self.headers,
                 json=data
@@ -235,12 +244,8 @@ class EasySMSIntegration:
         return f"+{clean_phone}"
     
     def create_personalized_message(self, template: str, variables: Dict) -> str:
-        """Create personalized message from template"""
-        message = template
-        for key, value in variables.items():
-            placeholder = f"{{{key}}}"
-            message = message.replace(placeholder, str(value))
-        return message
+        """Create personalized message from template (compiled once, see message_templates)"""
+        return compile_template(template).render(variables)
 
 # Factory function to create EasySMS integration instance
 def create_easysms_integration(api_key: str = None) -> Optional[EasySMSIntegration]:
@@ -256,7 +261,11 @@ def create_easysms_integration(api_key: str = None) -> Optional[EasySMSIntegrati
 
 # Message templates
 class MessageTemplates:
-    """Predefined message templates for common notifications"""
+    """Predefined SMS message templates for common notifications.
+
+    Stored notifications use src.utils.message_templates, which also handles
+    per-store wording.
+    """
     
     BOOKING_CONFIRMATION = """
 Your booking has been confirmed!
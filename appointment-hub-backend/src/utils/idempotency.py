@@ -0,0 +1,174 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Dict, Tuple
+from flask import Response, current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from src.utils.metrics import IDEMPOTENT_REQUESTS
+from src.utils.redis_client import get_redis_client, report_redis_error
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# Deletes a pending entry only if this request still owns it
+_RELEASE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value and cjson.decode(value)['token'] == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class IdempotencyStore:
+    """First responses to requests sent with an Idempotency-Key, kept for a TTL.
+
+    An entry is 'pending' while the first request runs (so duplicates wait
+    for it instead of repeating its work) and holds the response once it
+    finished. Stored in Redis so retries landing on another gunicorn worker
+    see it, with an in-process fallback when Redis is unavailable.
+    """
+
+    KEY_PREFIX = 'idempotency:'
+
+    def __init__(self):
+        self._local: Dict[str, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key: str, fingerprint: str, lock_seconds: int) -> Tuple[str, Dict]:
+        """Claim a key for a new request, or report what is already stored under it.
+
+        Returns ('new', entry) when the caller should run the request, or
+        ('pending' | 'done', entry) for the entry another request left.
+        """
+        entry = {'state': 'pending', 'fingerprint': fingerprint, 'token': uuid.uuid4().hex}
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if client.set(f'{self.KEY_PREFIX}{key}', json.dumps(entry), ex=lock_seconds, nx=True):
+                    return 'new', entry
+                stored = client.get(f'{self.KEY_PREFIX}{key}')
+                if stored is None:
+                    return self.begin(key, fingerprint, lock_seconds)  # expired in between
+                stored = json.loads(stored)
+                return stored['state'], stored
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis idempotency lookup failed, using in-process store: {e}")
+
+        with self._lock:
+            now = time.time()
+            for stale in [k for k, (expires_at, _) in self._local.items() if expires_at <= now]:
+                del self._local[stale]
+            if key in self._local:
+                stored = self._local[key][1]
+                return stored['state'], stored
+            self._local[key] = (now + lock_seconds, entry)
+            return 'new', entry
+
+    def complete(self, key: str, entry: Dict, response: Response, ttl: int):
+        """Store the response the claimed request produced"""
+        done = {
+            'state': 'done', 'fingerprint': entry['fingerprint'], 'status': response.status_code,
+            'mimetype': response.mimetype, 'body': response.get_data(as_text=True)
+        }
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.set(f'{self.KEY_PREFIX}{key}', json.dumps(done), ex=ttl)
+                return
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis idempotency store failed, using in-process store: {e}")
+
+        with self._lock:
+            self._local[key] = (time.time() + ttl, done)
+
+    def release(self, key: str, entry: Dict):
+        """Drop a claim whose request failed, so a retry runs it again"""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.eval(_RELEASE_SCRIPT, 1, f'{self.KEY_PREFIX}{key}', entry['token'])
+                return
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis idempotency release failed, using in-process store: {e}")
+
+        with self._lock:
+            stored = self._local.get(key)
+            if stored is not None and stored[1].get('token') == entry['token']:
+                del self._local[key]
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _scoped_key(key: str) -> str:
+    """The key as sent, scoped to the caller and the endpoint so clients can't collide"""
+    caller = get_jwt_identity() or request.remote_addr
+    return hashlib.sha256(f'{caller}\n{request.method}\n{request.path}\n{key}'.encode()).hexdigest()
+
+def _replay(entry: Dict) -> Response:
+    response = Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(f):
+    """Decorator making a POST safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs and its response (anything below 500)
+    is stored for IDEMPOTENCY_TTL_SECONDS; retries with the same key and body
+    get that response back without running the view again. A retry arriving
+    while the first request still runs waits up to IDEMPOTENCY_WAIT_SECONDS
+    for it, then answers 409. Requests without the header are not affected.
+    Apply below @jwt_required() so keys are scoped per user.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        scoped_key = _scoped_key(key)
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        deadline = time.monotonic() + current_app.config['IDEMPOTENCY_WAIT_SECONDS']
+        while True:
+            state, entry = idempotency_store.begin(
+                scoped_key, fingerprint, current_app.config['IDEMPOTENCY_LOCK_SECONDS']
+            )
+            if state != 'new' and entry['fingerprint'] != fingerprint:
+                IDEMPOTENT_REQUESTS.labels('mismatch').inc()
+                return jsonify({'error': f'{HEADER} was already used with a different request'}), 422
+            if state != 'pending':
+                break
+            if time.monotonic() >= deadline:
+                IDEMPOTENT_REQUESTS.labels('in_progress').inc()
+                response = jsonify({'error': f'A request with this {HEADER} is still in progress'})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            time.sleep(0.05)
+
+        if state == 'done':
+            IDEMPOTENT_REQUESTS.labels('replayed').inc()
+            return _replay(entry)
+
+        IDEMPOTENT_REQUESTS.labels('new').inc()
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_store.release(scoped_key, entry)
+            raise
+        if response.status_code >= 500:
+            # Nothing was created (the views roll back), so let a retry try again
+            idempotency_store.release(scoped_key, entry)
+        else:
+            idempotency_store.complete(scoped_key, entry, response, current_app.config['IDEMPOTENCY_TTL_SECONDS'])
+        return response
+    return decorated_function
@@ -0,0 +1,236 @@
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+from src.utils.redis_client import get_redis_client, report_redis_error
+
+PLACEHOLDER = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+DEFAULT_LOCALE = 'en'
+
+
+class _Variables(dict):
+    """Render-time variables that leave unknown placeholders visible (or fill in `missing`)"""
+    __slots__ = ('missing',)
+
+    def __init__(self, variables, missing):
+        super().__init__(variables)
+        self.missing = missing
+
+    def __missing__(self, key):
+        return f'{{{key}}}' if self.missing is None else self.missing
+
+
+class CompiledTemplate:
+    """A `{name}` template turned into a %-format string once.
+
+    Rendering is then a single C-level format call instead of one
+    str.replace per variable, which is what makes bulk campaigns cheap.
+    """
+    __slots__ = ('source', 'variables', '_format')
+
+    def __init__(self, source: str):
+        parts, variables, position = [], set(), 0
+        for match in PLACEHOLDER.finditer(source):
+            parts.append(source[position:match.start()].replace('%', '%%'))
+            parts.append(f'%({match.group(1)})s')
+            variables.add(match.group(1))
+            position = match.end()
+        parts.append(source[position:].replace('%', '%%'))
+        self.source = source
+        self.variables = frozenset(variables)
+        self._format = ''.join(parts)
+
+    def render(self, variables: Mapping, missing: Optional[str] = None) -> str:
+        if self.variables <= variables.keys():
+            return self._format % variables
+        return self._format % _Variables(variables, missing)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str) -> CompiledTemplate:
+    """Compile a template string, reusing earlier compilations of the same text"""
+    return CompiledTemplate(source)
+
+
+class MessageTemplateSet(NamedTuple):
+    subject: Optional[CompiledTemplate]
+    body: CompiledTemplate
+    custom: bool = False
+
+    def render(self, variables: Mapping, missing: Optional[str] = None) -> Tuple[Optional[str], str]:
+        """Return (subject, body) for one recipient"""
+        subject = self.subject.render(variables, missing) if self.subject else None
+        return subject, self.body.render(variables, missing)
+
+
+# Built-in wording, used unless a store saved its own (MessageTemplate rows)
+DEFAULT_TEMPLATES: Dict[str, Dict] = {
+    'booking_confirmation': {
+        'subject': 'Booking Confirmation - {service_name}',
+        'body': (
+            'Your booking has been confirmed!\n\n'
+            'Service: {service_name}\n'
+            'Date: {booking_date}\n'
+            'Time: {start_time} - {end_time}\n'
+            'Number of persons: {number_of_persons}\n'
+            'Total amount: {total_amount} EUR\n\n'
+            'Thank you for choosing our services!'
+        ),
+        'variables': ['service_name', 'booking_date', 'start_time', 'end_time', 'number_of_persons',
+                      'total_amount', 'client_name', 'store_name'],
+    },
+    'booking_reminder': {
+        'subject': 'Booking Reminder - {service_name}',
+        'body': (
+            'This is a reminder for your upcoming booking:\n\n'
+            'Service: {service_name}\n'
+            'Date: {booking_date}\n'
+            'Time: {start_time} - {end_time}\n\n'
+            'We look forward to seeing you!'
+        ),
+        'variables': ['service_name', 'booking_date', 'start_time', 'end_time', 'client_name', 'store_name'],
+    },
+    'booking_cancellation': {
+        'subject': 'Booking Cancelled - {service_name}',
+        'body': (
+            'Your booking has been cancelled:\n\n'
+            'Service: {service_name}\n'
+            'Date: {booking_date}\n'
+            'Time: {start_time} - {end_time}\n\n'
+            'If you have any questions, please contact us.'
+        ),
+        'variables': ['service_name', 'booking_date', 'start_time', 'end_time', 'client_name', 'store_name'],
+    },
+    'payment_confirmation': {
+        'subject': 'Payment Confirmation - {service_name}',
+        'body': (
+            'Payment confirmed!\n\n'
+            'Amount: {amount} EUR\n'
+            'Service: {service_name}\n'
+            'Date: {booking_date}\n\n'
+            'Thank you for your payment!'
+        ),
+        'variables': ['amount', 'service_name', 'booking_date', 'client_name', 'store_name'],
+    },
+}
+
+_DEFAULT_SETS = {
+    key: MessageTemplateSet(compile_template(template['subject']), compile_template(template['body']))
+    for key, template in DEFAULT_TEMPLATES.items()
+}
+
+
+def locale_chain(locale: Optional[str]) -> List[str]:
+    """Locales to try in order, e.g. 'el-GR' -> ['el-GR', 'el', 'en']"""
+    chain = []
+    if locale:
+        chain.append(locale)
+        language = locale.split('-', 1)[0]
+        if language != locale:
+            chain.append(language)
+    if DEFAULT_LOCALE not in chain:
+        chain.append(DEFAULT_LOCALE)
+    return chain
+
+
+def unknown_variables(key: str, *sources: Optional[str]) -> List[str]:
+    """Placeholders in the given template texts that `key` never supplies"""
+    allowed = set(DEFAULT_TEMPLATES[key]['variables'])
+    used = set()
+    for source in sources:
+        if source:
+            used |= compile_template(source).variables
+    return sorted(used - allowed)
+
+
+class MessageTemplateCache:
+    """Compiled per-store templates, loaded with one query per store.
+
+    A store's templates are cached in-process together with a generation
+    number kept in Redis. Saving a template bumps the generation, so every
+    worker reloads that store on its next lookup. Without Redis, entries
+    simply expire after `ttl_seconds`.
+    """
+
+    GENERATION_KEY_PREFIX = 'message-templates:gen:'
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get('MESSAGE_TEMPLATE_CACHE_SECONDS', 60))
+        self.ttl_seconds = ttl_seconds
+        # store_id -> (loaded at, generation, {(key, locale): MessageTemplateSet})
+        self._stores: Dict[str, Tuple[float, Optional[str], Dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, store_id: Optional[str] = None, locale: Optional[str] = None) -> MessageTemplateSet:
+        """Resolve a template: the store's own for the locale, then its language, then the built-in one"""
+        if key not in DEFAULT_TEMPLATES:
+            raise KeyError(f'Unknown message template: {key}')
+
+        if store_id:
+            overrides = self._store_templates(store_id)
+            for candidate in locale_chain(locale):
+                template_set = overrides.get((key, candidate))
+                if template_set is not None:
+                    return template_set
+
+        return _DEFAULT_SETS[key]
+
+    def invalidate(self, store_id: str):
+        """Drop a store's cached templates here and, through Redis, in every other worker"""
+        with self._lock:
+            self._stores.pop(store_id, None)
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.incr(f'{self.GENERATION_KEY_PREFIX}{store_id}')
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis template invalidation failed, other workers refresh after the TTL: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._stores.clear()
+
+    def _generation(self, store_id: str) -> Optional[str]:
+        client = get_redis_client()
+        if client is None:
+            return None
+        try:
+            return client.get(f'{self.GENERATION_KEY_PREFIX}{store_id}')
+        except Exception as e:
+            report_redis_error(e)
+            print(f"Redis template generation lookup failed, using TTL only: {e}")
+            return None
+
+    def _store_templates(self, store_id: str) -> Dict:
+        generation = self._generation(store_id)
+        entry = self._stores.get(store_id)
+        if entry is not None:
+            loaded_at, cached_generation, templates = entry
+            if cached_generation == generation and time.monotonic() - loaded_at < self.ttl_seconds:
+                return templates
+
+        from src.models import db, MessageTemplate
+        rows = db.session.query(
+            MessageTemplate.key, MessageTemplate.locale, MessageTemplate.subject, MessageTemplate.body
+        ).filter(MessageTemplate.store_id == store_id).all()
+
+        templates = {}
+        for key, locale, subject, body in rows:
+            if key not in DEFAULT_TEMPLATES:
+                continue
+            default_subject = DEFAULT_TEMPLATES[key]['subject']
+            templates[(key, locale)] = MessageTemplateSet(
+                compile_template(subject or default_subject), compile_template(body), custom=True
+            )
+
+        with self._lock:
+            self._stores[store_id] = (time.monotonic(), generation, templates)
+        return templates
+
+
+message_templates = MessageTemplateCache()
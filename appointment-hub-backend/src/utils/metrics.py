@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from functools import wraps
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['blueprint', 'endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'SQL statement duration',
+    ['endpoint'], buckets=QUERY_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request',
+    ['blueprint', 'endpoint'], buckets=QUERY_COUNT_BUCKETS
+)
+DB_QUERY_TIME_PER_REQUEST = Histogram(
+    'db_query_time_per_request_seconds', 'Total SQL time per request',
+    ['blueprint', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+EXTERNAL_CALL_LATENCY = Histogram(
+    'external_call_duration_seconds', 'Outbound integration call latency',
+    ['provider', 'operation', 'outcome'], buckets=LATENCY_BUCKETS
+)
+EXTERNAL_CALL_ERRORS = Counter(
+    'external_call_errors_total', 'Outbound integration calls that failed',
+    ['provider', 'operation']
+)
+EXTERNAL_CALL_REJECTED = Counter(
+    'external_call_rejected_total', 'Outbound calls refused locally by the provider guard',
+    ['provider', 'reason']
+)
+EXTERNAL_CIRCUIT_OPEN = Gauge(
+    'external_circuit_open', 'Whether the circuit breaker for a provider is open (1) or closed (0)',
+    ['provider'], multiprocess_mode='max'
+)
+IDEMPOTENT_REQUESTS = Counter(
+    'idempotent_requests_total', 'Requests sent with an Idempotency-Key, by what happened to them',
+    ['outcome']
+)
+
+
+def _endpoint_labels():
+    """Blueprint and endpoint labels for the current request (bounded cardinality)"""
+    return request.blueprint or 'app', request.endpoint or 'unmatched'
+
+
+_external_call = threading.local()
+
+
+def observe_external_call(provider: str):
+    """Decorator timing an integration method.
+
+    A {'success': False} result counts as an error, as does a call the method
+    caught itself and reported with mark_external_call_failed().
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            started = time.perf_counter()
+            outer_failed = getattr(_external_call, 'failed', False)
+            _external_call.failed = False
+            outcome = 'success'
+            try:
+                result = f(*args, **kwargs)
+                if _external_call.failed or (isinstance(result, dict) and result.get('success') is False):
+                    outcome = 'error'
+                return result
+            except Exception:
+                outcome = 'error'
+                raise
+            finally:
+                _external_call.failed = outer_failed
+                EXTERNAL_CALL_LATENCY.labels(provider, f.__name__, outcome).observe(time.perf_counter() - started)
+                if outcome == 'error':
+                    EXTERNAL_CALL_ERRORS.labels(provider, f.__name__).inc()
+        return decorated_function
+    return decorator
+
+
+def mark_external_call_failed():
+    """Count the running @observe_external_call as an error, for methods that
+    catch a provider failure and return an empty result instead of raising"""
+    _external_call.failed = True
+
+
+def _record_query_duration(statement: str, duration: float):
+    if has_request_context():
+        g.db_query_count = g.get('db_query_count', 0) + 1
+        g.db_query_time = g.get('db_query_time', 0.0) + duration
+        DB_QUERY_DURATION.labels(request.endpoint or 'unmatched').observe(duration)
+    else:
+        DB_QUERY_DURATION.labels('background').observe(duration)
+
+
+# Called with (statement, seconds) once each statement has run; the query profiler adds itself here
+QUERY_OBSERVERS = [_record_query_duration]
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context, not the connection: a statement that raises
+    # never reaches after_cursor_execute, and its context is simply dropped
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started_at', None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    for observer in QUERY_OBSERVERS:
+        observer(statement, duration)
+
+
+def init_metrics(app):
+    """Register request timing hooks and the /metrics endpoint"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started_at')
+        if started is None or request.endpoint == 'metrics':
+            return response
+
+        blueprint, endpoint = _endpoint_labels()
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+        DB_QUERIES_PER_REQUEST.labels(blueprint, endpoint).observe(g.get('db_query_count', 0))
+        DB_QUERY_TIME_PER_REQUEST.labels(blueprint, endpoint).observe(g.get('db_query_time', 0.0))
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics, aggregated across gunicorn workers when multiprocess mode is on"""
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
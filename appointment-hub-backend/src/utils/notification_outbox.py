@@ -0,0 +1,66 @@
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from sqlalchemy import bindparam, select, update
+from src.models import db, Notification, NotificationStatus, NotificationType, User
+
+def create_email_sender() -> Callable[[str, str, str], Dict]:
+    """Return a function sending one email through EasySMS"""
+    # Loaded on first use so importing the app does not pull in requests
+    from src.utils.easysms_integration import create_easysms_integration
+    integration = create_easysms_integration()
+    if integration is None:
+        # Same placeholder behaviour as the notification routes without an API key
+        def send_mock(email, subject, message):
+            return {'success': True, 'message_id': f'email_mock_{uuid.uuid4().hex[:12]}'}
+        return send_mock
+    return integration.send_email
+
+def send_pending_notifications(batch_size: int = 100, sender: Optional[Callable] = None) -> Dict[str, int]:
+    """Send the email notifications other jobs queued as PENDING.
+
+    Jobs such as `process_subscriptions` insert the notification rows in the
+    transaction that made them due, so a crash can neither lose an email nor
+    record one for a change that rolled back. Each batch is locked (rows a
+    concurrent run holds are skipped), sent, and marked SENT or FAILED in one
+    bulk update and commit. A run interrupted mid-batch leaves its rows
+    PENDING and the next run sends them again: delivery is at least once.
+    """
+    notifications = Notification.__table__
+    users = User.__table__
+    send = sender or create_email_sender()
+    stats = {'sent': 0, 'failed': 0}
+
+    while True:
+        rows = db.session.execute(
+            select(notifications.c.id, notifications.c.subject, notifications.c.body, users.c.email)
+            .join(users, users.c.id == notifications.c.recipient_user_id)
+            .where(notifications.c.status == NotificationStatus.PENDING,
+                   notifications.c.type == NotificationType.EMAIL)
+            .order_by(notifications.c.created_at)
+            .limit(batch_size)
+            .with_for_update(of=notifications, skip_locked=True)
+        ).all()
+        if not rows:
+            break
+
+        results = []
+        for row in rows:
+            try:
+                result = send(row.email, row.subject, row.body)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            status = NotificationStatus.SENT if result.get('success') else NotificationStatus.FAILED
+            stats['sent' if status == NotificationStatus.SENT else 'failed'] += 1
+            results.append({'b_id': row.id, 'b_status': status, 'b_message_id': result.get('message_id')})
+
+        now = datetime.utcnow()
+        db.session.execute(
+            update(notifications).where(notifications.c.id == bindparam('b_id')).values(
+                status=bindparam('b_status'), external_message_id=bindparam('b_message_id'),
+                sent_at=now, updated_at=now
+            ), results
+        )
+        db.session.commit()
+
+    return stats
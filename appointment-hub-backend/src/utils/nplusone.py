@@ -0,0 +1,108 @@
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Dict, Optional
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+class NPlusOneError(Exception):
+    """Raised when a relationship is lazily loaded in a loop"""
+
+
+class NPlusOneWarning(UserWarning):
+    """Warned when a relationship is lazily loaded in a loop"""
+
+
+def _report(relationship: str, count: int, mode: str):
+    endpoint = request.endpoint if has_request_context() else None
+    message = (f"N+1 query: {relationship} lazily loaded {count} times"
+               f"{f' in {endpoint}' if endpoint else ''}; eager-load it with joinedload/selectinload")
+    if mode == 'raise':
+        raise NPlusOneError(message)
+    warnings.warn(message, NPlusOneWarning, stacklevel=4)
+    if has_request_context():
+        current_app.logger.warning(message)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _count_lazy_loads(orm_execute_state):
+    """Count lazy loads per relationship within a request or guarded block"""
+    if not orm_execute_state.is_relationship_load or orm_execute_state.lazy_loaded_from is None:
+        return
+
+    guard = _active_guard()
+    if guard is None:
+        return
+
+    relationship = str(orm_execute_state.loader_strategy_path[-1])
+    count = guard['counts'].get(relationship, 0) + 1
+    guard['counts'][relationship] = count
+
+    # The same relationship loaded again and again means a loop over query results
+    if count == guard['threshold']:
+        _report(relationship, count, guard['mode'])
+
+
+_local = threading.local()
+
+def _active_guard() -> Optional[Dict]:
+    guard = getattr(_local, 'guard', None)
+    if guard is not None:
+        return guard
+    if has_request_context():
+        return g.get('nplusone_guard')
+    return None
+
+
+def init_nplusone_guard(app):
+    """Enable the N+1 guard for every request when NPLUSONE_GUARD is 'warn' or 'raise'"""
+    mode = app.config.get('NPLUSONE_GUARD', 'off')
+    if mode not in ('warn', 'raise'):
+        return
+
+    threshold = app.config.get('NPLUSONE_THRESHOLD', 3)
+
+    @app.before_request
+    def start_nplusone_guard():
+        g.nplusone_guard = {'mode': mode, 'threshold': threshold, 'counts': {}}
+
+
+@contextmanager
+def nplusone_guard(mode: str = 'raise', threshold: int = 2):
+    """Guard a block of code (e.g. a test) against lazy loads in loops"""
+    previous = getattr(_local, 'guard', None)
+    _local.guard = {'mode': mode, 'threshold': threshold, 'counts': {}}
+    try:
+        yield _local.guard['counts']
+    finally:
+        _local.guard = previous
+
+
+class QueryCounter:
+    """Counts SQL statements executed while active"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements run in the block, for max-query-count assertions:
+
+        with count_queries() as counter:
+            client.get('/api/bookings', headers=headers)
+        assert counter.count <= 4, counter.statements
+    """
+    counter = QueryCounter()
+    event.listen(Engine, 'after_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, 'after_cursor_execute', counter)
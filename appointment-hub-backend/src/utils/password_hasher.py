@@ -0,0 +1,121 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HasherBusyError(Exception):
+    """Raised when the password hashing queue is full or a job waits too long"""
+
+
+class PasswordHasher:
+    """Password hashing with a tunable method, run in a bounded thread pool"""
+
+    def __init__(self, method: str = 'pbkdf2:sha256', max_workers: int = 2,
+                 max_queue: int = 16, timeout: float = 10.0):
+        self.check_settings(max_workers, max_queue, timeout)
+        self.method = method
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hasher')
+        # Running plus queued jobs; anything beyond this is rejected immediately
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._method_prefix = None
+
+    @staticmethod
+    def check_settings(max_workers: int, max_queue: int, timeout: float):
+        """Raise ValueError for a pool that could never run a job"""
+        if max_workers < 1:
+            raise ValueError(f'PASSWORD_HASH_WORKERS must be at least 1, got {max_workers}')
+        if max_queue < 0:
+            raise ValueError(f'PASSWORD_HASH_MAX_QUEUE must not be negative, got {max_queue}')
+        if timeout <= 0:
+            raise ValueError(f'PASSWORD_HASH_TIMEOUT must be positive, got {timeout}')
+
+    def _run(self, fn, *args):
+        """Run a hashing job in the pool, failing fast when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError('Password hashing queue is full')
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # still queued: drop it and free its slot
+            raise HasherBusyError('Password hashing timed out')
+
+    @property
+    def method_prefix(self) -> str:
+        """Method prefix as written into hashes, e.g. 'pbkdf2:sha256:600000'"""
+        if self._method_prefix is None:
+            # Werkzeug fills in default cost parameters, so read them back from a real hash
+            self._method_prefix = generate_password_hash('', method=self.method).split('$', 1)[0]
+        return self._method_prefix
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Verify a password against a stored hash"""
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Check if a stored hash was made with a different method or cost"""
+        if not password_hash:
+            return False
+        return password_hash.split('$', 1)[0] != self.method_prefix
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher, created lazily after fork"""
+    global _hasher
+
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = create_password_hasher()
+
+    return _hasher
+
+def _hasher_settings(config) -> dict:
+    def setting(key, default):
+        # Explicit None checks: 0 is a valid setting (e.g. PASSWORD_HASH_MAX_QUEUE=0)
+        value = config.get(key)
+        if value is None:
+            value = os.environ.get(key)
+        return default if value is None else value
+
+    return dict(
+        method=setting('PASSWORD_HASH_METHOD', 'pbkdf2:sha256'),
+        max_workers=int(setting('PASSWORD_HASH_WORKERS', 2)),
+        max_queue=int(setting('PASSWORD_HASH_MAX_QUEUE', 16)),
+        timeout=float(setting('PASSWORD_HASH_TIMEOUT', 10))
+    )
+
+
+def check_password_hasher_config(config: dict):
+    """Validate the hashing settings at startup; the hasher itself is only
+    created on first use in each worker"""
+    settings = _hasher_settings(config)
+    PasswordHasher.check_settings(settings['max_workers'], settings['max_queue'], settings['timeout'])
+
+
+def create_password_hasher(config: Optional[dict] = None) -> PasswordHasher:
+    """Create a password hasher from app config or environment"""
+    if config is None:
+        from flask import current_app, has_app_context
+        config = current_app.config if has_app_context() else {}
+    return PasswordHasher(**_hasher_settings(config))
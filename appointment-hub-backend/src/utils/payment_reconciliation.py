@@ -0,0 +1,124 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, List
+from sqlalchemy import bindparam, select, update
+from src.models import db, Payment, PaymentStatus
+from src.utils.booking_payments import rollup_booking_payments
+from src.utils.subscription_renewals import renew_paid_subscriptions
+
+if TYPE_CHECKING:  # the Stripe SDK is only loaded by the commands that call Stripe
+    import stripe
+    from src.utils.stripe_integration import StripeIntegration
+
+def remote_payment_status(intent: 'stripe.PaymentIntent') -> PaymentStatus:
+    """What a local Payment's status should be for a Stripe PaymentIntent"""
+    if intent.status == 'succeeded':
+        # A refund leaves the intent succeeded; it shows on the (expanded) charge
+        charge = getattr(intent, 'latest_charge', None)
+        if getattr(charge, 'refunded', False):
+            return PaymentStatus.REFUNDED
+        return PaymentStatus.SUCCEEDED
+    if intent.status == 'canceled':
+        return PaymentStatus.FAILED
+    if intent.status == 'requires_payment_method' and getattr(intent, 'last_payment_error', None):
+        return PaymentStatus.FAILED
+    return PaymentStatus.PENDING  # processing, requires_action, ...
+
+def reconciliation_windows(start: datetime, end: datetime, window: timedelta):
+    """Split [start, end) into consecutive windows of at most `window`"""
+    while start < end:
+        yield start, min(start + window, end)
+        start += window
+
+def _batches(iterable: Iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _reconcile_batch(intents: List['stripe.PaymentIntent'], stats: Counter, dry_run: bool) -> List[str]:
+    """Compare one batch of intents with their local rows and correct the ones that drifted.
+
+    One SELECT for the batch and one executemany UPDATE for its corrections,
+    then one rollup of the bookings they belong to. Subscriptions whose renewal
+    payment turned out to have succeeded start their next period, as the
+    webhook would have done. Returns the ids of the corrected payments.
+    """
+    payments = Payment.__table__
+    local = {
+        row.stripe_payment_intent_id: row
+        for row in db.session.execute(
+            select(payments.c.id, payments.c.stripe_payment_intent_id, payments.c.status,
+                   payments.c.stripe_charge_id, payments.c.booking_id, payments.c.subscription_id)
+            .where(payments.c.stripe_payment_intent_id.in_([intent.id for intent in intents]))
+        )
+    }
+
+    now = datetime.utcnow()
+    corrections, booking_ids, renewed_subscription_ids = [], set(), set()
+    for intent in intents:
+        stats['checked'] += 1
+        row = local.get(intent.id)
+        if row is None:
+            stats['missing_locally'] += 1
+            continue
+
+        status = remote_payment_status(intent)
+        charge = getattr(intent, 'latest_charge', None)
+        charge_id = row.stripe_charge_id or (getattr(charge, 'id', charge) if charge else None)
+
+        if row.status == PaymentStatus.REFUNDED and status != PaymentStatus.REFUNDED:
+            # Refunded here but not on Stripe - needs a person, not an overwrite
+            stats['conflicts'] += 1
+            continue
+        if status == row.status and charge_id == row.stripe_charge_id:
+            stats['matched'] += 1
+            continue
+
+        stats[f'{row.status.value}->{status.value}' if status != row.status else 'charge_id_set'] += 1
+        corrections.append({'_id': row.id, '_status': status, '_charge_id': charge_id, '_updated_at': now})
+        if status != row.status and row.booking_id:
+            booking_ids.add(row.booking_id)
+        if status != row.status and status == PaymentStatus.SUCCEEDED and row.subscription_id:
+            renewed_subscription_ids.add(row.subscription_id)
+
+    if corrections and not dry_run:
+        db.session.execute(
+            update(payments).where(payments.c.id == bindparam('_id')).values(
+                status=bindparam('_status'),
+                stripe_charge_id=bindparam('_charge_id'),
+                updated_at=bindparam('_updated_at')
+            ),
+            corrections
+        )
+        stats['bookings_rolled_up'] += rollup_booking_payments(booking_ids)
+        stats['subscriptions_renewed'] += renew_paid_subscriptions(renewed_subscription_ids)
+    stats['corrected'] += len(corrections)
+    return [correction['_id'] for correction in corrections]
+
+def reconcile_payments(stripe_integration: 'StripeIntegration', start: datetime, end: datetime,
+                       window: timedelta = timedelta(days=1), batch_size: int = 500,
+                       page_size: int = 100, dry_run: bool = False) -> Dict[str, int]:
+    """Bring local Payments in line with Stripe's PaymentIntents created in [start, end).
+
+    Walks the range in date windows through the paginated list API, so memory
+    stays at one batch however many intents a window holds. Each batch is
+    compared with its local rows (keyed by stripe_payment_intent_id) and
+    committed on its own, so an interrupted run keeps its progress and can be
+    started again. Stripe is the source of truth, except that a payment
+    refunded here is never moved back.
+    """
+    stats = Counter()
+    for window_start, window_end in reconciliation_windows(start, end, window):
+        intents = stripe_integration.list_payment_intents(window_start, window_end, page_size)
+        for batch in _batches(intents, batch_size):
+            _reconcile_batch(batch, stats, dry_run)
+            if dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+        stats['windows'] += 1
+    return dict(stats)
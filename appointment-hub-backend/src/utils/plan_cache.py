@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+from src.utils.db_routing import use_primary
+from src.utils.redis_client import get_redis_client, report_redis_error
+
+class CachedPlan(NamedTuple):
+    """Read-only copy of a SubscriptionPlan, shared between requests and threads"""
+    id: str
+    data: Dict  # SubscriptionPlan.to_dict()
+
+    @property
+    def is_active(self) -> bool:
+        return self.data['is_active']
+
+    def to_dict(self) -> Dict:
+        return dict(self.data)
+
+    def get_feature_limit(self, feature_name, default=None):
+        """Same as SubscriptionPlan.get_feature_limit"""
+        features = self.data.get('features')
+        if features and isinstance(features, dict):
+            return features.get(feature_name, default)
+        return default
+
+    def has_feature(self, feature_name):
+        return self.get_feature_limit(feature_name) is not None
+
+
+class PlanCache:
+    """Every subscription plan, loaded with one query and kept in-process.
+
+    Plans change only when an admin edits them, so lookups and the public
+    plan listing are answered from memory. Each snapshot carries the
+    generation it was loaded at; invalidate() bumps the generation here and
+    publishes on a Redis channel that a listener thread in every worker
+    follows, so all of them reload on their next lookup. While no listener
+    is connected (no Redis, or it dropped) snapshots also expire after
+    `ttl_seconds`, and a reconnecting listener reloads in case it missed
+    something.
+    """
+
+    CHANNEL = 'subscription-plans:invalidate'
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get('PLAN_CACHE_SECONDS', 300))
+        self.ttl_seconds = ttl_seconds
+        self._generation = 0
+        # (generation, loaded at, {plan id: CachedPlan} in creation order)
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._listener = None
+        self._listener_pid = None
+        self._subscribed = False
+
+    def warm(self):
+        """Start following invalidations and load the plans (once per worker, at startup)"""
+        self._ensure_listener()
+        self._load()
+
+    def get(self, plan_id: Optional[str]) -> Optional[CachedPlan]:
+        if not plan_id:
+            return None
+        return self._plans().get(plan_id)
+
+    def active_plans(self) -> List[CachedPlan]:
+        return [plan for plan in self._plans().values() if plan.is_active]
+
+    def invalidate(self):
+        """Drop the plans here and in every other worker; call after committing a plan change"""
+        self._bump()
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.publish(self.CHANNEL, 'invalidate')
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis plan invalidation failed, other workers refresh after the TTL: {e}")
+
+    def _bump(self):
+        with self._lock:
+            self._generation += 1
+
+    def _plans(self) -> Dict[str, CachedPlan]:
+        self._ensure_listener()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == self._generation:
+            if self._subscribed or time.monotonic() - snapshot[1] < self.ttl_seconds:
+                return snapshot[2]
+        return self._load()
+
+    def _load(self) -> Dict[str, CachedPlan]:
+        from src.models import SubscriptionPlan
+        # Read the generation first: an invalidation during the query leaves this snapshot stale
+        generation = self._generation
+        # Primary, not the replica: a snapshot is kept until the next invalidation. Rows the
+        # request already loaded (possibly from the replica) are refreshed, not reused
+        with use_primary():
+            plans = SubscriptionPlan.query.order_by(SubscriptionPlan.created_at).execution_options(
+                populate_existing=True).all()
+        loaded = {plan.id: CachedPlan(plan.id, plan.to_dict()) for plan in plans}
+        with self._lock:
+            self._snapshot = (generation, time.monotonic(), loaded)
+        return loaded
+
+    def _ensure_listener(self):
+        # Checked per process: a listener started before a fork does not run in the child
+        if self._listener_pid == os.getpid() or get_redis_client() is None:
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._subscribed = False
+            self._listener = threading.Thread(target=self._listen, name='plan-cache-listener', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            client = get_redis_client()
+            if client is None:
+                time.sleep(5)
+                continue
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                # Invalidations published before the subscription took (after warm(), or
+                # while disconnected) were missed: drop whatever was loaded meanwhile
+                self._bump()
+                self._subscribed = True
+                while True:
+                    if pubsub.get_message(timeout=1.0) is not None:
+                        self._bump()
+            except Exception as e:
+                self._subscribed = False
+                report_redis_error(e)
+                print(f"Plan cache lost its Redis subscription, using the TTL until it is back: {e}")
+                time.sleep(5)
+
+
+plan_cache = PlanCache()
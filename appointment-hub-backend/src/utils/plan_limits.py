@@ -0,0 +1,174 @@
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import and_, case, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from src.models import (
+    db, Booking, Notification, NotificationStatus, Service, Store, StoreUsage
+)
+from src.utils.plan_cache import plan_cache
+
+# metric -> (plan feature holding its limit, counted per calendar month)
+USAGE_METRICS = {
+    'bookings': ('max_bookings', True),
+    'services': ('max_services', False),
+    'notifications': ('max_notifications', True),
+}
+
+# Notifications that count against the plan; failed sends are given back
+COUNTED_NOTIFICATION_STATUSES = (NotificationStatus.SENT, NotificationStatus.DELIVERED, NotificationStatus.READ)
+
+class PlanLimitExceeded(Exception):
+    """A store's subscription plan does not allow more of a metric"""
+
+    def __init__(self, metric: str, limit: int):
+        per = ' per month' if USAGE_METRICS[metric][1] else ''
+        super().__init__(f'Your subscription plan allows {limit} {metric}{per}')
+        self.metric = metric
+        self.limit = limit
+
+def usage_period(metric: str, now: Optional[datetime] = None) -> str:
+    """The counter period a metric is in now: 'YYYY-MM', or '' for totals"""
+    return (now or datetime.utcnow()).strftime('%Y-%m') if USAGE_METRICS[metric][1] else ''
+
+def store_plan_features(store_id: str) -> Dict:
+    """The features of a store's current plan ({} without one); the plan comes from the plan cache"""
+    plan_id = db.session.execute(
+        select(Store.current_subscription_plan_id).where(Store.id == store_id)
+    ).scalar()
+    plan = plan_cache.get(plan_id)
+    features = plan.data.get('features') if plan else None
+    return features if isinstance(features, dict) else {}
+
+def plan_limit(store_id: str, metric: str) -> Optional[int]:
+    """A store's limit for a metric; None (no plan, no such feature or -1) is unlimited"""
+    limit = store_plan_features(store_id).get(USAGE_METRICS[metric][0])
+    if limit is None or int(limit) < 0:
+        return None
+    return int(limit)
+
+def consume(store_id: str, metric: str, amount: int = 1):
+    """Count `amount` more of a metric for a store, or raise PlanLimitExceeded.
+
+    The check and the increment are one conditional UPDATE of the store's
+    counter row, in the caller's transaction: rolling back gives the quota
+    back, and the row lock makes concurrent requests for the same store queue
+    instead of both slipping under the limit. Costs the same whatever the
+    store's history, unlike counting its bookings.
+    """
+    limit = plan_limit(store_id, metric)
+    period = usage_period(metric)
+    usage = StoreUsage.__table__
+    key = and_(usage.c.store_id == store_id, usage.c.metric == metric, usage.c.period == period)
+    allowed = key if limit is None else and_(key, usage.c.count + amount <= limit)
+
+    for _ in range(2):
+        now = datetime.utcnow()
+        if db.session.execute(update(usage).where(allowed).values(count=usage.c.count + amount, updated_at=now)).rowcount:
+            return
+        if (limit is not None and amount > limit) or \
+                db.session.execute(select(usage.c.count).where(key)).first() is not None:
+            raise PlanLimitExceeded(metric, limit)
+        try:
+            # First use this period; a savepoint so losing the race to insert it can be retried
+            with db.session.begin_nested():
+                db.session.execute(insert(usage).values(
+                    store_id=store_id, metric=metric, period=period, count=amount, updated_at=now
+                ))
+            return
+        except IntegrityError:
+            continue
+    raise PlanLimitExceeded(metric, limit)
+
+def reserve(store_id: str, metric: str, amount: int = 1):
+    """consume() and commit straight away, ahead of a slow provider call.
+
+    Holding the counter row lock through the provider round trip would make
+    every other write counting against the store wait for it. If the call
+    then fails, release() gives the quota back in the transaction recording
+    the failure; a crash in between over-counts until reconcile_usage runs.
+    Commits whatever else the session holds.
+    """
+    consume(store_id, metric, amount)
+    db.session.commit()
+
+def release(store_id: str, metric: str, amount: int = 1):
+    """Give back usage that did not happen after all (a deleted service, a failed send)"""
+    usage = StoreUsage.__table__
+    db.session.execute(
+        update(usage).where(
+            usage.c.store_id == store_id, usage.c.metric == metric, usage.c.period == usage_period(metric)
+        ).values(
+            count=case((usage.c.count > amount, usage.c.count - amount), else_=0),
+            updated_at=datetime.utcnow()
+        )
+    )
+
+def usage_summary(store_id: str) -> Dict[str, Dict]:
+    """Current usage and limit of every metric for a store"""
+    features = store_plan_features(store_id)
+    usage = StoreUsage.__table__
+    periods = {usage_period(metric) for metric in USAGE_METRICS}
+    counts = {
+        (row.metric, row.period): row.count
+        for row in db.session.execute(
+            select(usage.c.metric, usage.c.period, usage.c.count)
+            .where(usage.c.store_id == store_id, usage.c.period.in_(periods))
+        )
+    }
+
+    summary = {}
+    for metric, (feature, monthly) in USAGE_METRICS.items():
+        limit = features.get(feature)
+        summary[metric] = {
+            'used': counts.get((metric, usage_period(metric)), 0),
+            'limit': int(limit) if limit is not None and int(limit) >= 0 else None,
+            'period': usage_period(metric) or None
+        }
+    return summary
+
+def _actual_count(metric: str, store_id_column, now: datetime):
+    """Correlated COUNT of what a counter should hold this period"""
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if metric == 'bookings':
+        return select(func.count()).select_from(Booking).where(
+            Booking.store_id == store_id_column, Booking.created_at >= month_start
+        ).scalar_subquery()
+    if metric == 'services':
+        return select(func.count()).select_from(Service).where(Service.store_id == store_id_column).scalar_subquery()
+    return select(func.count()).select_from(Notification).where(
+        Notification.store_id == store_id_column, Notification.created_at >= month_start,
+        Notification.status.in_(COUNTED_NOTIFICATION_STATUSES), Notification.is_platform.is_(False)
+    ).scalar_subquery()
+
+def reconcile_usage(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Recount every store's counters for the current period from the source tables.
+
+    Counters only drift when a write path misses them (rows created outside
+    the API, a crash between the send and the commit...), so this is a
+    periodic safety net: per metric, one INSERT ... SELECT for stores without
+    a counter yet and one UPDATE of the counters that differ, committed per
+    metric. Returns how many counters were corrected per metric.
+    """
+    now = now or datetime.utcnow()
+    usage = StoreUsage.__table__
+    stores = Store.__table__
+    corrected = {}
+    for metric in USAGE_METRICS:
+        period = usage_period(metric, now)
+        missing = select(
+            stores.c.id, literal(metric), literal(period), literal(0), literal(now, usage.c.updated_at.type)
+        ).where(~select(usage.c.store_id).where(
+            usage.c.store_id == stores.c.id, usage.c.metric == metric, usage.c.period == period
+        ).exists())
+        db.session.execute(insert(usage).from_select(
+            ['store_id', 'metric', 'period', 'count', 'updated_at'], missing
+        ))
+
+        actual = _actual_count(metric, usage.c.store_id, now)
+        corrected[metric] = db.session.execute(
+            update(usage).where(
+                usage.c.metric == metric, usage.c.period == period, usage.c.count != actual
+            ).values(count=actual, updated_at=now)
+        ).rowcount
+        db.session.commit()
+    return corrected
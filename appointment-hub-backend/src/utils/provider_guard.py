@@ -0,0 +1,263 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import requests
+from src.utils.metrics import EXTERNAL_CALL_REJECTED, EXTERNAL_CIRCUIT_OPEN
+from src.utils.redis_client import get_redis_client, report_redis_error
+
+# provider=requests per second/burst
+DEFAULT_RATE_LIMITS = 'stripe=25/50,easysms=10/20,calendly=5/10'
+
+
+class ProviderCallRejected(requests.RequestException):
+    """Raised instead of calling a provider whose circuit is open or whose rate limit is used up.
+
+    A RequestException, so the integrations' existing error handling turns it
+    into their usual failure result.
+    """
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f'{provider} unavailable: {reason}')
+        self.provider = provider
+        self.reason = reason
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse 'stripe=25/50,easysms=10/20' into {provider: (rate, burst)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        provider, _, value = item.partition('=')
+        rate, _, burst = value.partition('/')
+        limits[provider.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimiter:
+    """Token bucket per provider, shared through Redis across gunicorn workers.
+
+    The bucket is refilled and drawn from in one Lua script using the Redis
+    clock, so workers on different hosts agree. Without Redis each process
+    keeps its own bucket, so the effective limit is per worker.
+    """
+
+    KEY_PREFIX = 'provider-bucket:'
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        self.limits = limits
+        self._local: Dict[str, Tuple[float, float]] = {}  # provider -> (tokens, updated at)
+        self._lock = threading.Lock()
+        self._script = None
+
+    def acquire(self, provider: str, max_wait: float = 0.0) -> bool:
+        """Take one token, waiting up to `max_wait` seconds for the bucket to refill"""
+        if provider not in self.limits:
+            return True
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._take(provider)
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def _take(self, provider: str) -> float:
+        """Try to take a token; return 0 on success, else seconds until one is available"""
+        rate, burst = self.limits[provider]
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(self.SCRIPT)
+                # On the current client: the one the script was registered with may have been dropped
+                return float(self._script(keys=[f'{self.KEY_PREFIX}{provider}'], args=[rate, burst, 1], client=client))
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis rate limiter failed, using in-process bucket: {e}")
+
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._local.get(provider, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                self._local[provider] = (tokens - 1, now)
+                return 0.0
+            self._local[provider] = (tokens, now)
+            return (1 - tokens) / rate
+
+
+class CircuitBreaker:
+    """Stops calling a provider after repeated failures, then lets one probe through.
+
+    closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_seconds`, where a single call is allowed and its
+    outcome closes or re-opens the circuit. Kept per process: every worker
+    notices a dead provider within a few calls anyway.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, provider: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def cancel(self):
+        """The allowed call never happened (e.g. it was rate limited)"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                EXTERNAL_CIRCUIT_OPEN.labels(self.provider).set(0)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit for {self.provider} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                EXTERNAL_CIRCUIT_OPEN.labels(self.provider).set(1)
+
+
+class ProviderGuard:
+    """Rate limiter plus one circuit breaker per provider"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None, failure_threshold: int = 5,
+                 reset_seconds: float = 30.0, max_wait: float = 0.25, timeout: float = 10.0):
+        self.limiter = RateLimiter(limits or {})
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    provider, CircuitBreaker(provider, self.failure_threshold, self.reset_seconds)
+                )
+        return breaker
+
+    def before_call(self, provider: str):
+        """Raise ProviderCallRejected unless a call to `provider` may go out now"""
+        breaker = self.breaker(provider)
+        if not breaker.allow():
+            EXTERNAL_CALL_REJECTED.labels(provider, 'circuit_open').inc()
+            raise ProviderCallRejected(provider, 'circuit open')
+        if not self.limiter.acquire(provider, self.max_wait):
+            breaker.cancel()
+            EXTERNAL_CALL_REJECTED.labels(provider, 'rate_limited').inc()
+            raise ProviderCallRejected(provider, 'rate limited')
+
+    def record(self, provider: str, status_code: Optional[int]):
+        """Count a response (None = no response) towards the provider's circuit.
+
+        Only the provider's own trouble counts: timeouts, connection errors,
+        5xx and 429. A 4xx means the request was wrong, not the provider.
+        """
+        if status_code is None or status_code >= 500 or status_code == 429:
+            self.breaker(provider).record_failure()
+        else:
+            self.breaker(provider).record_success()
+
+
+def create_provider_guard() -> ProviderGuard:
+    return ProviderGuard(
+        limits=parse_rate_limits(os.environ.get('PROVIDER_RATE_LIMITS', DEFAULT_RATE_LIMITS)),
+        failure_threshold=int(os.environ.get('PROVIDER_CIRCUIT_FAILURES', 5)),
+        reset_seconds=float(os.environ.get('PROVIDER_CIRCUIT_RESET_SECONDS', 30)),
+        max_wait=float(os.environ.get('PROVIDER_RATE_LIMIT_MAX_WAIT', 0.25)),
+        timeout=float(os.environ.get('PROVIDER_TIMEOUT_SECONDS', 10))
+    )
+
+
+provider_guard = create_provider_guard()
+
+
+class ProviderHTTP:
+    """requests-style client for one provider: guarded, with a timeout and pooled connections"""
+
+    def __init__(self, provider: str, guard: Optional[ProviderGuard] = None):
+        self.provider = provider
+        self.guard = guard or provider_guard
+        self.session = _session(provider)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', (min(3.05, self.guard.timeout), self.guard.timeout))
+        self.guard.before_call(self.provider)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.guard.record(self.provider, None)
+            raise
+        self.guard.record(self.provider, response.status_code)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def _session(provider: str) -> requests.Session:
+    """One pooled session per provider and process, so calls reuse connections"""
+    session = _sessions.get(provider)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.setdefault(provider, requests.Session())
+    return session
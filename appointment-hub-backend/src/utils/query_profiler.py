@@ -0,0 +1,117 @@
+import json
+import os
+import random
+import sys
+from flask import current_app, g, has_request_context, request
+from src.utils.metrics import QUERY_OBSERVERS
+
+PROFILE_HEADER = 'X-Profile-Queries'
+SERVER_TIMING_TOP_QUERIES = 5
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_SKIP_FILES = (os.path.abspath(__file__), os.path.join(_SRC_DIR, 'utils', 'metrics.py'))
+
+
+def find_query_origin():
+    """Find the application frame that issued the current statement.
+
+    Returns (origin, lazy_load) where origin is 'routes/booking.py:42 in get_bookings'
+    and lazy_load names the relationship if the statement came from a lazy load.
+    """
+    origin = None
+    lazy_load = None
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if lazy_load is None and frame.f_code.co_name == '_load_for_state' and 'sqlalchemy' in filename:
+            loader = frame.f_locals.get('self')
+            lazy_load = str(getattr(loader, 'parent_property', 'relationship'))
+        if filename.startswith(_SRC_DIR) and filename not in _SKIP_FILES:
+            origin = f"{filename[len(_SRC_DIR):]}:{frame.f_lineno} in {frame.f_code.co_name}"
+            break
+        frame = frame.f_back
+
+    return origin, lazy_load
+
+
+def _profile_query(statement, duration):
+    duration_ms = duration * 1000
+
+    profiling = has_request_context() and g.get('query_profile') is not None
+    slow_query_ms = current_app.config.get('SLOW_QUERY_MS', 0) if has_request_context() else 0
+    is_slow = slow_query_ms and duration_ms >= slow_query_ms
+    if not profiling and not is_slow:
+        return
+
+    # Walking the stack is only paid for profiled requests and slow statements
+    origin, lazy_load = find_query_origin()
+
+    if profiling:
+        g.query_profile.append({
+            'duration_ms': round(duration_ms, 3),
+            'origin': origin,
+            'lazy_load': lazy_load,
+            'statement': statement
+        })
+
+    if is_slow:
+        current_app.logger.warning(json.dumps({
+            'event': 'slow_query',
+            'endpoint': request.endpoint,
+            'duration_ms': round(duration_ms, 3),
+            'threshold_ms': slow_query_ms,
+            'origin': origin,
+            'lazy_load': lazy_load,
+            'statement': statement
+        }))
+
+
+QUERY_OBSERVERS.append(_profile_query)
+
+
+def init_query_profiler(app):
+    """Register the opt-in per-request query profiler.
+
+    A request is profiled when it carries X-Profile-Queries: 1 (if
+    QUERY_PROFILE_HEADER_ENABLED) or is picked by QUERY_PROFILE_SAMPLE_RATE.
+    Statements slower than SLOW_QUERY_MS are always logged.
+    """
+    sample_rate = app.config.get('QUERY_PROFILE_SAMPLE_RATE', 0.0)
+    header_enabled = app.config.get('QUERY_PROFILE_HEADER_ENABLED', False)
+
+    @app.before_request
+    def start_query_profile():
+        requested = header_enabled and request.headers.get(PROFILE_HEADER) == '1'
+        if requested or (sample_rate and random.random() < sample_rate):
+            g.query_profile = []
+
+    @app.after_request
+    def emit_query_profile(response):
+        queries = g.get('query_profile')
+        if queries is None:
+            return response
+
+        total_ms = sum(q['duration_ms'] for q in queries)
+        lazy_loads = [q for q in queries if q['lazy_load']]
+
+        current_app.logger.info(json.dumps({
+            'event': 'query_profile',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'query_count': len(queries),
+            'query_time_ms': round(total_ms, 3),
+            'lazy_load_count': len(lazy_loads),
+            'queries': queries
+        }))
+
+        # Server-Timing carries the aggregate plus the slowest statements' origins, never SQL
+        timings = [f'db;dur={total_ms:.2f};desc="{len(queries)} queries, {len(lazy_loads)} lazy"']
+        slowest = sorted(queries, key=lambda q: q['duration_ms'], reverse=True)[:SERVER_TIMING_TOP_QUERIES]
+        for i, query in enumerate(slowest):
+            desc = (query['origin'] or 'unknown').replace('"', "'")
+            timings.append(f'q{i};dur={query["duration_ms"]:.2f};desc="{desc}"')
+        response.headers['Server-Timing'] = ', '.join(timings)
+        return response
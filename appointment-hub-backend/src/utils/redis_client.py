@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+
+_client = None
+_client_checked_at = None
+_client_lock = threading.Lock()
+
+# How long to wait before trying an unreachable Redis again
+RETRY_INTERVAL_SECONDS = 30
+
+def get_redis_client():
+    """Get a shared Redis client, or None if Redis is not configured or reachable.
+
+    Callers are expected to fall back to in-process state when this returns None.
+    """
+    global _client, _client_checked_at
+
+    if _client is not None:
+        return _client
+
+    redis_url = os.environ.get('REDIS_URL')
+    if not redis_url:
+        return None
+
+    now = time.monotonic()
+    if _client_checked_at is not None and now - _client_checked_at < RETRY_INTERVAL_SECONDS:
+        return None
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        _client_checked_at = now
+        try:
+            import redis
+            client = redis.Redis.from_url(
+                redis_url,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+                decode_responses=True
+            )
+            client.ping()
+            _client = client
+        except Exception as e:
+            print(f"Redis unavailable, using in-process fallback: {e}")
+            return None
+
+    return _client
+
+def report_redis_error(error: Exception):
+    """Drop the shared client after a command failed with a Redis error.
+
+    redis-py reconnects on the next command by itself, so a dead Redis would
+    otherwise cost every call its socket timeout. Callers fall back to their
+    in-process state until RETRY_INTERVAL_SECONDS have passed.
+    """
+    global _client, _client_checked_at
+
+    import redis
+    if not isinstance(error, redis.RedisError):
+        return
+    with _client_lock:
+        _client = None
+        _client_checked_at = time.monotonic()
@@ -1,7 +1,36 @@
 import os
 import stripe
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
 from decimal import Decimal
+from src.utils.metrics import observe_external_call
+from src.utils.provider_guard import ProviderGuard, ProviderCallRejected, provider_guard
+
+class GuardedStripeClient(stripe.RequestsClient):
+    """Stripe's HTTP client behind the shared provider rate limit and circuit breaker.
+
+    The SDK calls request() once per attempt, so its own retries are limited
+    and counted too. A refused call raises APIError rather than
+    APIConnectionError so the SDK doesn't retry it.
+    """
+
+    def __init__(self, guard: ProviderGuard = None, **kwargs):
+        self.guard = guard or provider_guard
+        kwargs.setdefault('timeout', self.guard.timeout)
+        super().__init__(**kwargs)
+
+    def request(self, method, url, headers, post_data=None):
+        try:
+            self.guard.before_call('stripe')
+        except ProviderCallRejected as e:
+            raise stripe.APIError(str(e), http_status=503)
+        try:
+            content, status_code, response_headers = super().request(method, url, headers, post_data)
+        except stripe.APIConnectionError:
+            self.guard.record('stripe', None)
+            raise
+        self.guard.record('stripe', status_code)
+        return content, status_code, response_headers
 
 class StripeIntegration:
     """Stripe API integration for payments and subscriptions"""
@@ -10,7 +39,10 @@ class StripeIntegration:
         self.secret_key = secret_key
         self.webhook_secret = webhook_secret
         stripe.api_key = secret_key
+        if not isinstance(stripe.default_http_client, GuardedStripeClient):
+            stripe.default_http_client = GuardedStripeClient()
     
+    @observe_external_call('stripe')
     def create_payment_intent(self, amount: int, currency: str = 'eur', 
                             customer_id: str = None, metadata: Dict = None) -> Optional[Dict]:
         """Create a PaymentIntent for one-time payments"""
@@ -41,6 +73,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def create_customer(self, email: str, name: str = None, 
                        phone: str = None, metadata: Dict = None) -> Optional[Dict]:
         """Create a Stripe customer"""
@@ -67,6 +100,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def create_product(self, name: str, description: str = None, 
                       metadata: Dict = None) -> Optional[Dict]:
         """Create a Stripe product"""
@@ -91,6 +125,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def create_price(self, product_id: str, unit_amount: int, currency: str = 'eur',
                     recurring: Dict = None, metadata: Dict = None) -> Optional[Dict]:
         """Create a Stripe price"""
@@ -119,6 +154,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def create_subscription(self, customer_id: str, price_id: str,
                           trial_period_days: int = None, metadata: Dict = None) -> Optional[Dict]:
         """Create a Stripe subscription"""
@@ -146,6 +182,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def cancel_subscription(self, subscription_id: str, at_period_end: bool = True) -> Optional[Dict]:
         """Cancel a Stripe subscription"""
         try:
@@ -168,6 +205,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def create_refund(self, payment_intent_id: str = None, charge_id: str = None,
                      amount: int = None, reason: str = None) -> Optional[Dict]:
         """Create a refund"""
@@ -202,6 +240,7 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    @observe_external_call('stripe')
     def retrieve_payment_intent(self, payment_intent_id: str) -> Optional[Dict]:
         """Retrieve a PaymentIntent"""
         try:
@@ -218,6 +257,22 @@ class StripeIntegration:
                 'error': str(e)
             }
     
+    def list_payment_intents(self, created_after: datetime, created_before: datetime,
+                             page_size: int = 100) -> Iterator[stripe.PaymentIntent]:
+        """PaymentIntents created in [created_after, created_before), newest first.
+
+        Pages are fetched lazily as the iterator is consumed, with each intent's
+        latest charge expanded so refunds are visible. StripeError propagates.
+        """
+        intents = stripe.PaymentIntent.list(
+            created={'gte': int(created_after.replace(tzinfo=timezone.utc).timestamp()),
+                     'lt': int(created_before.replace(tzinfo=timezone.utc).timestamp())},
+            limit=page_size,
+            expand=['data.latest_charge']
+        )
+        return intents.auto_paging_iter()
+    
+    @observe_external_call('stripe')
     def retrieve_subscription(self, subscription_id: str) -> Optional[Dict]:
         """Retrieve a subscription"""
         try:
@@ -263,91 +318,8 @@ class StripeIntegration:
                 'error': f'Invalid signature: {e}'
             }
     
-    def process_webhook_event(self, event: Dict) -> Dict:
-        """Process webhook event and return structured data"""
-        event_type = event['type']
-        event_data = event['data']['object']
-        
-        if event_type == 'payment_intent.succeeded':
-            return {
-                'type': 'payment_succeeded',
-                'payment_intent_id': event_data['id'],
-                'amount': event_data['amount'],
-                'currency': event_data['currency'],
-                'customer_id': event_data.get('customer'),
-                'metadata': event_data.get('metadata', {})
-            }
-        
-        elif event_type == 'payment_intent.payment_failed':
-            return {
-                'type': 'payment_failed',
-                'payment_intent_id': event_data['id'],
-                'amount': event_data['amount'],
-                'currency': event_data['currency'],
-                'customer_id': event_data.get('customer'),
-                'last_payment_error': event_data.get('last_payment_error'),
-                'metadata': event_data.get('metadata', {})
-            }
-        
-        elif event_type == 'customer.subscription.created':
-            return {
-                'type': 'subscription_created',
-                'subscription_id': event_data['id'],
-                'customer_id': event_data['customer'],
-                'status': event_data['status'],
-                'current_period_start': event_data['current_period_start'],
-                'current_period_end': event_data['current_period_end'],
-                'metadata': event_data.get('metadata', {})
-            }
-        
-        elif event_type == 'customer.subscription.updated':
-            return {
-                'type': 'subscription_updated',
-                'subscription_id': event_data['id'],
-                'customer_id': event_data['customer'],
-                'status': event_data['status'],
-                'current_period_start': event_data['current_period_start'],
-                'current_period_end': event_data['current_period_end'],
-                'metadata': event_data.get('metadata', {})
-            }
-        
-        elif event_type == 'customer.subscription.deleted':
-            return {
-                'type': 'subscription_deleted',
-                'subscription_id': event_data['id'],
-                'customer_id': event_data['customer'],
-                'status': event_data['status'],
-                'metadata': event_data.get('metadata', {})
-            }
-        
-        elif event_type == 'invoice.payment_succeeded':
-            return {
-                'type': 'invoice_paid',
-                'invoice_id': event_data['id'],
-                'subscription_id': event_data.get('subscription'),
-                'customer_id': event_data['customer'],
-                'amount_paid': event_data['amount_paid'],
-                'currency': event_data['currency']
-            }
-        
-        elif event_type == 'invoice.payment_failed':
-            return {
-                'type': 'invoice_payment_failed',
-                'invoice_id': event_data['id'],
-                'subscription_id': event_data.get('subscription'),
-                'customer_id': event_data['customer'],
-                'amount_due': event_data['amount_due'],
-                'currency': event_data['currency']
-            }
-        
-        else:
-            return {
-                'type': 'unknown',
-                'event_type': event_type,
-                'raw_data': event_data
-            }
-    
-    def format_amount_for_stripe(self, amount: Decimal, currency: str = 'eur') -> int:
+    @staticmethod
+    def format_amount_for_stripe(amount: Decimal, currency: str = 'eur') -> int:
         """Convert decimal amount to Stripe's integer format (cents)"""
         # Most currencies use 2 decimal places, but some use 0 or 3
         if currency.lower() in ['jpy', 'krw']:  # Zero-decimal currencies
@@ -355,7 +327,8 @@ class StripeIntegration:
         else:  # Two-decimal currencies (EUR, USD, etc.)
             return int(amount * 100)
     
-    def format_amount_from_stripe(self, amount: int, currency: str = 'eur') -> Decimal:
+    @staticmethod
+    def format_amount_from_stripe(amount: int, currency: str = 'eur') -> Decimal:
         """Convert Stripe's integer amount to decimal"""
         if currency.lower() in ['jpy', 'krw']:  # Zero-decimal currencies
             return Decimal(str(amount))
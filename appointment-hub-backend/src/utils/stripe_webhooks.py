@@ -0,0 +1,220 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from src.models import db, Payment, PaymentStatus, Subscription, SubscriptionStatus
+from src.utils.booking_payments import rollup_booking_payments
+from src.utils.subscription_renewals import renew_paid_subscriptions
+
+if TYPE_CHECKING:  # the Stripe SDK is only loaded by the code that calls Stripe
+    import stripe
+
+# Stripe event type -> handler(event, object, batch) returning 'processed' or 'ignored'
+WEBHOOK_HANDLERS: Dict[str, Callable] = {}
+
+def handles(*event_types: str):
+    """Register a handler for one or more Stripe event types"""
+    def decorator(f):
+        for event_type in event_types:
+            WEBHOOK_HANDLERS[event_type] = f
+        return f
+    return decorator
+
+
+def _id(value) -> Optional[str]:
+    """An expandable field: an id, or the expanded object"""
+    return getattr(value, 'id', value) if value else None
+
+def _invoice_subscription_id(invoice: 'stripe.Invoice') -> Optional[str]:
+    subscription = getattr(invoice, 'subscription', None)
+    if subscription is None:
+        # API versions from 2025-03-31 moved it under parent
+        details = getattr(getattr(invoice, 'parent', None), 'subscription_details', None)
+        subscription = getattr(details, 'subscription', None)
+    return _id(subscription)
+
+def _invoice_payment_intent_id(invoice: 'stripe.Invoice') -> Optional[str]:
+    intent = getattr(invoice, 'payment_intent', None)
+    if intent is None:
+        # API versions from 2025-03-31 list invoice payments instead
+        payments = getattr(getattr(invoice, 'payments', None), 'data', None) or []
+        intent = next((getattr(p.payment, 'payment_intent', None) for p in payments), None)
+    return _id(intent)
+
+def _invoice_period(invoice: 'stripe.Invoice') -> Optional[Tuple[datetime, datetime]]:
+    """The period a subscription invoice pays for.
+
+    invoice.period_start/end cover the previous period on renewals, so the
+    subscription line's period is used when present.
+    """
+    lines = getattr(getattr(invoice, 'lines', None), 'data', None) or []
+    period = next((line.period for line in lines if getattr(line, 'period', None)), None)
+    if period is not None:
+        return datetime.utcfromtimestamp(period.start), datetime.utcfromtimestamp(period.end)
+    if getattr(invoice, 'period_end', None):
+        return datetime.utcfromtimestamp(invoice.period_start), datetime.utcfromtimestamp(invoice.period_end)
+    return None
+
+def _references(obj) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(payment intent id, invoice id, subscription id) an event object points at"""
+    kind = getattr(obj, 'object', None)
+    if kind == 'payment_intent':
+        return obj.id, None, None
+    if kind == 'subscription':
+        return None, None, obj.id
+    if kind == 'invoice':
+        return _invoice_payment_intent_id(obj), obj.id, _invoice_subscription_id(obj)
+    return None, None, None
+
+
+class WebhookBatch:
+    """Local payments and subscriptions a set of events refers to.
+
+    Loaded up front with one query per table, so a delivery (or a replay of
+    many events) costs the same two lookups however many events it holds.
+    """
+
+    def __init__(self, events: Iterable['stripe.Event']):
+        intent_ids, invoice_ids, subscription_ids = set(), set(), set()
+        for event in events:
+            intent_id, invoice_id, subscription_id = _references(event.data.object)
+            intent_ids.update(filter(None, [intent_id]))
+            invoice_ids.update(filter(None, [invoice_id]))
+            subscription_ids.update(filter(None, [subscription_id]))
+
+        self.payments_by_intent: Dict[str, Payment] = {}
+        self.payments_by_invoice: Dict[str, Payment] = {}
+        if intent_ids or invoice_ids:
+            payments = (
+                Payment.query
+                .filter(or_(Payment.stripe_payment_intent_id.in_(intent_ids),
+                            Payment.stripe_invoice_id.in_(invoice_ids)))
+                .all()
+            )
+            for payment in payments:
+                self._remember(payment)
+
+        self.subscriptions: Dict[str, Subscription] = {}
+        # Bookings whose payments changed, rolled up once the batch is applied
+        self.booking_ids = set()
+        # Locally billed subscriptions whose renewal payment succeeded
+        self.renewed_subscription_ids = set()
+        if subscription_ids:
+            subscriptions = (
+                Subscription.query
+                .options(joinedload(Subscription.store))
+                .filter(Subscription.stripe_subscription_id.in_(subscription_ids))
+                .all()
+            )
+            self.subscriptions = {s.stripe_subscription_id: s for s in subscriptions}
+
+    def _remember(self, payment: Payment):
+        if payment.stripe_payment_intent_id:
+            self.payments_by_intent[payment.stripe_payment_intent_id] = payment
+        if payment.stripe_invoice_id:
+            self.payments_by_invoice[payment.stripe_invoice_id] = payment
+
+    def find_invoice_payment(self, invoice: 'stripe.Invoice') -> Optional[Payment]:
+        """The payment already recording an invoice, if any"""
+        return self.payments_by_invoice.get(invoice.id) or \
+            self.payments_by_intent.get(_invoice_payment_intent_id(invoice))
+
+    def invoice_payment(self, invoice: 'stripe.Invoice', subscription: Subscription) -> Payment:
+        """The payment recording an invoice, created on its first event"""
+        intent_id = _invoice_payment_intent_id(invoice)
+        payment = self.find_invoice_payment(invoice)
+        if payment is None:
+            payment = Payment(
+                store_id=subscription.store_id,
+                user_id=subscription.store.manager_user_id,
+                subscription_id=subscription.id
+            )
+            db.session.add(payment)
+        payment.stripe_invoice_id = invoice.id
+        payment.stripe_payment_intent_id = payment.stripe_payment_intent_id or intent_id
+        self._remember(payment)
+        return payment
+
+
+def process_events(events: List['stripe.Event']) -> List[Dict]:
+    """Apply verified Stripe events through WEBHOOK_HANDLERS; the caller commits"""
+    batch = WebhookBatch(event for event in events if event.type in WEBHOOK_HANDLERS)
+    results = []
+    for event in events:
+        handler = WEBHOOK_HANDLERS.get(event.type)
+        outcome = handler(event, event.data.object, batch) if handler else 'ignored'
+        results.append({'id': event.id, 'type': event.type, 'result': outcome})
+    rollup_booking_payments(batch.booking_ids)
+    renew_paid_subscriptions(batch.renewed_subscription_ids)
+    return results
+
+
+@handles('payment_intent.succeeded', 'payment_intent.payment_failed')
+def payment_intent_changed(event: 'stripe.Event', intent: 'stripe.PaymentIntent', batch: WebhookBatch) -> str:
+    payment = batch.payments_by_intent.get(intent.id)
+    if payment is None:
+        return 'ignored'
+
+    payment.update_from_stripe_event(event)
+    if payment.booking_id:
+        batch.booking_ids.add(payment.booking_id)
+    if payment.subscription_id and payment.status == PaymentStatus.SUCCEEDED:
+        batch.renewed_subscription_ids.add(payment.subscription_id)
+    return 'processed'
+
+
+@handles('customer.subscription.created', 'customer.subscription.updated', 'customer.subscription.deleted')
+def subscription_changed(event: 'stripe.Event', stripe_subscription: 'stripe.Subscription', batch: WebhookBatch) -> str:
+    subscription = batch.subscriptions.get(stripe_subscription.id)
+    if subscription is None:
+        return 'ignored'
+
+    subscription.update_from_stripe_event(event)
+    # Period fields live on the subscription before API 2025-03-31, on its items after
+    item = next(iter(getattr(getattr(stripe_subscription, 'items', None), 'data', None) or []), None)
+    source = stripe_subscription if getattr(stripe_subscription, 'current_period_end', None) else item
+    if source is not None and getattr(source, 'current_period_end', None):
+        subscription.current_period_start = datetime.utcfromtimestamp(source.current_period_start)
+        subscription.current_period_end = datetime.utcfromtimestamp(source.current_period_end)
+    return 'processed'
+
+
+@handles('invoice.payment_succeeded', 'invoice.payment_failed')
+def invoice_payment_changed(event: 'stripe.Event', invoice: 'stripe.Invoice', batch: WebhookBatch) -> str:
+    """A subscription invoice was paid (renewal) or its payment failed"""
+    subscription = batch.subscriptions.get(_invoice_subscription_id(invoice))
+    if subscription is None:
+        return 'ignored'
+
+    succeeded = event.type == 'invoice.payment_succeeded'
+    period = _invoice_period(invoice)
+    if succeeded:
+        if period is not None:
+            subscription.current_period_start, subscription.current_period_end = period
+            subscription.end_date = period[1]
+        subscription.status = SubscriptionStatus.ACTIVE
+    else:
+        # Stripe doesn't guarantee delivery order: a failed attempt can arrive
+        # after the retry that paid the invoice, or after a later period was paid
+        payment = batch.find_invoice_payment(invoice)
+        if payment is not None and payment.status == PaymentStatus.SUCCEEDED:
+            return 'ignored'
+        superseded = period is not None and subscription.current_period_end is not None and \
+            period[1] < subscription.current_period_end
+        if not superseded and subscription.status in (SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIALING):
+            subscription.status = SubscriptionStatus.PAST_DUE
+
+    amount = invoice.amount_paid if succeeded else invoice.amount_due
+    if not amount:
+        return 'processed'  # trials and fully credited invoices move no money
+
+    from src.utils.stripe_integration import StripeIntegration
+    payment = batch.invoice_payment(invoice, subscription)
+    payment.amount = StripeIntegration.format_amount_from_stripe(amount, invoice.currency)
+    payment.currency = invoice.currency.upper()
+    if payment.status != PaymentStatus.REFUNDED:
+        payment.status = PaymentStatus.SUCCEEDED if succeeded else PaymentStatus.FAILED
+    paid_at = getattr(getattr(invoice, 'status_transitions', None), 'paid_at', None)
+    payment.payment_date = datetime.utcfromtimestamp(paid_at) if succeeded and paid_at else \
+        datetime.utcfromtimestamp(event.created)
+    return 'processed'
@@ -0,0 +1,242 @@
+import calendar
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import and_, bindparam, exists, func, select, update
+from src.models import (
+    db, Notification, NotificationStatus, NotificationType, Payment, PaymentStatus, Store,
+    Subscription, SubscriptionInterval, SubscriptionPlan, SubscriptionStatus, User
+)
+from src.models.types import generate_uuid
+
+RENEWING_STATUSES = (SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIALING)
+
+RENEWAL_DUE_SUBJECT = 'Your {plan} subscription is due for renewal'
+RENEWAL_DUE_MESSAGE = ('The {plan} subscription of {store} renewed on {date}. Please pay {amount} {currency} '
+                       'within {grace_days} days to keep it active.')
+ENDED_SUBJECT = 'Your {plan} subscription has ended'
+ENDED_MESSAGE = 'The {plan} subscription of {store} has ended because its renewal of {date} was not paid.'
+
+def add_interval(when: datetime, interval, anchor_day: Optional[int] = None) -> datetime:
+    """`when` plus one plan interval (a SubscriptionInterval or its value).
+
+    Months keep `anchor_day` - the day the subscription started - where the
+    month has it, so a subscription started on the 31st renews on the last
+    day of shorter months and goes back to the 31st after them.
+    """
+    months = 12 if SubscriptionInterval(interval) == SubscriptionInterval.YEAR else 1
+    month = when.month - 1 + months
+    year, month = when.year + month // 12, month % 12 + 1
+    return when.replace(year=year, month=month, day=min(anchor_day or when.day, calendar.monthrange(year, month)[1]))
+
+def _batch_query(where, batch_size: int):
+    """Locally billed subscriptions matching `where`, with their plan and store manager.
+
+    Stripe-billed subscriptions (stripe_subscription_id set) are left to the
+    Stripe webhooks. Rows another run has locked are skipped.
+    """
+    subscriptions = Subscription.__table__
+    plans = SubscriptionPlan.__table__
+    stores = Store.__table__
+    users = User.__table__
+    return (
+        select(
+            subscriptions.c.id, subscriptions.c.store_id, subscriptions.c.start_date,
+            subscriptions.c.current_period_end, plans.c.name.label('plan'), plans.c.price_amount,
+            plans.c.currency, plans.c.interval, stores.c.name.label('store'),
+            stores.c.manager_user_id, users.c.email
+        )
+        .join(plans, plans.c.id == subscriptions.c.plan_id)
+        .join(stores, stores.c.id == subscriptions.c.store_id)
+        .join(users, users.c.id == stores.c.manager_user_id)
+        .where(where, subscriptions.c.stripe_subscription_id.is_(None))
+        .order_by(subscriptions.c.current_period_end)
+        .limit(batch_size)
+        .with_for_update(of=subscriptions, skip_locked=True)
+    )
+
+def _queue_notifications(rows, subject: str, message: str, grace_days: int, stats: Dict[str, int]):
+    """Queue PENDING emails to the store managers of `rows` in the current transaction"""
+    now = datetime.utcnow()
+    records = []
+    for row in rows:
+        variables = {
+            'plan': row.plan, 'store': row.store, 'date': row.current_period_end.date().isoformat(),
+            'amount': f'{row.price_amount:.2f}', 'currency': row.currency, 'grace_days': grace_days
+        }
+        records.append({
+            'id': generate_uuid(),
+            'store_id': row.store_id,
+            'recipient_user_id': row.manager_user_id,
+            'type': NotificationType.EMAIL,
+            'subject': subject.format(**variables),
+            'body': message.format(**variables),
+            'status': NotificationStatus.PENDING,
+            'is_platform': True,  # billing mail, not the store's own messaging
+            'sent_at': now,
+            'created_at': now,
+            'updated_at': now,
+        })
+    if records:
+        db.session.execute(Notification.__table__.insert(), records)
+        stats['notifications_queued'] += len(records)
+
+def _renew_batch(rows, now: datetime, grace_days: int, stats: Dict[str, int]):
+    """Start the next period of free subscriptions, bill the paid ones and move them to PAST_DUE"""
+    subscriptions = Subscription.__table__
+    payments = Payment.__table__
+    free = [row for row in rows if not row.price_amount]
+    paid = [row for row in rows if row.price_amount]
+
+    if free:
+        periods = []
+        for row in free:
+            start = row.current_period_end
+            end = add_interval(start, row.interval, row.start_date.day)
+            while end <= now:  # the job did not run for a while
+                start, end = end, add_interval(end, row.interval, row.start_date.day)
+            periods.append({'b_id': row.id, 'b_start': start, 'b_end': end})
+        db.session.execute(
+            update(subscriptions).where(subscriptions.c.id == bindparam('b_id')).values(
+                status=SubscriptionStatus.ACTIVE, current_period_start=bindparam('b_start'),
+                current_period_end=bindparam('b_end'), updated_at=now
+            ), periods
+        )
+    if paid:
+        db.session.execute(
+            update(subscriptions).where(subscriptions.c.id.in_([row.id for row in paid]))
+            .values(status=SubscriptionStatus.PAST_DUE, updated_at=now)
+        )
+        db.session.execute(payments.insert(), [{
+            'id': generate_uuid(),
+            'store_id': row.store_id,
+            'user_id': row.manager_user_id,
+            'subscription_id': row.id,
+            'amount': row.price_amount,
+            'currency': row.currency,
+            'status': PaymentStatus.PENDING,
+            'payment_date': now,
+            'created_at': now,
+            'updated_at': now,
+        } for row in paid])
+        _queue_notifications(paid, RENEWAL_DUE_SUBJECT, RENEWAL_DUE_MESSAGE, grace_days, stats)
+    db.session.commit()
+    stats['renewed'] += len(free)
+    stats['past_due'] += len(paid)
+
+def process_subscriptions(now: Optional[datetime] = None, grace_days: int = 7, batch_size: int = 1000,
+                          dry_run: bool = False) -> Dict[str, int]:
+    """Move locally billed subscriptions across their period boundaries.
+
+    Indexed range scans over (status, current_period_end), batch by batch:
+
+    - ACTIVE/TRIALING subscriptions whose period ended: free plans roll
+      straight into their next period; paid ones become PAST_DUE and get a
+      PENDING renewal payment for the plan price, which the store pays through
+      create-payment-intent (renew_paid_subscriptions then starts the next
+      period).
+    - PAST_DUE subscriptions still unpaid `grace_days` after their period
+      ended (and after they went past due) become ENDED, their pending
+      renewal payments FAILED, and the store loses the plan unless it has
+      another live subscription.
+
+    Each batch is a few bulk statements and one commit, which also queues the
+    emails to the store managers as PENDING notifications for
+    send_pending_notifications. Rows locked by a concurrent run are skipped,
+    so an interrupted run can simply be started again.
+    """
+    now = now or datetime.utcnow()
+    subscriptions = Subscription.__table__
+    payments = Payment.__table__
+    stores = Store.__table__
+    status = subscriptions.c.status
+    period_end = subscriptions.c.current_period_end
+    grace_start = now - timedelta(days=grace_days)
+    # updated_at: subscriptions that just went past due after a long gap still get the grace period
+    lapsed = and_(status == SubscriptionStatus.PAST_DUE, period_end <= grace_start,
+                  subscriptions.c.updated_at <= grace_start)
+
+    if dry_run:
+        local = subscriptions.c.stripe_subscription_id.is_(None)
+        counts = {
+            name: db.session.execute(select(func.count()).select_from(subscriptions).where(where, local)).scalar()
+            for name, where in (('due', and_(status.in_(RENEWING_STATUSES), period_end <= now)), ('ended', lapsed))
+        }
+        db.session.rollback()
+        return counts
+
+    stats = {'renewed': 0, 'past_due': 0, 'ended': 0, 'notifications_queued': 0}
+
+    # One status at a time: an equality on status lets the index also give the order
+    for renewing in RENEWING_STATUSES:
+        while True:
+            rows = db.session.execute(_batch_query(and_(status == renewing, period_end <= now), batch_size)).all()
+            if not rows:
+                break
+            _renew_batch(rows, now, grace_days, stats)
+
+    while True:
+        rows = db.session.execute(_batch_query(lapsed, batch_size)).all()
+        if not rows:
+            break
+        ids = [row.id for row in rows]
+        db.session.execute(
+            update(subscriptions).where(subscriptions.c.id.in_(ids))
+            .values(status=SubscriptionStatus.ENDED, end_date=now, updated_at=now)
+        )
+        db.session.execute(
+            update(payments).where(
+                payments.c.subscription_id.in_(ids), payments.c.status == PaymentStatus.PENDING,
+                payments.c.stripe_payment_intent_id.is_(None)
+            ).values(status=PaymentStatus.FAILED, updated_at=now)
+        )
+        live = exists().where(
+            subscriptions.c.store_id == stores.c.id,
+            subscriptions.c.status.in_(RENEWING_STATUSES + (SubscriptionStatus.PAST_DUE,))
+        )
+        db.session.execute(
+            update(stores).where(stores.c.id.in_({row.store_id for row in rows}), ~live)
+            .values(current_subscription_plan_id=None, updated_at=now)
+        )
+        _queue_notifications(rows, ENDED_SUBJECT, ENDED_MESSAGE, grace_days, stats)
+        db.session.commit()
+        stats['ended'] += len(rows)
+
+    return stats
+
+def renew_paid_subscriptions(subscription_ids: Iterable[str]) -> int:
+    """Start the next period of PAST_DUE subscriptions whose renewal was just paid.
+
+    Call it in the transaction that marked the payments succeeded. The new
+    period follows on from the one that ended, whenever the payment came in.
+    """
+    subscription_ids = sorted(set(filter(None, subscription_ids)))
+    if not subscription_ids:
+        return 0
+
+    subscriptions = Subscription.__table__
+    plans = SubscriptionPlan.__table__
+    rows = db.session.execute(
+        select(subscriptions.c.id, subscriptions.c.start_date, subscriptions.c.current_period_end, plans.c.interval)
+        .join(plans, plans.c.id == subscriptions.c.plan_id)
+        .where(
+            subscriptions.c.id.in_(subscription_ids),
+            subscriptions.c.status == SubscriptionStatus.PAST_DUE,
+            subscriptions.c.stripe_subscription_id.is_(None)
+        )
+        .order_by(subscriptions.c.id)
+        .with_for_update(of=subscriptions)
+    ).all()
+    if not rows:
+        return 0
+
+    now = datetime.utcnow()
+    db.session.execute(
+        update(subscriptions).where(subscriptions.c.id == bindparam('b_id')).values(
+            status=SubscriptionStatus.ACTIVE, current_period_start=bindparam('b_start'),
+            current_period_end=bindparam('b_end'), updated_at=now
+        ), [{
+            'b_id': row.id, 'b_start': row.current_period_end,
+            'b_end': add_interval(row.current_period_end, row.interval, row.start_date.day)
+        } for row in rows]
+    )
+    return len(rows)
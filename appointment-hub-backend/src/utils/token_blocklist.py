@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import Dict, Optional
+from src.utils.redis_client import get_redis_client, report_redis_error
+
+class TokenBlocklist:
+    """Revoked JWT ids, kept only until the token would have expired anyway.
+
+    Stored in Redis so revocations hold across gunicorn workers, with an
+    in-process fallback when Redis is unavailable.
+    """
+
+    KEY_PREFIX = 'revoked-jti:'
+
+    def __init__(self):
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: Optional[int] = None) -> bool:
+        """Revoke a token id until its expiry timestamp.
+
+        Returns False if it was already revoked, so a refresh token can only be
+        rotated once even when two requests race with it.
+        """
+        ttl = int(expires_at - time.time()) if expires_at else 24 * 3600
+        if ttl <= 0:
+            return False
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                return bool(client.set(f'{self.KEY_PREFIX}{jti}', 1, ex=ttl, nx=True))
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis revoke failed, using in-process blocklist: {e}")
+
+        with self._lock:
+            self._prune()
+            if jti in self._local:
+                return False
+            self._local[jti] = time.time() + ttl
+            return True
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether a token id has been revoked"""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if client.exists(f'{self.KEY_PREFIX}{jti}'):
+                    return True
+            except Exception as e:
+                report_redis_error(e)
+                print(f"Redis lookup failed, using in-process blocklist: {e}")
+
+        expires_at = self._local.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def _prune(self):
+        """Drop entries whose tokens have expired on their own"""
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._local.items() if expires_at <= now]:
+            del self._local[jti]
+
+
+token_blocklist = TokenBlocklist()
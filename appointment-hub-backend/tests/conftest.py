@@ -0,0 +1,105 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+sys.path.insert(0, BACKEND_DIR)
+
+# Extra bookings and subscriptions on top of the demo data, so a list endpoint
+# that loads a relationship per row would run far more queries than allowed
+EXTRA_BOOKINGS = 30
+EXTRA_SUBSCRIPTIONS = 6
+
+
+def _add_rows(db):
+    from src.models import (
+        Booking, BookingStatus, Service, Store, Subscription, SubscriptionPlan, SubscriptionStatus,
+        User, UserRole
+    )
+
+    store = Store.query.join(User, User.id == Store.manager_user_id).filter(User.email == 'manager@demo.com').one()
+    services = Service.query.filter_by(store_id=store.id).all()
+    clients = User.query.filter_by(role=UserRole.CLIENT).all()
+    for i in range(EXTRA_BOOKINGS):
+        db.session.add(Booking(
+            store_id=store.id, client_user_id=clients[i % len(clients)].id,
+            service_id=services[i % len(services)].id, booking_date=date.today() + timedelta(days=i % 10),
+            start_time=time(8 + i % 10, 0), end_time=time(9 + i % 10, 0), number_of_persons=1,
+            status=BookingStatus.CONFIRMED, total_amount=50
+        ))
+    stores = Store.query.all()
+    plans = SubscriptionPlan.query.all()
+    for i in range(EXTRA_SUBSCRIPTIONS):
+        db.session.add(Subscription(store_id=stores[i % len(stores)].id, plan_id=plans[i % len(plans)].id,
+                                    status=SubscriptionStatus.CANCELLED))
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The app on a migrated SQLite database holding the demo data plus extra rows.
+
+    Lazy relationship loads in a loop raise (NPLUSONE_GUARD), and the handlers
+    turn that into a 500.
+    """
+    from flask_migrate import upgrade
+    from init_demo_data import init_demo_data
+    from src.main import create_app
+    from src.models import db
+    from src.utils.plan_cache import plan_cache
+
+    db_path = tmp_path_factory.mktemp('db') / 'test.db'
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'NPLUSONE_GUARD': 'raise',
+        'NPLUSONE_THRESHOLD': 2,
+    })
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        init_demo_data(db)
+        _add_rows(db)
+        plan_cache.warm()
+        db.session.remove()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Authorization headers for a demo user: auth_headers('manager@demo.com')"""
+    from flask_jwt_extended import create_access_token
+    from src.models import User
+
+    def headers(email):
+        with app.app_context():
+            user = User.query.filter_by(email=email).one()
+            return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+    return headers
+
+
+@pytest.fixture
+def max_queries():
+    """Fail when a block runs more than `limit` SQL statements:
+
+        with max_queries(4):
+            client.get('/api/bookings', headers=headers)
+    """
+    from src.utils.nplusone import count_queries
+
+    @contextmanager
+    def check(limit):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= limit, (
+            f'{counter.count} queries, at most {limit} expected:\n' + '\n'.join(counter.statements)
+        )
+    return check
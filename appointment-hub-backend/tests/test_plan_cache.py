@@ -0,0 +1,42 @@
+"""The plan cache reloads from the primary even when a GET request reads from the replica."""
+import shutil
+
+from flask import g
+
+
+def test_plan_cache_reloads_from_primary_during_replica_reads(app, tmp_path):
+    from src.main import create_app
+    from src.models import db, SubscriptionPlan
+    from src.utils.plan_cache import PlanCache
+
+    primary_url = app.config['SQLALCHEMY_DATABASE_URI']
+    replica_path = tmp_path / 'replica.db'
+    # The replica is a copy from before the admin's change: it lags behind the primary
+    shutil.copy(primary_url[len('sqlite:///'):], replica_path)
+
+    with app.app_context():
+        plan = SubscriptionPlan.query.order_by(SubscriptionPlan.created_at).first()
+        plan_id, old_features = plan.id, plan.features
+        plan.features = {'max_bookings': 12345}
+        db.session.commit()
+
+    replicated = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': primary_url,
+        'DATABASE_REPLICA_URL': f'sqlite:///{replica_path}',
+    })
+    try:
+        with replicated.test_request_context('/api/subscription-plans', method='GET'):
+            g.use_replica = True
+            stale = db.session.get(SubscriptionPlan, plan_id)
+            assert stale.features == old_features  # the request itself does read the lagging replica
+
+            cache = PlanCache(ttl_seconds=300)
+            cache._load()
+            assert cache.get(plan_id).get_feature_limit('max_bookings') == 12345
+            assert g.use_replica is True
+    finally:
+        with app.app_context():
+            plan = db.session.get(SubscriptionPlan, plan_id)
+            plan.features = old_features
+            db.session.commit()
@@ -0,0 +1,55 @@
+"""Maximum SQL statements per list endpoint, whatever the number of rows listed.
+
+Each endpoint loads the current user and then runs one query for the rows it
+lists, with the relationships it serializes eager-loaded (the dashboard adds a
+fixed number of aggregates). A relationship loaded per row would exceed the
+limit, or trip the N+1 guard and return a 500.
+"""
+import pytest
+
+from conftest import EXTRA_BOOKINGS
+
+
+@pytest.fixture
+def demo_store_id(app):
+    from src.models import User
+    with app.app_context():
+        return User.query.filter_by(email='manager@demo.com').one().store_id
+
+
+@pytest.mark.parametrize('email, url, limit', [
+    ('admin@demo.com', '/api/bookings', 2),
+    ('manager@demo.com', '/api/bookings', 2),
+    ('client@demo.com', '/api/bookings', 2),
+    ('manager@demo.com', '/api/stores/{store_id}/bookings', 2),
+    ('manager@demo.com', '/api/stores/{store_id}/bookings?payment_status=unpaid', 2),
+    ('manager@demo.com', '/api/bookings/calendar', 2),
+    ('admin@demo.com', '/api/subscriptions', 2),
+    ('manager@demo.com', '/api/subscriptions', 2),
+    ('manager@demo.com', '/api/stores/{store_id}/subscriptions', 2),
+])
+def test_list_endpoint_query_count(client, auth_headers, max_queries, demo_store_id, email, url, limit):
+    headers = auth_headers(email)
+    with max_queries(limit):
+        response = client.get(url.format(store_id=demo_store_id), headers=headers)
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()
+
+
+def test_store_bookings_list_all_rows(client, auth_headers, max_queries, demo_store_id):
+    headers = auth_headers('manager@demo.com')
+    with max_queries(2):
+        response = client.get(f'/api/stores/{demo_store_id}/bookings', headers=headers)
+    assert len(response.get_json()) > EXTRA_BOOKINGS
+    assert all(booking['service'] and booking['client'] for booking in response.get_json())
+
+
+@pytest.mark.parametrize('email, limit', [
+    ('admin@demo.com', 10),
+    ('manager@demo.com', 13),
+])
+def test_dashboard_stats_query_count(client, auth_headers, max_queries, email, limit):
+    headers = auth_headers(email)
+    with max_queries(limit):
+        response = client.get('/api/dashboard/stats', headers=headers)
+    assert response.status_code == 200, response.get_json()
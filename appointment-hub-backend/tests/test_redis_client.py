@@ -0,0 +1,57 @@
+"""A Redis that fails after connecting is backed off, not retried on every call."""
+import pytest
+import redis
+
+from src.utils import redis_client
+from src.utils.token_blocklist import TokenBlocklist
+
+
+class DeadRedis:
+    """Answers the connection check, then times out on every command"""
+
+    def __init__(self):
+        self.commands = 0
+
+    def ping(self):
+        return True
+
+    def exists(self, *keys):
+        self.commands += 1
+        raise redis.TimeoutError('Timeout reading from socket')
+
+
+@pytest.fixture
+def dead_redis(monkeypatch):
+    clients = []
+
+    def from_url(url, **kwargs):
+        clients.append(DeadRedis())
+        return clients[-1]
+
+    monkeypatch.setenv('REDIS_URL', 'redis://redis.invalid:6379/0')
+    monkeypatch.setattr(redis.Redis, 'from_url', from_url)
+    monkeypatch.setattr(redis_client, '_client', None)
+    monkeypatch.setattr(redis_client, '_client_checked_at', None)
+    return clients
+
+
+def test_failed_command_backs_off(dead_redis, monkeypatch):
+    blocklist = TokenBlocklist()
+    assert not blocklist.is_revoked('jti-1')
+    assert len(dead_redis) == 1 and dead_redis[0].commands == 1
+
+    # Within the interval the in-process fallback answers without touching Redis
+    for _ in range(5):
+        assert not blocklist.is_revoked('jti-1')
+    assert redis_client.get_redis_client() is None
+    assert len(dead_redis) == 1 and dead_redis[0].commands == 1
+
+    monkeypatch.setattr(redis_client, 'RETRY_INTERVAL_SECONDS', 0)
+    assert redis_client.get_redis_client() is dead_redis[-1]
+    assert len(dead_redis) == 2
+
+
+def test_other_errors_keep_the_client(dead_redis):
+    client = redis_client.get_redis_client()
+    redis_client.report_redis_error(ValueError('not a Redis error'))
+    assert redis_client.get_redis_client() is client
@@ -0,0 +1,83 @@
+"""Stripe delivers events in any order: a late failure must not undo a payment."""
+import time
+
+import pytest
+import stripe
+
+DAY = 86400
+
+
+def invoice_event(kind, invoice_id, period_start, created):
+    return stripe.Event.construct_from({
+        'id': f'evt_{kind}_{invoice_id}_{created}', 'object': 'event', 'type': f'invoice.{kind}', 'created': created,
+        'data': {'object': {
+            'id': invoice_id, 'object': 'invoice', 'subscription': 'sub_test_ordering',
+            'payment_intent': f'pi_{invoice_id}', 'amount_paid': 2900 if kind == 'payment_succeeded' else 0,
+            'amount_due': 2900, 'currency': 'eur', 'status_transitions': {'paid_at': created},
+            'lines': {'object': 'list', 'data': [{'period': {'start': period_start, 'end': period_start + 30 * DAY}}]}
+        }}
+    }, None)
+
+
+@pytest.fixture
+def stripe_subscription(app):
+    from src.models import db, Payment, Store, Subscription, SubscriptionPlan, SubscriptionStatus, User
+
+    with app.app_context():
+        store = Store.query.join(User, User.id == Store.manager_user_id).filter(User.email == 'manager@demo.com').one()
+        subscription = Subscription(store_id=store.id, plan_id=SubscriptionPlan.query.first().id,
+                                    status=SubscriptionStatus.ACTIVE, stripe_subscription_id='sub_test_ordering')
+        db.session.add(subscription)
+        db.session.commit()
+        subscription_id = subscription.id
+    yield subscription_id
+    with app.app_context():
+        Payment.query.filter_by(subscription_id=subscription_id).delete()
+        db.session.delete(db.session.get(Subscription, subscription_id))
+        db.session.commit()
+
+
+def apply(app, events):
+    from src.models import db
+    from src.utils.stripe_webhooks import process_events
+
+    with app.app_context():
+        results = process_events(events)
+        db.session.commit()
+        return [result['result'] for result in results]
+
+
+def state(app, subscription_id):
+    from src.models import db, Payment, Subscription
+
+    with app.app_context():
+        payments = Payment.query.filter_by(subscription_id=subscription_id).all()
+        subscription = db.session.get(Subscription, subscription_id)
+        return subscription.status.name, {p.stripe_invoice_id: p.status.name for p in payments}
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_late_failure_keeps_paid_invoice(app, stripe_subscription, batched):
+    now = int(time.time())
+    paid = invoice_event('payment_succeeded', 'in_retry', now, now + 60)
+    failed = invoice_event('payment_failed', 'in_retry', now, now)
+    if batched:
+        assert apply(app, [paid, failed]) == ['processed', 'ignored']
+    else:
+        apply(app, [paid])
+        assert apply(app, [failed]) == ['ignored']
+    assert state(app, stripe_subscription) == ('ACTIVE', {'in_retry': 'SUCCEEDED'})
+
+
+def test_late_failure_of_previous_period_keeps_subscription_active(app, stripe_subscription):
+    now = int(time.time())
+    apply(app, [invoice_event('payment_succeeded', 'in_next', now, now)])
+    apply(app, [invoice_event('payment_failed', 'in_previous', now - 30 * DAY, now - 30 * DAY)])
+    assert state(app, stripe_subscription) == ('ACTIVE', {'in_next': 'SUCCEEDED', 'in_previous': 'FAILED'})
+
+
+def test_failed_renewal_moves_subscription_past_due(app, stripe_subscription):
+    now = int(time.time())
+    apply(app, [invoice_event('payment_succeeded', 'in_current', now - 30 * DAY, now - 30 * DAY)])
+    apply(app, [invoice_event('payment_failed', 'in_renewal', now, now)])
+    assert state(app, stripe_subscription) == ('PAST_DUE', {'in_current': 'SUCCEEDED', 'in_renewal': 'FAILED'})
@@ -109,6 +109,56 @@ check_health() {
     log_success "All services are healthy"
 }
 
+# Load demo data (skipped if users already exist)
+seed_demo_data() {
+    log_info "Loading demo data..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask seed-demo
+    log_success "Demo data loaded"
+}
+
+# Move old bookings/notifications to the archive tables
+archive_history() {
+    log_info "Archiving booking and notification history..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask archive-history
+    log_success "History archived"
+}
+
+# Send pending SMS campaigns and resume interrupted ones
+run_campaigns() {
+    log_info "Running SMS campaigns..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask run-campaigns
+    log_success "Campaigns processed"
+}
+
+# Correct payments that drifted from Stripe (missed webhooks)
+reconcile_payments() {
+    log_info "Reconciling payments with Stripe..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask reconcile-payments
+    log_success "Payments reconciled"
+}
+
+# Recount plan usage counters from the bookings/services/notifications tables
+reconcile_usage() {
+    log_info "Reconciling plan usage counters..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask reconcile-usage
+    log_success "Usage counters reconciled"
+}
+
+# Renew subscriptions whose period ended and end unpaid past-due ones
+process_subscriptions() {
+    log_info "Processing subscription renewals..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask process-subscriptions
+    docker-compose -f $COMPOSE_FILE exec -T backend flask send-notifications
+    log_success "Subscriptions processed"
+}
+
+# Send the email notifications the periodic jobs queued (retries failed runs)
+send_notifications() {
+    log_info "Sending queued notifications..."
+    docker-compose -f $COMPOSE_FILE exec -T backend flask send-notifications
+    log_success "Notifications sent"
+}
+
 # Show service status
 show_status() {
     log_info "Service Status:"
@@ -191,6 +241,7 @@ case "$1" in
         build_images
         start_services
         check_health
+        seed_demo_data
         show_status
         log_success "Deployment completed successfully!"
         ;;
@@ -224,13 +275,34 @@ case "$1" in
     "health")
         check_health
         ;;
+    "seed")
+        seed_demo_data
+        ;;
+    "archive")
+        archive_history
+        ;;
+    "campaigns")
+        run_campaigns
+        ;;
+    "reconcile")
+        reconcile_payments
+        ;;
+    "usage")
+        reconcile_usage
+        ;;
+    "subscriptions")
+        process_subscriptions
+        ;;
+    "notifications")
+        send_notifications
+        ;;
     *)
         echo "AppointmentHub Deployment Script"
         echo ""
-        echo "Usage: $0 {deploy|start|stop|restart|status|logs|backup|restore|cleanup|health}"
+        echo "Usage: $0 {deploy|start|stop|restart|status|logs|backup|restore|cleanup|health|seed|archive|campaigns|reconcile|usage|subscriptions|notifications}"
         echo ""
         echo "Commands:"
-        echo "  deploy   - Full deployment (build, start, health check)"
+        echo "  deploy   - Full deployment (build, start, health check, demo data)"
         echo "  start    - Start all services"
         echo "  stop     - Stop all services"
         echo "  restart  - Restart all services"
@@ -240,6 +312,13 @@ case "$1" in
         echo "  restore  - Restore database from backup file"
         echo "  cleanup  - Remove all containers, networks, and volumes"
         echo "  health   - Check service health"
+        echo "  seed     - Load demo data into the database"
+        echo "  archive  - Move old bookings/notifications to the archive tables (run from cron)"
+        echo "  campaigns - Send pending SMS campaigns and resume interrupted ones (run from cron)"
+        echo "  reconcile - Correct payments that drifted from Stripe (run from cron)"
+        echo "  usage    - Recount plan usage counters (run from cron, e.g. nightly)"
+        echo "  subscriptions - Renew ended subscription periods, end unpaid ones (run from cron, e.g. hourly)"
+        echo "  notifications - Send queued email notifications (run from cron, e.g. every few minutes)"
         echo ""
         echo "Examples:"
         echo "  $0 deploy"